@@ -35,7 +35,7 @@ INSTALLED_APPS = [
     'rest_framework_simplejwt',
     'django_filters',  # Added for enhanced filtering
     # Your app
-    'litigation_api',
+    'litigation_api.app.LitigationApiConfig',
 ]
 
 MIDDLEWARE = [
@@ -330,18 +330,33 @@ FILE_UPLOAD_MAX_MEMORY_SIZE = 10 * 1024 * 1024
 DATA_UPLOAD_MAX_MEMORY_SIZE = 10 * 1024 * 1024 
 FILE_UPLOAD_PERMISSIONS = 0o644
 
-EMAIL_BACKEND = 'django.core.mail.backends.smtp.EmailBackend'
+EMAIL_BACKEND = os.environ.get('EMAIL_BACKEND', 'django.core.mail.backends.smtp.EmailBackend')
 EMAIL_HOST = 'smtp.gmail.com'
 EMAIL_PORT = 587
 EMAIL_USE_TLS = True
 EMAIL_HOST_USER = os.environ.get('EMAIL_HOST_USER')
 EMAIL_HOST_PASSWORD = os.environ.get('EMAIL_HOST_PASSWORD')
 DEFAULT_FROM_EMAIL = os.environ.get('DEFAULT_FROM_EMAIL', 'CCI Legal Team <noreply@ccilitigation.com>')
+EMAIL_TIMEOUT = int(os.environ.get('EMAIL_TIMEOUT', '30'))  # seconds; a hung SMTP server must not stall the dispatcher
 
 SMS_API_KEY = os.environ.get('SMS_API_KEY')
 SMS_SENDER_ID = os.environ.get('SMS_SENDER_ID', 'CCILTD')
 SMS_TEMPLATE_ID = os.environ.get('SMS_TEMPLATE_ID')
 
+SMS_SETTINGS = {
+    # LogSmsGateway only logs; TextLocalGateway sends (SMS_API_KEY / SMS_SENDER_ID);
+    # FakeSmsGateway simulates latency and failures for load tests
+    'BACKEND': os.environ.get('SMS_BACKEND', 'litigation_api.sms.LogSmsGateway'),
+    'OPTIONS': {
+        'rate_per_second': float(os.environ.get('SMS_RATE_PER_SECOND', '10')),   # provider requests per second
+        'burst': int(os.environ.get('SMS_RATE_BURST', '10')),
+        'pool_size': 10,
+        'timeout': 10,
+        'latency_ms': int(os.environ.get('SMS_FAKE_LATENCY_MS', '50')),
+        'failure_rate': float(os.environ.get('SMS_FAKE_FAILURE_RATE', '0')),
+    },
+}
+
 CCI_LITIGATION_SETTINGS = {
     'DEPARTMENT_USER_LIMITS': {
         'corporate_office': 4,  
@@ -382,7 +397,13 @@ CCI_LITIGATION_SETTINGS = {
     'MAX_PAGE_SIZE': 100,
     
     'EXPORT_MAX_RECORDS': int(os.environ.get('EXPORT_MAX_RECORDS', '10000')),
-    'EXPORT_FORMATS': ['xlsx', 'csv'],
+    'EXPORT_FORMATS': ['xlsx', 'csv', 'ndjson', 'parquet', 'arrow'],
+    'IMPORT_BATCH_SIZE': int(os.environ.get('IMPORT_BATCH_SIZE', '500')),
+    'IMPORT_STAGING_HOURS': int(os.environ.get('IMPORT_STAGING_HOURS', '24')),
+    'IMPORT_MAX_FILE_SIZE_MB': int(os.environ.get('IMPORT_MAX_FILE_SIZE_MB', '50')),
+    # Validation worker processes for large imports (unset: one per core, 0/1: in-process)
+    'IMPORT_VALIDATION_WORKERS': int(os.environ['IMPORT_VALIDATION_WORKERS']) if 'IMPORT_VALIDATION_WORKERS' in os.environ else None,
+    'IMPORT_PARALLEL_MIN_ROWS': int(os.environ.get('IMPORT_PARALLEL_MIN_ROWS', '5000')),
 }
 
 SESSION_COOKIE_AGE = CCI_LITIGATION_SETTINGS['SESSION_TIMEOUT_MINUTES'] * 60  
@@ -455,4 +476,50 @@ DRAFT_SETTINGS = {
     'CLEANUP_TIME': '02:00',            
     'CLEANUP_ON_STARTUP': False,       
     'CLEANUP_ON_USER_LOGIN': False,    
-}
\ No newline at end of file
+}
+
+SEARCH_SETTINGS = {
+    'FUZZY_MIN_SIMILARITY': 0.3,          # word similarity cut-off for fuzzy name search
+    'FUZZY_DEFAULT_LIMIT': 10,
+    'FUZZY_MAX_LIMIT': 50,
+    'FUZZY_INDEX_REFRESH_SECONDS': 60,    # in-process trigram index staleness check (non-PostgreSQL)
+}
+
+CASE_CACHE_SETTINGS = {
+    'LIST_CACHE_ENABLED': os.environ.get('CASE_LIST_CACHE_ENABLED', 'True').lower() == 'true',
+    'LIST_CACHE_TIMEOUT': int(os.environ.get('CASE_LIST_CACHE_TIMEOUT', '300')),  # seconds; writes invalidate sooner
+    'KEY_PREFIX': 'cci:cases',
+}
+
+BACKGROUND_JOB_SETTINGS = {
+    'WORKERS': int(os.environ.get('BACKGROUND_JOB_WORKERS', '2')),   # threads per server process
+    'EXPORT_RETENTION_HOURS': int(os.environ.get('EXPORT_RETENTION_HOURS', '24')),
+    'EXPORT_PROGRESS_EVERY': 500,       # rows between progress writes
+    'STALE_AFTER_MINUTES': 30,          # running jobs without progress for this long are treated as dead
+    'IMPORT_JOB_MAX_ATTEMPTS': 3,       # resumes of an interrupted import job before it is failed
+    'IMPORT_JOB_RETENTION_DAYS': 7,     # finished import jobs and their row errors
+}
+
+NOTIFICATION_SETTINGS = {
+    'DISPATCH_BATCH_SIZE': 200,         # outbox rows claimed per channel per pass
+    'CHANNEL_BATCH_SIZE': 50,           # rows handed to one delivery thread at a time
+    'CHANNEL_CONCURRENCY': {            # delivery threads per channel
+        'sms': int(os.environ.get('SMS_CONCURRENCY', '4')),
+        'email': int(os.environ.get('EMAIL_CONCURRENCY', '2')),
+    },
+    'CLAIM_TIMEOUT_MINUTES': 10,        # 'sending' rows older than this go back to the outbox
+    # Daily hearing reminders sent by `manage.py run_hearing_reminders`
+    'AUTO_REMINDERS': os.environ.get('AUTO_REMINDERS', 'True').lower() == 'true',
+    'REMINDER_TIME': os.environ.get('REMINDER_TIME', '09:00'),  # local time (TIME_ZONE)
+    'REMINDER_DAYS_BEFORE': int(os.environ.get('REMINDER_DAYS_BEFORE', '1')),
+    'REMINDER_SMS_ENABLED': True,
+    'REMINDER_EMAIL_ENABLED': True,
+    'REMINDER_DIGEST': os.environ.get('REMINDER_DIGEST', 'False').lower() == 'true',  # one message per advocate
+}
+
+DELTA_SYNC_SETTINGS = {
+    'DEFAULT_LIMIT': 500,
+    'MAX_LIMIT': 2000,
+    'SETTLE_SECONDS': 5,               # hold back rows younger than this so in-flight transactions are not skipped
+    'TOMBSTONE_RETENTION_DAYS': 90,    # older cursors must do a full resync
+}
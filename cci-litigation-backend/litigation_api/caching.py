@@ -0,0 +1,185 @@
+"""
+HTTP validators and result caching for case reads.
+
+Case list and detail responses carry a strong ETag and Last-Modified derived
+from ``Case.updated_at``. A request whose If-None-Match / If-Modified-Since
+still matches is answered with 304 straight after one aggregate query, before
+any serialization happens.
+
+Filtered case lists are also cached server-side. Entries are keyed on a
+normalized filter signature plus a global case-table generation that is bumped
+when every create, update and delete commits (see signals.py and imports.py),
+so a write makes every older entry unreachable and it simply ages out of the cache.
+Works with whatever ``CACHES['default']`` is (LocMem in dev, Redis in prod).
+"""
+import hashlib
+import logging
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count, Max
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date, quote_etag
+
+logger = logging.getLogger(__name__)
+
+# Query parameters whose default value is the same as leaving them out
+LIST_PARAM_DEFAULTS = {
+    'page': '1',
+    'sort_order': 'desc',
+    'view': 'full',
+}
+
+
+def _make_etag(*parts):
+    digest = hashlib.sha1('|'.join(str(part) for part in parts).encode()).hexdigest()
+    return quote_etag(digest)
+
+
+def case_list_validators(queryset, request):
+    """
+    (etag, last_modified) for a filtered case list.
+    Count + max(updated_at) change on every insert, update and delete in the set;
+    the full path covers page, sort, fields and filters.
+    """
+    stats = queryset.order_by().aggregate(total=Count('id'), latest=Max('updated_at'))
+    latest = stats['latest']
+    etag = _make_etag(
+        'case-list', request.get_host(), request.get_full_path(),
+        stats['total'], latest.isoformat() if latest else '',
+    )
+    return etag, latest
+
+
+def case_detail_validators(case_pk, updated_at, request):
+    """(etag, last_modified) for a single case"""
+    etag = _make_etag('case-detail', request.get_host(), request.get_full_path(), case_pk, updated_at.isoformat())
+    return etag, updated_at
+
+
+def set_validators(response, etag, last_modified):
+    """Attach validators and require revalidation on every reuse"""
+    response['ETag'] = etag
+    if last_modified:
+        response['Last-Modified'] = http_date(last_modified.timestamp())
+    patch_cache_control(response, private=True, no_cache=True)
+    return response
+
+
+def conditional_response(request, etag, last_modified):
+    """Return a 304 (or 412) response if the client's validators still match, else None"""
+    response = get_conditional_response(
+        request,
+        etag=etag,
+        last_modified=int(last_modified.timestamp()) if last_modified else None,
+    )
+    if response is not None:
+        set_validators(response, etag, last_modified)
+    return response
+
+
+# ----- versioned case-list cache -----
+
+def _cache_setting(key, default):
+    return getattr(settings, 'CASE_CACHE_SETTINGS', {}).get(key, default)
+
+
+def _cache_key(*parts):
+    return ':'.join([_cache_setting('KEY_PREFIX', 'cci:cases')] + [str(part) for part in parts])
+
+
+def _incr(key, delta=1):
+    """Atomic counter increment that also works for a key that has expired"""
+    try:
+        return cache.incr(key, delta)
+    except ValueError:
+        # Missing key: first writer wins, everyone else increments
+        if cache.add(key, delta, timeout=None):
+            return delta
+        return cache.incr(key, delta)
+
+
+def get_case_generation():
+    """
+    Current case-table generation. A missing counter (first use, eviction,
+    cache flush) is re-seeded from the clock so it can never fall back to a
+    value that older entries were stored under.
+    """
+    key = _cache_key('generation')
+    generation = cache.get(key)
+    if generation is None:
+        cache.add(key, time.time_ns() // 1000, timeout=None)
+        generation = cache.get(key)
+    return generation
+
+
+def bump_case_generation():
+    """Invalidate every cached case list; call after any write to the case table"""
+    try:
+        try:
+            return cache.incr(_cache_key('generation'))
+        except ValueError:
+            return get_case_generation()
+    except Exception as e:
+        # A cache outage must never fail the write itself
+        logger.warning(f"Could not bump case cache generation: {e}")
+        return None
+
+
+def list_cache_signature(request):
+    """
+    Normalized filter signature of a list request: parameters sorted, blank
+    values and defaults dropped, so equivalent URLs share one entry.
+    """
+    items = []
+    for key in sorted(request.query_params.keys()):
+        values = sorted(v.strip() for v in request.query_params.getlist(key) if v.strip())
+        if not values or values == [LIST_PARAM_DEFAULTS.get(key)]:
+            continue
+        items.append((key, values))
+    raw = repr((request.get_host(), request.path, items))
+    return hashlib.sha1(raw.encode()).hexdigest()
+
+
+def get_cached_case_list(request):
+    """Cached entry for this list request at the current generation, or None"""
+    if not _cache_setting('LIST_CACHE_ENABLED', True):
+        return None, None
+    try:
+        key = _cache_key('list', get_case_generation(), list_cache_signature(request))
+        entry = cache.get(key)
+        _incr(_cache_key('stats', 'hits' if entry is not None else 'misses'))
+    except Exception as e:
+        logger.warning(f"Case list cache unavailable: {e}")
+        return None, None
+    return entry, key
+
+
+def set_cached_case_list(key, data, etag, last_modified):
+    if key is None:
+        return
+    entry = {'data': data, 'etag': etag, 'last_modified': last_modified}
+    try:
+        cache.set(key, entry, _cache_setting('LIST_CACHE_TIMEOUT', 300))
+    except Exception as e:
+        logger.warning(f"Could not store case list in cache: {e}")
+
+
+def case_list_cache_stats():
+    """Hit/miss counters and the current generation"""
+    hits = cache.get(_cache_key('stats', 'hits'), 0)
+    misses = cache.get(_cache_key('stats', 'misses'), 0)
+    lookups = hits + misses
+    return {
+        'enabled': _cache_setting('LIST_CACHE_ENABLED', True),
+        'backend': settings.CACHES['default']['BACKEND'].rsplit('.', 1)[-1],
+        'generation': get_case_generation(),
+        'hits': hits,
+        'misses': misses,
+        'hit_rate': round(hits / lookups, 4) if lookups else None,
+    }
+
+
+def reset_case_list_cache_stats():
+    cache.delete_many([_cache_key('stats', 'hits'), _cache_key('stats', 'misses')])
@@ -0,0 +1,197 @@
+"""
+Incremental ("changed since") sync for cases.
+
+Changes are read in (updated_at, id) order from the ``litigation_case_delta_idx``
+index and deletions from ``CaseTombstone``. Clients keep the opaque cursor
+returned with each page and send it back to get the next set of changes, so
+a sync costs O(changes) instead of O(table).
+
+Rows written in the last ``SETTLE_SECONDS`` are held back until the next
+poll: a transaction that stamped ``updated_at`` but had not committed yet
+when the page was read would otherwise fall behind the cursor and be missed.
+
+With list filters (department, status, dates, search) the client mirrors a
+subset. Pages are still read over the whole table, so the cursor does not
+depend on the filters. A changed case that no longer matches is reported
+under ``deleted`` with reason ``filtered_out``, so the mirror drops it.
+Tombstones are narrowed by department, the only filter they record; with
+other filters every deletion is reported, and removing a case the mirror
+never had is a no-op.
+"""
+import base64
+import binascii
+import json
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+from django.conf import settings
+from django.db.models import Q
+from django.utils import timezone
+
+from .filters import filter_cases
+from .models import Case, CaseTombstone
+
+
+class DeltaCursorError(ValueError):
+    """Malformed cursor or watermark"""
+
+
+class DeltaExpiredError(Exception):
+    """The cursor is older than the tombstone retention window; a full resync is needed"""
+
+
+def delta_setting(key, default):
+    return getattr(settings, 'DELTA_SYNC_SETTINGS', {}).get(key, default)
+
+
+def _parse_datetime(value):
+    try:
+        parsed = datetime.fromisoformat(value)
+    except (TypeError, ValueError):
+        raise DeltaCursorError(f'Invalid timestamp: {value}')
+    if timezone.is_naive(parsed):
+        parsed = timezone.make_aware(parsed, dt_timezone.utc)
+    return parsed
+
+
+def encode_cursor(position):
+    """Opaque cursor for {'u': updated_at, 'i': case id, 'd': deleted_at, 't': tombstone id}"""
+    payload = json.dumps(position, separators=(',', ':'))
+    return base64.urlsafe_b64encode(payload.encode()).decode()
+
+
+def decode_cursor(cursor):
+    try:
+        position = json.loads(base64.urlsafe_b64decode(cursor.encode()).decode())
+        return {
+            'u': _parse_datetime(position['u']), 'i': int(position['i']),
+            'd': _parse_datetime(position['d']), 't': int(position['t']),
+        }
+    except (binascii.Error, ValueError, KeyError, TypeError, UnicodeDecodeError):
+        raise DeltaCursorError('Invalid cursor')
+
+
+def start_position(since):
+    """Position just before ``since`` (an ISO timestamp watermark)"""
+    since = _parse_datetime(since)
+    return {'u': since, 'i': 0, 'd': since, 't': 0}
+
+
+def resolve_position(params):
+    """Position from ?cursor= or ?since=, or None when neither is given"""
+    if params.get('cursor'):
+        return decode_cursor(params['cursor'])
+    if params.get('since'):
+        return start_position(params['since'])
+    return None
+
+
+def _check_retention(position):
+    retention_days = delta_setting('TOMBSTONE_RETENTION_DAYS', 90)
+    if position['d'] < timezone.now() - timedelta(days=retention_days):
+        raise DeltaExpiredError(
+            f'Deletions older than {retention_days} days are no longer tracked; run a full sync'
+        )
+
+
+def changed_cases(queryset, position, upto=None):
+    """Cases created or updated after ``position``, in (updated_at, id) order"""
+    upto = upto or settled_upto()
+    after = Q(updated_at__gt=position['u']) | Q(updated_at=position['u'], id__gt=position['i'])
+    return queryset.filter(after, updated_at__lte=upto).order_by('updated_at', 'id')
+
+
+def deleted_cases(position, upto=None, department=None):
+    upto = upto or settled_upto()
+    after = Q(deleted_at__gt=position['d']) | Q(deleted_at=position['d'], id__gt=position['t'])
+    tombstones = CaseTombstone.objects.filter(after, deleted_at__lte=upto)
+    if department:
+        tombstones = tombstones.filter(internal_department=department)
+    return tombstones.order_by('deleted_at', 'id')
+
+
+# List filters a delta can be restricted by (sorting does not apply)
+DELTA_FILTER_PARAMS = ['search', 'department', 'status', 'date_from', 'date_to']
+
+
+def delta_filters(params):
+    """The list filters of ``params`` that restrict a delta, blanks dropped"""
+    return {
+        key: str(params.get(key)).strip()
+        for key in DELTA_FILTER_PARAMS
+        if params.get(key) is not None and str(params.get(key)).strip()
+    }
+
+
+def settled_upto():
+    return timezone.now() - timedelta(seconds=delta_setting('SETTLE_SECONDS', 5))
+
+
+def delta_page(queryset, position, limit, filters=None):
+    """
+    One page of changes after ``position`` over ``queryset`` (unfiltered):
+    (changed cases, cases that left ``filters``, tombstones, next position, has_more).
+    """
+    _check_retention(position)
+    upto = settled_upto()
+
+    changed = list(changed_cases(queryset, position, upto)[:limit + 1])
+    deleted = list(deleted_cases(position, upto, (filters or {}).get('department'))[:limit + 1])
+    has_more = len(changed) > limit or len(deleted) > limit
+    changed, deleted = changed[:limit], deleted[:limit]
+    # The cursor follows the unfiltered page, before it is split
+    last_changed = changed[-1] if changed else None
+
+    departed = []
+    if filters and changed:
+        matching = set(
+            filter_cases(Case.objects.filter(id__in=[case.id for case in changed]), filters)
+            .values_list('id', flat=True)
+        )
+        departed = [case for case in changed if case.id not in matching]
+        changed = [case for case in changed if case.id in matching]
+
+    next_position = dict(position)
+    if last_changed:
+        next_position['u'], next_position['i'] = last_changed.updated_at, last_changed.id
+    elif not has_more and position['u'] < upto:
+        # Nothing left to read: move the watermark up to the settled horizon
+        next_position['u'], next_position['i'] = upto, 0
+    if deleted:
+        next_position['d'], next_position['t'] = deleted[-1].deleted_at, deleted[-1].id
+    elif not has_more and position['d'] < upto:
+        next_position['d'], next_position['t'] = upto, 0
+    return changed, departed, deleted, next_position, has_more
+
+
+def position_to_cursor(position):
+    return encode_cursor({
+        'u': position['u'].isoformat(), 'i': position['i'],
+        'd': position['d'].isoformat(), 't': position['t'],
+    })
+
+
+def tombstone_data(tombstone):
+    return {
+        'id': tombstone.case_pk,
+        'case_id': tombstone.case_id,
+        'internal_department': tombstone.internal_department,
+        'deleted_at': tombstone.deleted_at,
+        'reason': 'deleted',
+    }
+
+
+def departed_data(case):
+    """Removal entry for a case that changed out of the delta's filters"""
+    return {
+        'id': case.id,
+        'case_id': case.case_id,
+        'internal_department': case.internal_department,
+        'deleted_at': None,
+        'reason': 'filtered_out',
+    }
+
+
+def purge_tombstones():
+    """Drop tombstones past the retention window; returns the number deleted"""
+    cutoff = timezone.now() - timedelta(days=delta_setting('TOMBSTONE_RETENTION_DAYS', 90))
+    return CaseTombstone.objects.filter(deleted_at__lt=cutoff).delete()[0]
@@ -0,0 +1,630 @@
+"""
+Case export engine.
+
+Workbooks are written with openpyxl in write-only mode: rows are streamed from
+a chunked ``queryset.iterator()`` straight into the sheet XML, styles are
+shared named styles instead of per-cell objects, and the finished file lives
+in a spooled temporary file (RAM for small exports, disk beyond
+``XLSX_SPOOL_MAX_BYTES``). Memory stays flat whatever the row count.
+
+CSV and NDJSON are streamed row by row: a ``values_list().iterator()`` (a
+server-side cursor on PostgreSQL) feeds a generator that the response
+consumes, optionally through an incremental gzip compressor, so the first
+bytes go out immediately and the table is never held in Python at once.
+
+Parquet and Arrow IPC exports build typed record batches from the same
+chunked reads (dates as date32, amounts as decimal128, department and other
+low-cardinality columns dictionary-encoded). pyarrow is optional and only
+imported when one of these formats is requested.
+
+Exports can also run as ``ExportJob`` rows in the local worker pool
+(jobs.py): clients poll progress and download the stored artifact, which is
+shared by identical requests over unchanged data until it expires.
+"""
+import csv
+import io
+import json
+import logging
+import tempfile
+import zlib
+from datetime import timedelta
+from decimal import Decimal
+
+from django.core.exceptions import ImproperlyConfigured
+from django.core.files import File
+from django.db.models import Count, Max, Q
+from django.utils import timezone
+from django.utils.html import strip_tags
+from openpyxl import Workbook
+from openpyxl.cell import Cell, WriteOnlyCell
+from openpyxl.styles import Alignment, Border, Font, NamedStyle, PatternFill, Side
+from openpyxl.utils import get_column_letter
+
+from . import jobs
+from .filters import case_filter_params, case_filter_signature, filter_cases
+from .models import Case, ExportJob, User
+from .stats import department_breakdown, rollup_department_breakdown
+
+logger = logging.getLogger(__name__)
+
+XLSX_CONTENT_TYPE = 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+
+EXPORT_CHUNK_SIZE = 2000
+XLSX_SPOOL_MAX_BYTES = 8 * 1024 * 1024
+
+# Two-row header of the 19-column litigation register
+EXCEL_HEADER_ROW_1 = [
+    "Case Number", "", "",
+    "Date of Filing/Intimation",
+    "Pending Before Court",
+    "Party Details", "",
+    "Nature of Claim",
+    "Advocate", "", "",
+    "Financial Implications",
+    "Internal Department of CCI",
+    "Last Date of Hearing",
+    "Next Date of Hearing",
+    "Brief Description of Matter",
+    "Relief Claimed by Party",
+    "Present Status",
+    "Remarks",
+]
+
+EXCEL_HEADER_ROW_2 = [
+    "Type", "Number", "Year",
+    None, None,
+    "Petitioner", "Respondent",
+    None,
+    "Name", "Email", "Mobile",
+    None, None, None, None, None, None, None, None,
+]
+
+# Group titles spanning several row-2 sub-columns
+EXCEL_MERGED_HEADERS = ['A1:C1', 'F1:G1', 'I1:K1']
+
+EXCEL_COLUMN_WIDTHS = [12, 10, 10, 18, 25, 30, 30, 20, 25, 30, 15, 20, 25, 18, 18, 50, 40, 30, 40]
+
+# Model columns read by case_export_row()
+EXPORT_COLUMNS = [
+    'id', 'case_type', 'case_number', 'case_year', 'date_of_filing', 'pending_before_court',
+    'party_petitioner', 'party_respondent', 'nature_of_claim', 'advocate_name', 'advocate_email',
+    'advocate_mobile', 'financial_implications', 'internal_department', 'last_hearing_date',
+    'next_hearing_date', 'brief_description', 'relief_claimed', 'present_status', 'case_remarks',
+]
+
+
+# ----- value formatting -----
+
+def format_indian_date(date_obj):
+    """Format date as DD-MM-YYYY (Indian format)"""
+    if date_obj:
+        return date_obj.strftime('%d-%m-%Y')
+    return ''
+
+
+def format_party_list(party_str):
+    """Comma separated parties as a numbered, one-per-line list"""
+    if not party_str:
+        return ''
+    return "\n".join(f"{i + 1}. {line.strip()}" for i, line in enumerate(party_str.split(',')))
+
+
+def format_indian_currency(amount):
+    """Format currency in Indian format Rs. 1,00,00,00,00,00,000.00"""
+    if not amount:
+        return ''
+
+    try:
+        if not isinstance(amount, Decimal):
+            amount = Decimal(str(amount))
+
+        integer_part, decimal_part = f"{amount:.2f}".split('.')
+
+        # Indian numbering: last group of 3 digits, then groups of 2
+        if len(integer_part) > 3:
+            result = integer_part[-3:]
+            integer_part = integer_part[:-3]
+            while len(integer_part) > 2:
+                result = integer_part[-2:] + ',' + result
+                integer_part = integer_part[:-2]
+            if integer_part:
+                result = integer_part + ',' + result
+        else:
+            result = integer_part
+
+        return f"Rs. {result}.{decimal_part}"
+
+    except (ValueError, TypeError, ArithmeticError):
+        return str(amount) if amount else ''
+
+
+def case_export_row(case):
+    """One case as the 19 register columns"""
+    return [
+        case.case_type or '',
+        case.case_number or '',
+        case.case_year or '',
+        format_indian_date(case.date_of_filing),
+        case.pending_before_court or '',
+        format_party_list(case.party_petitioner),
+        format_party_list(case.party_respondent),
+        case.nature_of_claim or 'Others',
+        case.advocate_name or '',
+        case.advocate_email or '',
+        case.advocate_mobile or '',
+        format_indian_currency(case.financial_implications),
+        case.internal_department or '',
+        format_indian_date(case.last_hearing_date),
+        format_indian_date(case.next_hearing_date),
+        strip_tags(case.brief_description or ''),
+        strip_tags(case.relief_claimed or ''),
+        strip_tags(case.present_status or ''),
+        strip_tags(case.case_remarks or ''),
+    ]
+
+
+def export_queryset(queryset):
+    """Only the export columns, no joins"""
+    return queryset.select_related(None).only(*EXPORT_COLUMNS)
+
+
+def iter_export_cases(queryset, chunk_size=EXPORT_CHUNK_SIZE):
+    """Cases streamed in chunks (server-side cursor on PostgreSQL)"""
+    return export_queryset(queryset).iterator(chunk_size=chunk_size)
+
+
+# ----- streaming CSV / NDJSON -----
+
+# Machine-friendly flat columns: raw values, ISO dates, decimals as strings
+DATA_EXPORT_FIELDS = [
+    'id', 'case_id', 'case_type', 'case_number', 'case_year', 'date_of_filing', 'pending_before_court',
+    'party_petitioner', 'party_respondent', 'nature_of_claim', 'advocate_name', 'advocate_email',
+    'advocate_mobile', 'financial_implications', 'internal_department', 'last_hearing_date',
+    'next_hearing_date', 'brief_description', 'relief_claimed', 'present_status', 'case_remarks',
+    'created_at', 'updated_at',
+]
+
+CSV_CONTENT_TYPE = 'text/csv; charset=utf-8'
+NDJSON_CONTENT_TYPE = 'application/x-ndjson'
+
+# Rows per yielded chunk: big enough to keep per-chunk overhead low, small enough to stream
+STREAM_ROWS_PER_CHUNK = 200
+
+
+def _plain_value(value):
+    if value is None:
+        return None
+    if isinstance(value, Decimal):
+        return str(value)
+    if hasattr(value, 'isoformat'):
+        return value.isoformat()
+    return value
+
+
+def iter_case_values(queryset, fields=DATA_EXPORT_FIELDS, chunk_size=EXPORT_CHUNK_SIZE):
+    """Tuples of ``fields`` straight from the cursor, no model instances"""
+    return queryset.select_related(None).values_list(*fields).iterator(chunk_size=chunk_size)
+
+
+def iter_case_csv(queryset, fields=DATA_EXPORT_FIELDS):
+    """CSV text chunks: the header first, then STREAM_ROWS_PER_CHUNK rows per chunk"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+
+    def drain():
+        data = buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+        return data
+
+    writer.writerow(fields)
+    yield drain()
+
+    pending = 0
+    for row in iter_case_values(queryset, fields):
+        writer.writerow(['' if v is None else _plain_value(v) for v in row])
+        pending += 1
+        if pending >= STREAM_ROWS_PER_CHUNK:
+            yield drain()
+            pending = 0
+    if pending:
+        yield drain()
+
+
+def iter_case_ndjson(queryset, fields=DATA_EXPORT_FIELDS):
+    """One JSON object per line, STREAM_ROWS_PER_CHUNK lines per chunk"""
+    lines = []
+    for row in iter_case_values(queryset, fields):
+        lines.append(json.dumps(
+            {field: _plain_value(value) for field, value in zip(fields, row)},
+            ensure_ascii=False, separators=(',', ':')
+        ))
+        if len(lines) >= STREAM_ROWS_PER_CHUNK:
+            yield '\n'.join(lines) + '\n'
+            lines = []
+    if lines:
+        yield '\n'.join(lines) + '\n'
+
+
+def encode_stream(chunks, encoding='utf-8'):
+    for chunk in chunks:
+        yield chunk.encode(encoding)
+
+
+def gzip_stream(chunks, level=6):
+    """
+    Compress a byte stream incrementally into a single gzip member.
+    The first chunk is sync-flushed so the client gets bytes straight away.
+    """
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    first = True
+    for chunk in chunks:
+        data = compressor.compress(chunk)
+        if first:
+            data += compressor.flush(zlib.Z_SYNC_FLUSH)
+            first = False
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+# ----- columnar Parquet / Arrow -----
+
+PARQUET_CONTENT_TYPE = 'application/vnd.apache.parquet'
+ARROW_CONTENT_TYPE = 'application/vnd.apache.arrow.file'
+
+# Repeated values stored once per batch in a dictionary
+DICTIONARY_FIELDS = {'case_type', 'pending_before_court', 'nature_of_claim', 'internal_department'}
+
+
+def import_pyarrow():
+    """(pyarrow, pyarrow.parquet), or ImproperlyConfigured if pyarrow is not installed"""
+    try:
+        import pyarrow
+        import pyarrow.parquet
+    except ImportError:
+        raise ImproperlyConfigured('Columnar exports require pyarrow (pip install pyarrow)')
+    return pyarrow, pyarrow.parquet
+
+
+def case_arrow_schema(pa):
+    """Arrow schema for DATA_EXPORT_FIELDS, typed from the model fields"""
+    arrow_fields = []
+    for name in DATA_EXPORT_FIELDS:
+        field = Case._meta.get_field(name)
+        internal_type = field.get_internal_type()
+        if name in DICTIONARY_FIELDS:
+            arrow_type = pa.dictionary(pa.int32(), pa.string())
+        elif internal_type in ('AutoField', 'BigAutoField'):
+            arrow_type = pa.int64()
+        elif internal_type in ('IntegerField', 'PositiveIntegerField'):
+            arrow_type = pa.int32()
+        elif internal_type == 'DecimalField':
+            arrow_type = pa.decimal128(field.max_digits, field.decimal_places)
+        elif internal_type == 'DateField':
+            arrow_type = pa.date32()
+        elif internal_type == 'DateTimeField':
+            arrow_type = pa.timestamp('us', tz='UTC')
+        else:
+            arrow_type = pa.string()
+        arrow_fields.append(pa.field(name, arrow_type, nullable=field.null or name not in ('id', 'case_id')))
+    return pa.schema(arrow_fields)
+
+
+def iter_case_record_batches(queryset, pa, schema, batch_size=EXPORT_CHUNK_SIZE):
+    """Typed RecordBatches of ``batch_size`` cases, built column-wise from the cursor"""
+    columns = [[] for _ in schema]
+    rows = 0
+    for row in iter_case_values(queryset, chunk_size=batch_size):
+        for column, value in zip(columns, row):
+            column.append(value)
+        rows += 1
+        if rows == batch_size:
+            yield pa.RecordBatch.from_arrays(
+                [pa.array(column, type=field.type) for column, field in zip(columns, schema)], schema=schema
+            )
+            columns = [[] for _ in schema]
+            rows = 0
+    if rows:
+        yield pa.RecordBatch.from_arrays(
+            [pa.array(column, type=field.type) for column, field in zip(columns, schema)], schema=schema
+        )
+
+
+def write_case_columnar(fileobj, queryset, export_format='parquet', progress=None, batch_size=EXPORT_CHUNK_SIZE):
+    """Write ``queryset`` as Parquet or an Arrow IPC file; returns the number of cases written"""
+    pa, pq = import_pyarrow()
+    schema = case_arrow_schema(pa)
+
+    if export_format == 'parquet':
+        writer = pq.ParquetWriter(fileobj, schema, compression='snappy')
+    else:
+        writer = pa.ipc.new_file(fileobj, schema)
+
+    count = 0
+    try:
+        for batch in iter_case_record_batches(queryset, pa, schema, batch_size):
+            writer.write_batch(batch)
+            count += batch.num_rows
+            if progress:
+                progress(count)
+    finally:
+        writer.close()
+    return count
+
+
+def build_case_columnar(queryset, export_format='parquet'):
+    """(spooled temp file positioned at 0, record count)"""
+    spool = tempfile.SpooledTemporaryFile(max_size=XLSX_SPOOL_MAX_BYTES)
+    try:
+        record_count = write_case_columnar(spool, queryset, export_format)
+    except Exception:
+        spool.close()
+        raise
+    spool.seek(0)
+    return spool, record_count
+
+
+# ----- workbook writing -----
+
+def _thin_border():
+    side = Side(style='thin')
+    return Border(left=side, right=side, top=side, bottom=side)
+
+
+def register_named_styles(wb):
+    """Shared styles; every cell references one of these instead of carrying its own"""
+    wb.add_named_style(NamedStyle(
+        name='cci_header',
+        font=Font(bold=True, color="FFFFFF", size=11),
+        fill=PatternFill(start_color="366092", end_color="366092", fill_type="solid"),
+        alignment=Alignment(horizontal='center', vertical='center', wrap_text=True),
+        border=_thin_border(),
+    ))
+    wb.add_named_style(NamedStyle(
+        name='cci_subheader',
+        font=Font(bold=True),
+        alignment=Alignment(horizontal='center', vertical='center', wrap_text=True),
+        border=_thin_border(),
+    ))
+    wb.add_named_style(NamedStyle(
+        name='cci_cell',
+        alignment=Alignment(vertical='top', wrap_text=True),
+        border=_thin_border(),
+    ))
+    wb.add_named_style(NamedStyle(name='cci_label', font=Font(bold=True)))
+
+
+class RowStyler:
+    """Builds write-only rows whose cells share a named style (resolved once per sheet)"""
+
+    def __init__(self, ws):
+        self.ws = ws
+        self._style_arrays = {}
+
+    def __call__(self, values, style):
+        style_array = self._style_arrays.get(style)
+        if style_array is None:
+            template = WriteOnlyCell(self.ws)
+            template.style = style
+            style_array = self._style_arrays[style] = template._style
+        return [Cell(self.ws, row=1, column=1, value=value, style_array=style_array) for value in values]
+
+
+def write_cases_sheet(ws, cases, progress=None, progress_every=EXPORT_CHUNK_SIZE):
+    """
+    Header plus one row per case; returns the number of cases written.
+    ``progress(rows_done)`` is called every ``progress_every`` rows.
+    """
+    # Column widths, merges and panes must be set before the first row is streamed
+    for i, width in enumerate(EXCEL_COLUMN_WIDTHS, 1):
+        ws.column_dimensions[get_column_letter(i)].width = width
+    for cell_range in EXCEL_MERGED_HEADERS:
+        ws.merged_cells.add(cell_range)
+    ws.freeze_panes = 'A3'
+    ws.row_dimensions[2].height = 25
+
+    styled = RowStyler(ws)
+    ws.append(styled(EXCEL_HEADER_ROW_1, 'cci_header'))
+    ws.append(styled(EXCEL_HEADER_ROW_2, 'cci_subheader'))
+
+    count = 0
+    for case in cases:
+        ws.append(styled(case_export_row(case), 'cci_cell'))
+        count += 1
+        if progress and count % progress_every == 0:
+            progress(count)
+    return count
+
+
+def write_summary_sheet(ws, queryset):
+    """Department-wise summary: the rollup covers unfiltered exports, filtered ones aggregate once"""
+    departments = [dept_choice[0] for dept_choice in User.DEPARTMENT_CHOICES]
+    if queryset.query.where:
+        dept_stats, _totals = department_breakdown(queryset, departments)
+    else:
+        dept_stats, _totals = rollup_department_breakdown(departments)
+
+    ws.append(["CCI Litigation System - Summary Statistics"])
+    ws.append([])
+    ws.append(RowStyler(ws)(
+        ["Department", "Total Cases", "Pending Cases", "Disposed Cases", "Overdue Cases"], 'cci_header'
+    ))
+    for dept_name in departments:
+        counts = dept_stats[dept_name]
+        ws.append([dept_name, counts['total'], counts['pending'], counts['disposed'], counts['overdue']])
+
+
+def write_metadata_sheet(ws, user, record_count):
+    current_time = timezone.now()
+    ws.append(["CCI Litigation System - Export Information"])
+    ws.append([])
+    rows = [
+        ["Export Details", ""],
+        ["Exported By", user.get_full_name() if user else ''],
+        ["Username", user.username if user else ''],
+        ["Department", user.department_name if user else ''],
+        ["User Role", "Administrator" if user and user.is_admin else "Regular User"],
+        ["Export Date", current_time.strftime('%d-%m-%Y')],
+        ["Export Time", current_time.strftime('%H:%M:%S')],
+        ["Total Records", record_count],
+        ["File Format", "Excel (.xlsx)"],
+        ["System Version", "CCI Litigation v2.0"],
+    ]
+    styled = RowStyler(ws)
+    for label, value in rows:
+        ws.append(styled([label], 'cci_label') + [value])
+
+
+def write_case_workbook(fileobj, queryset, user, include_summary=None, progress=None, progress_every=EXPORT_CHUNK_SIZE):
+    """
+    Stream the case register for ``queryset`` into ``fileobj`` as XLSX.
+    Admin exports get the summary sheet unless ``include_summary`` says otherwise.
+    Returns the number of cases written.
+    """
+    if include_summary is None:
+        include_summary = bool(user and user.is_admin)
+
+    wb = Workbook(write_only=True)
+    register_named_styles(wb)
+
+    record_count = write_cases_sheet(
+        wb.create_sheet("CCI Litigation Cases"), iter_export_cases(queryset), progress, progress_every
+    )
+    if include_summary:
+        write_summary_sheet(wb.create_sheet("Summary Statistics"), queryset)
+    write_metadata_sheet(wb.create_sheet("Export Information"), user, record_count)
+
+    wb.save(fileobj)
+    return record_count
+
+
+def build_case_workbook(queryset, user, include_summary=None):
+    """(spooled temp file positioned at 0, record count) for streaming to the client"""
+    spool = tempfile.SpooledTemporaryFile(max_size=XLSX_SPOOL_MAX_BYTES, suffix='.xlsx')
+    try:
+        record_count = write_case_workbook(spool, queryset, user, include_summary)
+    except Exception:
+        spool.close()
+        raise
+    spool.seek(0)
+    return spool, record_count
+
+
+def export_file_name(extension, prefix='CCI_Litigation_Cases'):
+    return f"{prefix}_{timezone.now().strftime('%d-%m-%Y_%H%M%S')}.{extension}"
+
+
+# ----- background export jobs -----
+
+def _write_xlsx_job(fileobj, queryset, job, progress, progress_every):
+    return write_case_workbook(fileobj, queryset, job.created_by, job.include_summary, progress, progress_every)
+
+
+def _write_parquet_job(fileobj, queryset, job, progress, progress_every):
+    return write_case_columnar(fileobj, queryset, 'parquet', progress)
+
+
+# export_format -> (writer(fileobj, queryset, job, progress, progress_every), file extension, content type)
+EXPORT_JOB_WRITERS = {
+    'xlsx': (_write_xlsx_job, 'xlsx', XLSX_CONTENT_TYPE),
+    'parquet': (_write_parquet_job, 'parquet', PARQUET_CONTENT_TYPE),
+}
+
+
+def data_version(queryset):
+    """Changes whenever a case in ``queryset`` is added, edited or removed"""
+    stats = queryset.order_by().aggregate(total=Count('id'), latest=Max('updated_at'))
+    latest = stats['latest'].isoformat() if stats['latest'] else ''
+    return f"{stats['total']}:{latest}"
+
+
+def request_export_job(user, params, export_format='xlsx'):
+    """
+    (job, created) for an export of the cases ``params`` selects. An identical
+    request over unchanged data reuses the queued, running or completed job;
+    XLSX jobs are reused only by their requester, whose details the
+    metadata sheet records.
+    """
+    expire_export_jobs()
+
+    filters = case_filter_params(params)
+    include_summary = export_format == 'xlsx' and user.is_admin
+    requester = user.pk if export_format == 'xlsx' else None
+    signature = case_filter_signature(filters, export_format, include_summary, requester)
+    version = data_version(filter_cases(Case.objects.all(), filters))
+
+    existing = ExportJob.objects.filter(signature=signature, data_version=version).filter(
+        Q(status='completed', expires_at__gt=timezone.now())
+        | Q(status__in=['pending', 'running'], updated_at__gte=jobs.stale_before())
+    ).order_by('-created_at').first()
+    if existing:
+        return existing, False
+
+    job = ExportJob.objects.create(
+        created_by=user,
+        export_format=export_format,
+        filters=filters,
+        include_summary=include_summary,
+        signature=signature,
+        data_version=version,
+    )
+    jobs.submit_on_commit(run_export_job, job.pk)
+    return job, True
+
+
+def run_export_job(job_id):
+    """Worker entry point: build the artifact for one pending job"""
+    now = timezone.now()
+    claimed = ExportJob.objects.filter(pk=job_id, status='pending').update(
+        status='running', started_at=now, updated_at=now
+    )
+    if not claimed:
+        return
+
+    job = ExportJob.objects.select_related('created_by').get(pk=job_id)
+    writer, extension, _content_type = EXPORT_JOB_WRITERS[job.export_format]
+
+    def progress(rows_done):
+        ExportJob.objects.filter(pk=job.pk).update(processed_rows=rows_done, updated_at=timezone.now())
+
+    try:
+        queryset = filter_cases(Case.objects.all(), job.filters)
+        job.total_rows = queryset.count()
+        ExportJob.objects.filter(pk=job.pk).update(total_rows=job.total_rows, updated_at=timezone.now())
+
+        with tempfile.TemporaryFile() as artifact:
+            job.processed_rows = writer(
+                artifact, queryset, job, progress, jobs.job_setting('EXPORT_PROGRESS_EVERY', 500)
+            )
+            job.file_size = artifact.tell()
+            artifact.seek(0)
+            job.file_name = export_file_name(extension)
+            job.artifact.save(f"{job.pk}.{extension}", File(artifact), save=False)
+
+        job.status = 'completed'
+        job.completed_at = timezone.now()
+        job.expires_at = job.completed_at + timedelta(hours=jobs.job_setting('EXPORT_RETENTION_HOURS', 24))
+        job.save()
+        logger.info(f"Export job {job.pk} completed with {job.processed_rows} records")
+    except Exception as e:
+        logger.error(f"Export job {job.pk} failed: {str(e)}")
+        ExportJob.objects.filter(pk=job.pk).update(
+            status='failed', error_message=str(e), completed_at=timezone.now()
+        )
+
+
+def expire_export_jobs():
+    """Delete artifacts past retention and fail jobs whose worker died; returns (expired, failed)"""
+    now = timezone.now()
+    expired = 0
+    for job in ExportJob.objects.filter(status='completed', expires_at__lte=now):
+        if job.artifact:
+            job.artifact.delete(save=False)
+        ExportJob.objects.filter(pk=job.pk).update(status='expired', artifact=None)
+        expired += 1
+
+    failed = ExportJob.objects.filter(
+        status__in=['pending', 'running'], updated_at__lt=jobs.stale_before()
+    ).update(status='failed', error_message='Export did not finish (worker stopped)', completed_at=now)
+    return expired, failed
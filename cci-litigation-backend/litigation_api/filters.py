@@ -0,0 +1,98 @@
+"""
+Case list filters shared by CaseViewSet and background jobs.
+
+``filter_cases`` takes any mapping with ``.get()`` (request.query_params or a
+plain dict stored on a job row), so an export built later in a worker sees
+exactly the rows the list endpoint would have returned.
+"""
+import hashlib
+import json
+import logging
+from datetime import datetime
+
+from .models import Case
+from .search import search_cases
+
+logger = logging.getLogger(__name__)
+
+# Query parameters that change which cases are returned, or their order
+CASE_FILTER_PARAMS = ['search', 'department', 'status', 'date_from', 'date_to', 'sort_by', 'sort_order']
+
+# Map frontend field names to actual model fields
+SORT_FIELD_MAP = {
+    'date_of_institution': 'date_of_filing',
+}
+
+
+def case_filter_params(params):
+    """The filter parameters of ``params`` as a plain dict, blanks dropped"""
+    filters = {}
+    for key in CASE_FILTER_PARAMS:
+        value = params.get(key)
+        if value is not None and str(value).strip():
+            filters[key] = str(value).strip()
+    return filters
+
+
+def case_filter_signature(params, *extra):
+    """Stable hash of the filter parameters (plus any extra discriminators)"""
+    raw = json.dumps([case_filter_params(params), list(extra)], sort_keys=True, default=str)
+    return hashlib.sha256(raw.encode()).hexdigest()
+
+
+def _parse_date(value):
+    try:
+        return datetime.strptime(value, '%d-%m-%Y').date()
+    except (TypeError, ValueError):
+        return None
+
+
+def filter_cases(queryset, params):
+    """Apply search, department, status and date filters plus ordering from ``params``"""
+    # Full-text search (tsvector/GIN on PostgreSQL, FTS5 on SQLite), ranked by relevance
+    search_query = params.get('search', None)
+    if search_query:
+        queryset = search_cases(queryset, search_query)
+
+    # Department filter
+    department = params.get('department', None)
+    if department:
+        queryset = queryset.filter(internal_department=department)
+
+    # Status filter
+    status_filter = params.get('status', None)
+    if status_filter:
+        queryset = queryset.filter(present_status__icontains=status_filter)
+
+    # Date range filters (DD-MM-YYYY); unparseable dates are ignored
+    date_from = _parse_date(params.get('date_from', None))
+    if date_from:
+        queryset = queryset.filter(date_of_filing__gte=date_from)
+
+    date_to = _parse_date(params.get('date_to', None))
+    if date_to:
+        queryset = queryset.filter(date_of_filing__lte=date_to)
+
+    # Sorting
+    sort_by = params.get('sort_by', None)
+    sort_order = params.get('sort_order', 'desc')
+
+    # Searches without an explicit sort are ordered by relevance
+    if search_query and not sort_by and 'search_rank' in queryset.query.annotations:
+        return queryset.order_by('-search_rank', '-date_of_filing', '-id')
+
+    sort_by = SORT_FIELD_MAP.get(sort_by, sort_by) or 'date_of_filing'
+
+    # Validate sort field
+    allowed_sort_fields = [f.name for f in Case._meta.get_fields()]
+    if sort_by not in allowed_sort_fields:
+        sort_by = 'date_of_filing'
+
+    if sort_order == 'desc':
+        sort_by = f'-{sort_by}'
+
+    try:
+        return queryset.order_by(sort_by)
+    except Exception as e:
+        logger.warning(f"Invalid sort_by '{sort_by}', defaulting to date_of_filing. Error: {e}")
+        return queryset.order_by('-date_of_filing')
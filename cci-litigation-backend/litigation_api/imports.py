@@ -0,0 +1,1014 @@
+"""
+Bulk case import.
+
+Pasted rows follow the 19 columns of the litigation register (the same order
+as the Excel export). Rows are validated in memory with
+``CaseImportSerializer`` - CaseSerializer's rules without its per-row
+uniqueness queries - then duplicates are resolved with one ``case_id__in``
+lookup per batch and the valid rows are inserted with ``bulk_create`` in one
+transaction per batch, so an import costs a handful of queries per batch
+instead of several per row.
+
+``bulk_create`` sends no signals, so the search index, statistics rollup and
+case list cache are brought up to date explicitly after each batch.
+
+In upsert mode rows whose (case_type, case_number, case_year) already exists
+update that case instead of being skipped. Each batch loads the existing
+cases with one query and compares a content hash of the register columns;
+unchanged rows are not written at all and the changed ones go out in one
+``bulk_update``, with the same explicit bookkeeping as inserts.
+
+Imports can also be staged: the preview validates every row once and keeps
+the normalized values as ``ImportStagedRow`` rows under an ``ImportSession``
+token. The client pages through the validation results and commits the
+session, which inserts straight from staging without parsing anything again.
+
+Validation is pure CPU work; large imports shard their batches across a
+process pool (``IMPORT_VALIDATION_WORKERS``) and merge the results back in
+row order, while duplicate checks and inserts stay in the calling process.
+
+Registers can be uploaded as .xlsx (read with openpyxl in read-only mode) or
+CSV (parsed as the file is read). Rows flow lazily through the same batched
+pipeline into staging, so memory use does not grow with the file.
+
+Large imports can run as ``ImportJob`` rows in the local worker pool
+(jobs.py) instead of inside the request. Each batch writes its cases, its
+row errors and the job's checkpoint in one transaction, so polling shows
+committed progress and a job interrupted by a crash or restart resumes
+after its last committed batch.
+"""
+import csv
+import hashlib
+import io
+import logging
+import multiprocessing
+import os
+import re
+import threading
+import zipfile
+from collections import Counter, deque
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+from itertools import chain, islice
+
+import django
+from django.conf import settings
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.db import IntegrityError, transaction
+from django.db.models import F
+from django.utils import timezone
+from openpyxl import load_workbook
+from openpyxl.utils.exceptions import InvalidFileException
+from rest_framework import serializers
+
+from . import jobs, search, stats
+from .caching import bump_case_generation
+from .exports import EXCEL_HEADER_ROW_1, EXCEL_HEADER_ROW_2
+from .models import Case, ImportJob, ImportJobRowError, ImportSession, ImportStagedRow
+from .serializers import CaseImportSerializer
+
+logger = logging.getLogger(__name__)
+
+# Register columns, in the order they are pasted / exported
+IMPORT_COLUMNS = [
+    'case_type', 'case_number', 'case_year', 'date_of_filing', 'pending_before_court',
+    'party_petitioner', 'party_respondent', 'nature_of_claim', 'advocate_name', 'advocate_email',
+    'advocate_mobile', 'financial_implications', 'internal_department', 'last_hearing_date',
+    'next_hearing_date', 'brief_description', 'relief_claimed', 'present_status', 'case_remarks',
+]
+
+MIN_IMPORT_COLUMNS = 3
+
+IMPORT_MODES = ('insert', 'upsert')
+
+# The unique_together key; an upsert matches on it and never changes it
+KEY_FIELDS = ('case_type', 'case_number', 'case_year')
+UPSERT_FIELDS = [field for field in IMPORT_COLUMNS if field not in KEY_FIELDS]
+
+DATE_FIELDS = ('date_of_filing', 'last_hearing_date', 'next_hearing_date')
+OPTIONAL_FIELDS = ('financial_implications', 'last_hearing_date', 'next_hearing_date', 'case_remarks')
+
+PARTY_FIELDS = ('party_petitioner', 'party_respondent')
+NUMBERED_LINE = re.compile(r'^\d+\.\s*')
+
+# DD-MM-YYYY as shown in the register, plus ISO
+DATE_INPUT_FORMATS = ('%d-%m-%Y', '%d/%m/%Y', '%d.%m.%Y', '%Y-%m-%d')
+
+
+def import_batch_size():
+    return getattr(settings, 'CCI_LITIGATION_SETTINGS', {}).get('IMPORT_BATCH_SIZE', 500)
+
+
+def _normalize_date(value):
+    """ISO date string for a register date, or the value unchanged for the serializer to reject"""
+    for fmt in DATE_INPUT_FORMATS:
+        try:
+            return datetime.strptime(value, fmt).date().isoformat()
+        except ValueError:
+            continue
+    return value
+
+
+def _normalize_amount(value):
+    """'Rs. 1,00,000.00' -> '100000.00'"""
+    return re.sub(r'[^\d.\-]', '', value.replace('Rs.', ''))
+
+
+def _cell_text(cell):
+    """Pasted text or a spreadsheet cell value as text"""
+    if cell is None:
+        return ''
+    if isinstance(cell, datetime):
+        cell = cell.date()
+    if isinstance(cell, date):
+        return cell.isoformat()
+    if isinstance(cell, float) and cell.is_integer():
+        return str(int(cell))
+    return str(cell).strip()
+
+
+def _normalize_party_list(value):
+    """Undo the export's numbered one-per-line party list: '1. A\n2. B' -> 'A, B'"""
+    lines = [line.strip() for line in value.splitlines() if line.strip()]
+    if len(lines) > 1 or (lines and NUMBERED_LINE.match(lines[0])):
+        return ', '.join(NUMBERED_LINE.sub('', line) for line in lines)
+    return value
+
+
+def row_to_case_data(row, default_department=''):
+    """Serializer input for one pasted row (missing trailing cells count as blank)"""
+    values = [_cell_text(cell) for cell in row[:len(IMPORT_COLUMNS)]]
+    values += [''] * (len(IMPORT_COLUMNS) - len(values))
+    data = dict(zip(IMPORT_COLUMNS, values))
+
+    if not data['internal_department']:
+        data['internal_department'] = default_department or ''
+    for field in DATE_FIELDS:
+        if data[field]:
+            data[field] = _normalize_date(data[field])
+    for field in PARTY_FIELDS:
+        data[field] = _normalize_party_list(data[field])
+    # Same clean-up as validate_advocate_mobile, ahead of the max_length check
+    data['advocate_mobile'] = re.sub(r'[\s\-()]', '', data['advocate_mobile'])
+    if data['financial_implications']:
+        data['financial_implications'] = _normalize_amount(data['financial_implications'])
+    for field in OPTIONAL_FIELDS:
+        if not data[field]:
+            data[field] = None
+    return data
+
+
+def format_validation_errors(detail):
+    """Flatten serializer error detail into 'field: message; ...'"""
+    if isinstance(detail, dict):
+        return '; '.join(
+            f"{field}: {format_validation_errors(messages)}" if field != 'non_field_errors'
+            else format_validation_errors(messages)
+            for field, messages in detail.items()
+        )
+    if isinstance(detail, list):
+        return ' '.join(format_validation_errors(message) for message in detail)
+    return str(detail)
+
+
+def case_id_for(data):
+    return f"{data['case_type']}/{data['case_number']}/{data['case_year']}"
+
+
+def validate_rows(numbered_rows, default_department=''):
+    """
+    Validate (row number, cells) pairs in memory; yields (row number,
+    validated data, error) with exactly one of data / error set. Pure CPU
+    work with no database access, so it can run in a worker process.
+    """
+    serializer = CaseImportSerializer()
+    for row_number, row in numbered_rows:
+        if not isinstance(row, (list, tuple)) or len(row) < MIN_IMPORT_COLUMNS:
+            yield row_number, None, f'Insufficient columns (minimum {MIN_IMPORT_COLUMNS} required)'
+            continue
+        try:
+            data = serializer.run_validation(row_to_case_data(row, default_department))
+            build_case(case_id_for(data), data).clean()
+        except serializers.ValidationError as e:
+            yield row_number, None, format_validation_errors(e.detail)
+            continue
+        except DjangoValidationError as e:
+            yield row_number, None, format_validation_errors(e.message_dict)
+            continue
+        yield row_number, data, None
+
+
+def validate_batch(numbered_rows, default_department=''):
+    return list(validate_rows(numbered_rows, default_department))
+
+
+def existing_case_ids(case_ids):
+    """The subset of ``case_ids`` already in the case table (one query)"""
+    if not case_ids:
+        return set()
+    return set(Case.objects.filter(case_id__in=case_ids).values_list('case_id', flat=True))
+
+
+def insert_cases(cases):
+    """
+    bulk_create ``cases`` in one transaction and do the bookkeeping the Case
+    signals would have done.
+    """
+    with transaction.atomic():
+        created = Case.objects.bulk_create(cases)
+        stats.record_cases_added(created)
+        search.index_cases([case.pk for case in created])
+    return created
+
+
+def build_case(case_id, data, user=None):
+    """Unsaved Case from validated (or staged JSON) field values"""
+    case = Case(case_id=case_id, created_by=user, last_updated_by=user)
+    for name, value in data.items():
+        field = Case._meta.get_field(name)
+        setattr(case, field.attname, field.to_python(value))
+    return case
+
+
+def iter_batches(rows, batch_size):
+    """Lists of up to ``batch_size`` items from any iterable, read lazily"""
+    rows = iter(rows)
+    while True:
+        batch = list(islice(rows, batch_size))
+        if not batch:
+            return
+        yield batch
+
+
+# ----- parallel validation -----
+
+_validation_pool = None
+_validation_pool_lock = threading.Lock()
+
+
+def validation_workers():
+    """Worker processes for row validation; 0 or 1 validates in-process"""
+    workers = getattr(settings, 'CCI_LITIGATION_SETTINGS', {}).get('IMPORT_VALIDATION_WORKERS')
+    if workers is None:
+        return os.cpu_count() or 1
+    return workers
+
+
+def get_validation_pool():
+    """The shared validation process pool, created on first use"""
+    global _validation_pool
+    with _validation_pool_lock:
+        if _validation_pool is None:
+            # spawn, not fork: a forked child would inherit this process's
+            # database connections and the background job threads. Workers
+            # set Django up before unpickling any task (which imports this module).
+            _validation_pool = ProcessPoolExecutor(
+                max_workers=validation_workers(),
+                mp_context=multiprocessing.get_context('spawn'),
+                initializer=django.setup,
+            )
+        return _validation_pool
+
+
+def _reset_validation_pool():
+    global _validation_pool
+    with _validation_pool_lock:
+        if _validation_pool is not None:
+            _validation_pool.shutdown(wait=False, cancel_futures=True)
+        _validation_pool = None
+
+
+def _validate_in_pool(batches, default_department, workers):
+    """validate_batch() over ``batches`` in the process pool, results in input order"""
+    pool = get_validation_pool()
+    # A bounded window of batches in flight keeps a streamed file out of memory
+    in_flight = deque()
+    try:
+        for batch in batches:
+            in_flight.append(pool.submit(validate_batch, batch, default_department))
+            if len(in_flight) >= workers * 2:
+                yield in_flight.popleft().result()
+        while in_flight:
+            yield in_flight.popleft().result()
+    except BrokenProcessPool:
+        _reset_validation_pool()
+        raise
+    finally:
+        for future in in_flight:
+            future.cancel()
+
+
+def iter_validated_batches(numbered_rows, default_department='', batch_size=None):
+    """
+    validate_batch() results for each batch of (row number, cells) pairs, in
+    row order. Imports of at least IMPORT_PARALLEL_MIN_ROWS rows are sharded
+    across the validation process pool; smaller ones (where starting the
+    workers would cost more than it saves) validate in-process.
+    """
+    batches = iter_batches(numbered_rows, batch_size or import_batch_size())
+    workers = validation_workers()
+    if workers <= 1:
+        for batch in batches:
+            yield validate_batch(batch, default_department)
+        return
+
+    min_rows = getattr(settings, 'CCI_LITIGATION_SETTINGS', {}).get('IMPORT_PARALLEL_MIN_ROWS', 5000)
+    head, head_rows = [], 0
+    for batch in batches:
+        head.append(batch)
+        head_rows += len(batch)
+        if head_rows >= min_rows:
+            break
+    if head_rows < min_rows:
+        for batch in head:
+            yield validate_batch(batch, default_department)
+        return
+    yield from _validate_in_pool(chain(head, batches), default_department, workers)
+
+
+def check_batch(validated, seen=None, mode='insert', user=None):
+    """
+    Resolve duplicates for one batch of validate_batch() results with one lookup.
+
+    Returns [(row number, status, case_id, data, error, changed fields)] in
+    row order, status being 'valid', 'error' or 'duplicate'. ``seen`` carries
+    the case ids of earlier batches so repeats within one import are caught
+    as well. In upsert mode a row matching an existing case is 'update' or
+    'unchanged' instead of a duplicate (or an error if ``user`` may not edit
+    that case).
+    """
+    seen = set() if seen is None else seen
+    checked = [
+        [row_number, 'error' if error else 'valid', case_id_for(data) if data else '', data, error, []]
+        for row_number, data, error in validated
+    ]
+    case_ids = {entry[2] for entry in checked if entry[1] == 'valid'}
+    if mode == 'upsert':
+        existing = existing_cases(case_ids)
+    else:
+        existing = existing_case_ids(case_ids)
+
+    for entry in checked:
+        row_number, row_status, case_id, data, _, _ = entry
+        if row_status != 'valid':
+            continue
+        if case_id in seen:
+            entry[1], entry[4] = 'duplicate', f'Case ID {case_id} appears more than once in this import'
+            continue
+        seen.add(case_id)
+        if case_id not in existing:
+            continue
+        if mode == 'upsert':
+            entry[1], entry[4], entry[5] = compare_case(existing[case_id], data, user)
+        else:
+            entry[1], entry[4] = 'duplicate', f'Case ID {case_id} already exists'
+    return [tuple(entry) for entry in checked]
+
+
+def insert_batch(pending):
+    """
+    Insert [(row, Case)] pairs; returns (inserted, taken), ``taken`` being the
+    pairs whose case id a concurrent writer inserted after the duplicate lookup.
+    """
+    try:
+        insert_cases([case for _, case in pending])
+        return pending, []
+    except IntegrityError:
+        taken_ids = existing_case_ids({case.case_id for _, case in pending})
+        inserted = [item for item in pending if item[1].case_id not in taken_ids]
+        insert_cases([case for _, case in inserted])
+        return inserted, [item for item in pending if item[1].case_id in taken_ids]
+
+
+# ----- upserts -----
+
+def existing_cases(case_ids, for_update=False):
+    """{case_id: Case} for the ``case_ids`` already in the case table (one query)"""
+    if not case_ids:
+        return {}
+    queryset = Case.objects.filter(case_id__in=case_ids)
+    if for_update:
+        queryset = queryset.select_for_update()
+    return {case.case_id: case for case in queryset}
+
+
+def _comparable(field_name, value):
+    """A field value as canonical text, whether validated, staged JSON or loaded from the database"""
+    value = Case._meta.get_field(field_name).to_python(value)
+    if value is None:
+        return ''
+    if isinstance(value, Decimal):
+        return f'{value:.2f}'
+    if isinstance(value, date):
+        return value.isoformat()
+    return str(value).strip()
+
+
+def content_hash(values):
+    """sha256 of the register columns of a Case or a dict of field values"""
+    get = values.get if isinstance(values, dict) else lambda name: getattr(values, name)
+    digest = hashlib.sha256()
+    for field_name in IMPORT_COLUMNS:
+        digest.update(_comparable(field_name, get(field_name)).encode())
+        digest.update(b'\x1f')
+    return digest.hexdigest()
+
+
+def compare_case(case, data, user=None):
+    """
+    (status, error, changed fields) for an upsert row matching ``case``:
+    'unchanged' when the content hashes agree, 'update' otherwise, or
+    'error' when ``user`` may not edit the case.
+    """
+    if user is not None and not user.can_edit_case(case):
+        return 'error', f'Case ID {case.case_id} belongs to {case.internal_department}', []
+    if content_hash(case) == content_hash(data):
+        return 'unchanged', '', []
+    changed = [
+        field_name for field_name in UPSERT_FIELDS
+        if _comparable(field_name, getattr(case, field_name)) != _comparable(field_name, data.get(field_name))
+    ]
+    return 'update', '', changed
+
+
+def upsert_batch(pending, user=None):
+    """
+    Insert or update [(key, case_id, data)] in one transaction.
+
+    Existing cases are loaded (and locked) with one query; rows whose content
+    hash matches are left alone and the rest are written with one bulk_update
+    of just the changed columns. Returns [(key, outcome, case, changed fields,
+    error)] in input order, outcome being 'inserted', 'updated', 'unchanged'
+    or 'error'.
+    """
+    outcomes = {}
+    inserts, updates = [], []
+    update_fields = set()
+    deltas = Counter()
+    now = timezone.now()
+
+    with transaction.atomic():
+        current = existing_cases({case_id for _, case_id, _ in pending}, for_update=True)
+        for index, (key, case_id, data) in enumerate(pending):
+            case = current.get(case_id)
+            if case is None:
+                inserts.append((index, build_case(case_id, data, user)))
+                continue
+            row_status, error, changed = compare_case(case, data, user)
+            if row_status != 'update':
+                outcomes[index] = (key, row_status, case, [], error)
+                continue
+
+            deltas[stats.case_rollup_key(case)] -= 1
+            for field_name in changed:
+                field = Case._meta.get_field(field_name)
+                setattr(case, field.attname, field.to_python(data.get(field_name)))
+            # bulk_update skips auto_now; delta sync relies on updated_at moving
+            case.last_updated_by = user
+            case.updated_at = now
+            deltas[stats.case_rollup_key(case)] += 1
+            update_fields.update(changed)
+            updates.append(case)
+            outcomes[index] = (key, 'updated', case, changed, '')
+
+        if updates:
+            Case.objects.bulk_update(updates, sorted(update_fields) + ['last_updated_by', 'updated_at'])
+            stats.apply_rollup_deltas(deltas)
+            search.index_cases([case.pk for case in updates])
+
+        if inserts:
+            inserted, taken = insert_batch(inserts)
+            for index, case in inserted:
+                outcomes[index] = (pending[index][0], 'inserted', case, [], '')
+            if taken:
+                # Created by someone else since the lookup: update those instead
+                retried = upsert_batch([pending[index] for index, _ in taken], user)
+                for (index, _), outcome in zip(taken, retried):
+                    outcomes[index] = outcome
+
+    return [outcomes[index] for index in range(len(pending))]
+
+
+class CaseImportResult:
+    """Outcome of an import: per-row outcomes plus errors (1-based row numbers)"""
+
+    def __init__(self):
+        self.created = []
+        self.updated = []
+        self.unchanged = []
+        self.skipped = 0
+        self.errors = []
+
+    def add_error(self, row_number, error):
+        self.errors.append({'row': row_number, 'error': error})
+
+
+def import_batch(checked, user=None, mode='insert'):
+    """
+    Write one batch of check_batch() results: insert the valid rows (and in
+    upsert mode update the matched cases). Returns [(row number, outcome,
+    case_id, case, changed fields, error)] in row order, outcome being
+    'inserted', 'updated', 'unchanged', 'duplicate' or 'error'.
+    """
+    outcomes = []
+    pending = []
+    for row_number, row_status, case_id, data, error, _ in checked:
+        if row_status in ('error', 'duplicate'):
+            outcomes.append((row_number, row_status, case_id, None, [], error))
+        elif mode == 'upsert':
+            pending.append((row_number, case_id, data))
+        else:
+            pending.append((row_number, build_case(case_id, data, user)))
+    if not pending:
+        return outcomes
+
+    if mode == 'upsert':
+        outcomes += [
+            (row_number, outcome, case.case_id, case, changed, error)
+            for row_number, outcome, case, changed, error in upsert_batch(pending, user)
+        ]
+    else:
+        inserted, taken = insert_batch(pending)
+        outcomes += [(row_number, 'inserted', case.case_id, case, [], '') for row_number, case in inserted]
+        outcomes += [
+            (row_number, 'duplicate', case.case_id, None, [], f'Case ID {case.case_id} already exists')
+            for row_number, case in taken
+        ]
+    return sorted(outcomes, key=lambda outcome: outcome[0])
+
+
+def import_case_rows(rows, user=None, skip_duplicates=True, validate_only=False, batch_size=None, mode='insert'):
+    """
+    Validate and insert pasted register rows batch by batch.
+
+    Rows that duplicate an existing case, or an earlier row of the same import,
+    are skipped or reported as errors depending on ``skip_duplicates``. In
+    ``upsert`` mode rows matching an existing case update it instead and are
+    reported in ``result.updated`` / ``result.unchanged``. With
+    ``validate_only`` nothing is written and ``result.created`` lists the
+    validated rows instead of new cases.
+    """
+    result = CaseImportResult()
+    seen = set()
+
+    def reject_duplicate(row_number, message):
+        if skip_duplicates:
+            result.skipped += 1
+        else:
+            result.add_error(row_number, message)
+
+    department = user.department_name if user is not None else ''
+    for validated in iter_validated_batches(enumerate(rows, start=1), department, batch_size):
+        checked = check_batch(validated, seen, mode, user)
+        if validate_only:
+            for row_number, row_status, case_id, data, error, changed in checked:
+                if row_status == 'error':
+                    result.add_error(row_number, error)
+                elif row_status == 'duplicate':
+                    reject_duplicate(row_number, error)
+                elif row_status == 'update':
+                    result.updated.append({'row': row_number, 'case_id': case_id, 'changed_fields': changed})
+                elif row_status == 'unchanged':
+                    result.unchanged.append({'row': row_number, 'case_id': case_id})
+                else:
+                    result.created.append({'row': row_number, 'case_id': case_id, **data})
+            continue
+
+        for row_number, outcome, case_id, case, changed, error in import_batch(checked, user, mode):
+            if outcome == 'error':
+                result.add_error(row_number, error)
+            elif outcome == 'duplicate':
+                reject_duplicate(row_number, error)
+            elif outcome == 'updated':
+                result.updated.append({'row': row_number, 'case_id': case_id, 'id': case.pk, 'changed_fields': changed})
+            elif outcome == 'unchanged':
+                result.unchanged.append({'row': row_number, 'case_id': case_id, 'id': case.pk})
+            else:
+                result.created.append({'row': row_number, 'case_id': case_id, 'id': case.pk})
+
+    if (result.created or result.updated) and not validate_only:
+        transaction.on_commit(bump_case_generation)
+        logger.info(
+            f"Bulk import: created {len(result.created)} cases, updated {len(result.updated)}, "
+            f"unchanged {len(result.unchanged)}, skipped {result.skipped}"
+        )
+    return result
+
+
+# ----- staged imports -----
+
+class ImportSessionError(Exception):
+    """The import session cannot be committed in its current state"""
+
+
+def staging_hours():
+    return getattr(settings, 'CCI_LITIGATION_SETTINGS', {}).get('IMPORT_STAGING_HOURS', 24)
+
+
+def stage_import(numbered_rows, user, source='paste', batch_size=None, mode='insert'):
+    """
+    Parse, validate and duplicate-check (row number, cells) pairs once and
+    keep the outcome as an ImportSession, so the client can page through it
+    and commit later without the rows being parsed again. Rows are read
+    lazily batch by batch, so a streamed file is never held in memory.
+    In upsert mode rows matching an existing case are staged as 'update'
+    (with the fields they change) or 'unchanged'.
+    """
+    session = ImportSession.objects.create(
+        created_by=user,
+        source=source,
+        mode=mode,
+        expires_at=timezone.now() + timedelta(hours=staging_hours()),
+    )
+    counts = Counter()
+    seen = set()
+    try:
+        for validated in iter_validated_batches(numbered_rows, user.department_name, batch_size):
+            staged = []
+            for row_number, row_status, case_id, data, error, changed in check_batch(validated, seen, mode, user):
+                counts[row_status] += 1
+                staged.append(ImportStagedRow(
+                    session=session, row_number=row_number, status=row_status,
+                    case_id=case_id, data=data or {}, changed_fields=changed, error=error or '',
+                ))
+            ImportStagedRow.objects.bulk_create(staged)
+    except Exception:
+        # Unreadable input part way through: drop the partial session
+        session.delete()
+        raise
+
+    session.total_rows = sum(counts.values())
+    session.valid_rows = counts['valid']
+    session.error_rows = counts['error']
+    session.duplicate_rows = counts['duplicate']
+    session.update_rows = counts['update']
+    session.unchanged_rows = counts['unchanged']
+    session.save(update_fields=[
+        'total_rows', 'valid_rows', 'error_rows', 'duplicate_rows', 'update_rows', 'unchanged_rows'
+    ])
+    logger.info(
+        f"Import {session.pk} staged for {user.username}: {session.valid_rows} valid, "
+        f"{session.update_rows} updates, {session.error_rows} errors, {session.duplicate_rows} duplicates"
+    )
+    return session
+
+
+def commit_import_session(session, batch_size=None):
+    """
+    Insert the staged valid rows of ``session``. Duplicates found at preview,
+    or created by someone else since, are skipped. Rows are marked created /
+    skipped batch by batch in the same transaction as the insert.
+
+    An upsert session also applies its 'update' and 'unchanged' rows through
+    upsert_batch(), which compares against the cases as they are at commit
+    time rather than trusting the preview's classification.
+    """
+    claimed = ImportSession.objects.filter(
+        pk=session.pk, status='staged', expires_at__gt=timezone.now()
+    ).update(status='committing')
+    if not claimed:
+        session.refresh_from_db()
+        state = 'expired' if session.status == 'staged' else session.status
+        raise ImportSessionError(f'This import is {state} and cannot be committed')
+
+    batch_size = batch_size or import_batch_size()
+    upsert = session.mode == 'upsert'
+    pending_statuses = ['valid', 'update', 'unchanged'] if upsert else ['valid']
+    outcomes = Counter()
+    last_row = 0
+    try:
+        while True:
+            staged = list(
+                session.rows.filter(status__in=pending_statuses, row_number__gt=last_row)
+                .order_by('row_number')[:batch_size]
+            )
+            if not staged:
+                break
+            last_row = staged[-1].row_number
+
+            if upsert:
+                outcomes.update(_commit_upsert_rows(staged, session.created_by))
+                continue
+
+            existing = existing_case_ids({row.case_id for row in staged})
+            taken = [row for row in staged if row.case_id in existing]
+            pending = [
+                (row, build_case(row.case_id, row.data, session.created_by))
+                for row in staged if row.case_id not in existing
+            ]
+            with transaction.atomic():
+                inserted, raced = insert_batch(pending) if pending else ([], [])
+                taken += [row for row, _ in raced]
+                ImportStagedRow.objects.filter(pk__in=[row.pk for row, _ in inserted]).update(status='created')
+                ImportStagedRow.objects.filter(pk__in=[row.pk for row in taken]).update(
+                    status='skipped', error='Case ID already exists'
+                )
+            outcomes['inserted'] += len(inserted)
+            outcomes['skipped'] += len(taken)
+    except Exception as e:
+        logger.error(f"Import {session.pk} commit failed: {str(e)}")
+        ImportSession.objects.filter(pk=session.pk).update(status='failed', error_message=str(e))
+        raise
+
+    session.status = 'committed'
+    session.committed_at = timezone.now()
+    session.created_count = outcomes['inserted']
+    session.updated_count = outcomes['updated']
+    session.unchanged_count = outcomes['unchanged']
+    session.skipped_count = outcomes['skipped'] + outcomes['error'] + session.duplicate_rows
+    session.save(update_fields=[
+        'status', 'committed_at', 'created_count', 'updated_count', 'unchanged_count', 'skipped_count'
+    ])
+    if session.created_count or session.updated_count:
+        transaction.on_commit(bump_case_generation)
+    logger.info(
+        f"Import {session.pk} committed: {session.created_count} cases created, "
+        f"{session.updated_count} updated, {session.skipped_count} skipped"
+    )
+    return session
+
+
+STAGED_OUTCOME_STATUS = {'inserted': 'created', 'updated': 'updated', 'unchanged': 'unchanged', 'error': 'error'}
+
+
+def _commit_upsert_rows(staged, user):
+    """upsert_batch() one batch of staged rows and record each row's outcome; returns outcome counts"""
+    with transaction.atomic():
+        results = upsert_batch([(row, row.case_id, row.data) for row in staged], user)
+        for row, outcome, _, changed, error in results:
+            row.status = STAGED_OUTCOME_STATUS[outcome]
+            row.changed_fields = changed
+            row.error = error
+        ImportStagedRow.objects.bulk_update(staged, ['status', 'changed_fields', 'error'])
+    return Counter(outcome for _, outcome, _, _, _ in results)
+
+
+def purge_import_sessions():
+    """Delete sessions (and their staged rows) past expiry; returns the number deleted"""
+    expired = ImportSession.objects.filter(expires_at__lte=timezone.now()).exclude(status='committing')
+    return expired.delete()[1].get('litigation_api.ImportSession', 0)
+
+
+# ----- register file uploads -----
+
+class ImportFileError(ValueError):
+    """Uploaded file is not a readable case register"""
+
+
+IMPORT_FILE_TYPES = ('.xlsx', '.csv')
+
+# Sheet written by export_excel; other workbooks use their first sheet
+REGISTER_SHEET_NAME = 'CCI Litigation Cases'
+
+# First cell of the two register header rows ("Case Number" / "Type")
+REGISTER_HEADER_MARKERS = {EXCEL_HEADER_ROW_1[0].lower(), EXCEL_HEADER_ROW_2[0].lower()}
+
+
+def register_rows(numbered_rows):
+    """
+    Data rows of a register as (row number, cells in IMPORT_COLUMNS order).
+
+    Blank rows and the two-row merged header of the Excel register are
+    dropped. A header of field names (as in the CSV export) maps the columns
+    by name instead of position.
+    """
+    columns = None
+    seen_data = False
+    for row_number, cells in numbered_rows:
+        cells = [_cell_text(cell) for cell in cells]
+        if not any(cells):
+            continue
+        if not seen_data:
+            if cells[0].lower() in REGISTER_HEADER_MARKERS:
+                continue
+            if 'case_type' in cells:
+                columns = [cells.index(name) if name in cells else None for name in IMPORT_COLUMNS]
+                continue
+        seen_data = True
+        if columns is not None:
+            cells = [cells[i] if i is not None and i < len(cells) else '' for i in columns]
+        yield row_number, cells
+
+
+def iter_xlsx_rows(fileobj):
+    """(row number, cells) from the register sheet, streamed in openpyxl read-only mode"""
+    try:
+        workbook = load_workbook(fileobj, read_only=True, data_only=True)
+    except (InvalidFileException, KeyError, OSError, zipfile.BadZipFile) as e:
+        raise ImportFileError(f'Not a readable .xlsx workbook: {e}')
+    if REGISTER_SHEET_NAME in workbook.sheetnames:
+        sheet = workbook[REGISTER_SHEET_NAME]
+    else:
+        sheet = workbook.worksheets[0]
+
+    def rows():
+        try:
+            yield from enumerate(sheet.iter_rows(max_col=len(IMPORT_COLUMNS), values_only=True), start=1)
+        finally:
+            workbook.close()
+    return rows()
+
+
+def iter_csv_rows(fileobj):
+    """(row number, cells) from a CSV file, decoded and parsed as it is read"""
+    text = io.TextIOWrapper(fileobj, encoding='utf-8-sig', errors='replace', newline='')
+    try:
+        yield from enumerate(csv.reader(text), start=1)
+    except csv.Error as e:
+        raise ImportFileError(f'Not a readable CSV file: {e}')
+    finally:
+        text.detach()
+
+
+def iter_register_file(uploaded_file):
+    """Register data rows of an uploaded .xlsx or .csv file"""
+    extension = os.path.splitext(uploaded_file.name or '')[1].lower()
+    if extension == '.xlsx':
+        rows = iter_xlsx_rows(uploaded_file)
+    elif extension == '.csv':
+        rows = iter_csv_rows(uploaded_file)
+    else:
+        raise ImportFileError(f"Unsupported file type '{extension}'; upload one of: {', '.join(IMPORT_FILE_TYPES)}")
+    return register_rows(rows)
+
+
+def stage_register_file(uploaded_file, user, batch_size=None, mode='insert'):
+    """Stage every row of an uploaded register as an ImportSession"""
+    source = os.path.splitext(uploaded_file.name or '')[1].lower().lstrip('.')
+    return stage_import(iter_register_file(uploaded_file), user, source=source, batch_size=batch_size, mode=mode)
+
+
+# ----- background import jobs -----
+
+def request_import_job(user, paste_data=None, upload=None, mode='insert', skip_duplicates=True):
+    """
+    Queue an ImportJob for pasted rows or an uploaded .xlsx / .csv register.
+    The input is stored with the job so that it can be resumed.
+    """
+    resume_import_jobs()
+
+    job = ImportJob(created_by=user, mode=mode, skip_duplicates=skip_duplicates)
+    if upload is not None:
+        extension = os.path.splitext(upload.name or '')[1].lower()
+        if extension not in IMPORT_FILE_TYPES:
+            raise ImportFileError(f"Unsupported file type '{extension}'; upload one of: {', '.join(IMPORT_FILE_TYPES)}")
+        job.source = extension.lstrip('.')
+        job.file_name = upload.name
+        job.upload.save(f"{job.pk}{extension}", upload, save=False)
+    else:
+        job.paste_data = paste_data
+        job.total_rows = len(paste_data)
+    job.save()
+    jobs.submit_on_commit(run_import_job, job.pk)
+    return job
+
+
+def import_job_rows(job):
+    """(row number, cells) input of ``job`` after its last committed batch"""
+    if job.upload:
+        job.upload.open('rb')
+        rows = iter_register_file(job.upload)
+    else:
+        rows = enumerate(job.paste_data or [], start=1)
+    return ((row_number, row) for row_number, row in rows if row_number > job.last_row)
+
+
+def run_import_job(job_id):
+    """Worker entry point: import a pending job's rows batch by batch, from its checkpoint"""
+    claimed = ImportJob.objects.filter(pk=job_id, status='pending').update(
+        status='running', attempts=F('attempts') + 1, updated_at=timezone.now()
+    )
+    if not claimed:
+        return
+
+    job = ImportJob.objects.select_related('created_by').get(pk=job_id)
+    if job.started_at is None:
+        job.started_at = timezone.now()
+        ImportJob.objects.filter(pk=job.pk).update(started_at=job.started_at)
+    if job.last_row:
+        logger.info(f"Import job {job.pk} resuming after row {job.last_row} (attempt {job.attempts})")
+
+    # Repeats of rows committed before a restart are caught as existing cases instead
+    seen = set()
+    try:
+        for validated in iter_validated_batches(import_job_rows(job), job.created_by.department_name):
+            if ImportJob.objects.filter(pk=job.pk, cancel_requested=True).exists():
+                _finish_import_job(job, 'cancelled')
+                return
+            _commit_import_job_batch(job, validated, seen)
+        _finish_import_job(job, 'completed')
+    except Exception as e:
+        logger.error(f"Import job {job.pk} failed after row {job.last_row}: {str(e)}")
+        ImportJob.objects.filter(pk=job.pk).update(
+            status='failed', error_message=str(e), completed_at=timezone.now()
+        )
+    finally:
+        if job.upload:
+            job.upload.close()
+
+
+IMPORT_JOB_COUNTERS = {
+    'inserted': 'created_count', 'updated': 'updated_count', 'unchanged': 'unchanged_count',
+    'skipped': 'skipped_count', 'error': 'error_count',
+}
+
+
+def _commit_import_job_batch(job, validated, seen):
+    """Write one validated batch, its row errors and the job checkpoint in one transaction"""
+    counts = Counter()
+    row_errors = []
+    with transaction.atomic():
+        checked = check_batch(validated, seen, job.mode, job.created_by)
+        for row_number, outcome, case_id, _, _, error in import_batch(checked, job.created_by, job.mode):
+            if outcome == 'duplicate' and job.skip_duplicates:
+                outcome = 'skipped'
+            elif outcome in ('duplicate', 'error'):
+                outcome = 'error'
+                row_errors.append(ImportJobRowError(job=job, row_number=row_number, case_id=case_id, error=error))
+            counts[outcome] += 1
+        ImportJobRowError.objects.bulk_create(row_errors)
+
+        job.last_row = validated[-1][0]
+        ImportJob.objects.filter(pk=job.pk).update(
+            last_row=job.last_row,
+            processed_rows=F('processed_rows') + len(validated),
+            updated_at=timezone.now(),
+            **{field: F(field) + counts[outcome] for outcome, field in IMPORT_JOB_COUNTERS.items() if counts[outcome]}
+        )
+    if counts['inserted'] or counts['updated']:
+        transaction.on_commit(bump_case_generation)
+
+
+def _finish_import_job(job, final_status):
+    """Mark ``job`` completed or cancelled and drop its stored input"""
+    if job.upload:
+        job.upload.close()
+        job.upload.delete(save=False)
+    ImportJob.objects.filter(pk=job.pk).update(
+        status=final_status, paste_data=None, upload=None, completed_at=timezone.now()
+    )
+    job.refresh_from_db()
+    logger.info(
+        f"Import job {job.pk} {final_status}: {job.created_count} created, {job.updated_count} updated, "
+        f"{job.skipped_count} skipped, {job.error_count} errors"
+    )
+
+
+def cancel_import_job(job):
+    """
+    Cancel ``job``: a pending one at once, a running one after the batch in
+    progress commits. Returns False if the job has already finished.
+    """
+    if ImportJob.objects.filter(pk=job.pk, status='pending').update(
+        status='cancelled', cancel_requested=True, completed_at=timezone.now()
+    ):
+        if job.upload:
+            job.upload.delete(save=False)
+        ImportJob.objects.filter(pk=job.pk).update(paste_data=None, upload=None)
+        return True
+    return bool(ImportJob.objects.filter(pk=job.pk, status='running').update(cancel_requested=True))
+
+
+def resume_import_job(job):
+    """Queue a failed job again from its checkpoint; returns False unless it had failed"""
+    if not (job.upload or job.paste_data is not None):
+        return False
+    if not ImportJob.objects.filter(pk=job.pk, status='failed').update(status='pending', error_message=''):
+        return False
+    jobs.submit(run_import_job, job.pk)
+    return True
+
+
+def resume_import_jobs(stale_before=None):
+    """
+    Requeue jobs whose worker stopped (pending or running with no progress
+    since ``stale_before``, by default jobs.stale_before()); jobs that have
+    used up IMPORT_JOB_MAX_ATTEMPTS are failed instead. Returns (resumed, failed).
+    """
+    stale_before = stale_before or jobs.stale_before()
+    max_attempts = jobs.job_setting('IMPORT_JOB_MAX_ATTEMPTS', 3)
+    stalled = ImportJob.objects.filter(status__in=['pending', 'running'], updated_at__lt=stale_before)
+
+    failed = stalled.filter(attempts__gte=max_attempts).update(
+        status='failed', error_message='Import did not finish (worker stopped)', completed_at=timezone.now()
+    )
+    resumed = 0
+    for job_id in stalled.filter(attempts__lt=max_attempts).values_list('pk', flat=True):
+        if ImportJob.objects.filter(pk=job_id, updated_at__lt=stale_before).update(
+            status='pending', updated_at=timezone.now()
+        ):
+            jobs.submit(run_import_job, job_id)
+            resumed += 1
+    return resumed, failed
+
+
+def purge_import_jobs():
+    """Delete finished jobs (and their row errors) past IMPORT_JOB_RETENTION_DAYS; returns the number deleted"""
+    cutoff = timezone.now() - timedelta(days=jobs.job_setting('IMPORT_JOB_RETENTION_DAYS', 7))
+    finished = ImportJob.objects.filter(status__in=['completed', 'cancelled', 'failed'], completed_at__lt=cutoff)
+    for job in finished.exclude(upload=''):
+        if job.upload:
+            job.upload.delete(save=False)
+    return finished.delete()[1].get('litigation_api.ImportJob', 0)
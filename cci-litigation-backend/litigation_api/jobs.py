@@ -0,0 +1,64 @@
+"""
+Local background worker pool.
+
+Long-running work (exports, imports) is handed to a process-wide thread pool
+instead of holding a request worker; no broker is involved. State lives in the
+job's database row, so progress can be polled from any server process and a
+job lost to a restart is recognisable by its stale ``updated_at``.
+"""
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import close_old_connections, transaction
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def job_setting(key, default):
+    return getattr(settings, 'BACKGROUND_JOB_SETTINGS', {}).get(key, default)
+
+
+def get_executor():
+    """The shared pool, created on first use"""
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=job_setting('WORKERS', 2),
+                thread_name_prefix='cci-job',
+            )
+        return _executor
+
+
+def _run(func, args, kwargs):
+    # Worker threads get their own connections; drop them when done
+    close_old_connections()
+    try:
+        return func(*args, **kwargs)
+    except Exception:
+        logger.exception(f"Background job {func.__name__} failed")
+        raise
+    finally:
+        close_old_connections()
+
+
+def submit(func, *args, **kwargs):
+    """Run ``func`` in the pool; returns the Future"""
+    return get_executor().submit(_run, func, args, kwargs)
+
+
+def submit_on_commit(func, *args, **kwargs):
+    """Run ``func`` in the pool once the current transaction commits (so the job row is visible)"""
+    transaction.on_commit(lambda: submit(func, *args, **kwargs))
+
+
+def stale_before():
+    """Running jobs not updated since this moment are presumed dead"""
+    return timezone.now() - timedelta(minutes=job_setting('STALE_AFTER_MINUTES', 30))
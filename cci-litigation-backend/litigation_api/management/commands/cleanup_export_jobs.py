@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+from litigation_api.exports import expire_export_jobs
+
+class Command(BaseCommand):
+    help = 'Delete export artifacts past their retention window and fail jobs whose worker stopped'
+
+    def handle(self, *args, **options):
+        expired, failed = expire_export_jobs()
+        self.stdout.write(
+            self.style.SUCCESS(f"Expired {expired} export artifacts; marked {failed} stalled jobs as failed.")
+        )
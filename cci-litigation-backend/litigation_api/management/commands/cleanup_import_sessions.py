@@ -0,0 +1,12 @@
+from django.core.management.base import BaseCommand
+from litigation_api.imports import purge_import_jobs, purge_import_sessions
+
+class Command(BaseCommand):
+    help = 'Delete staged import sessions (and their rows) past their expiry, and old finished import jobs'
+
+    def handle(self, *args, **options):
+        deleted = purge_import_sessions()
+        deleted_jobs = purge_import_jobs()
+        self.stdout.write(self.style.SUCCESS(
+            f"Deleted {deleted} expired import sessions and {deleted_jobs} finished import jobs."
+        ))
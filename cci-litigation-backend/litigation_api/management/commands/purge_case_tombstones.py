@@ -0,0 +1,9 @@
+from django.core.management.base import BaseCommand
+from litigation_api.delta import purge_tombstones
+
+class Command(BaseCommand):
+    help = 'Delete case tombstones older than the delta sync retention window'
+
+    def handle(self, *args, **options):
+        deleted = purge_tombstones()
+        self.stdout.write(self.style.SUCCESS(f"Purged {deleted} case tombstones."))
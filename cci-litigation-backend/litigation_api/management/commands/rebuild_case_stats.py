@@ -0,0 +1,38 @@
+from django.core.management.base import BaseCommand
+from litigation_api.stats import rebuild_rollup, rollup_drift
+
+class Command(BaseCommand):
+    help = 'Rebuild the case statistics rollup from the case table, or report drift with --verify'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--verify',
+            action='store_true',
+            help='Compare the rollup with the case table without changing it',
+        )
+        parser.add_argument(
+            '--fix',
+            action='store_true',
+            help='With --verify, rebuild the rollup if any drift is found',
+        )
+
+    def handle(self, *args, **options):
+        if not options['verify']:
+            rows = rebuild_rollup()
+            self.stdout.write(self.style.SUCCESS(f"Rebuilt case statistics rollup ({rows} rows)."))
+            return
+
+        drift = rollup_drift()
+        if not drift:
+            self.stdout.write(self.style.SUCCESS('Case statistics rollup matches the case table.'))
+            return
+
+        for (department, bucket, month), stored, actual in drift:
+            self.stdout.write(
+                f"  {department} / {bucket} / {month:%Y-%m}: rollup={stored} actual={actual}"
+            )
+        self.stdout.write(self.style.WARNING(f"{len(drift)} rollup rows have drifted."))
+
+        if options['fix']:
+            rows = rebuild_rollup()
+            self.stdout.write(self.style.SUCCESS(f"Rebuilt case statistics rollup ({rows} rows)."))
@@ -0,0 +1,26 @@
+from django.core.management.base import BaseCommand
+from django.db import connection
+from litigation_api.search import get_search_backend, rebuild_search_index
+
+class Command(BaseCommand):
+    help = 'Rebuild the case full-text search index from the case table'
+
+    def handle(self, *args, **options):
+        backend = get_search_backend()
+        
+        if backend.vendor is None:
+            self.stdout.write(
+                self.style.WARNING(
+                    f"No full-text index available for '{connection.vendor}'. Search uses icontains matching."
+                )
+            )
+            return
+        
+        indexed = rebuild_search_index()
+        
+        if backend.vendor == 'postgresql':
+            self.stdout.write(
+                self.style.SUCCESS(f"search_vector is a generated column; {indexed} cases are indexed.")
+            )
+        else:
+            self.stdout.write(self.style.SUCCESS(f"Rebuilt search index with {indexed} cases."))
@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from litigation_api import jobs
+from litigation_api.imports import resume_import_jobs
+
+class Command(BaseCommand):
+    help = 'Resume import jobs interrupted by a crash or restart from their last committed batch'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--all',
+            action='store_true',
+            help='Resume every unfinished job, not just stale ones (only when no server is running imports)',
+        )
+
+    def handle(self, *args, **options):
+        resumed, failed = resume_import_jobs(timezone.now() if options['all'] else None)
+        self.stdout.write(f"Resuming {resumed} import jobs; marked {failed} as failed after too many attempts.")
+        # The jobs run in this process's worker pool; wait for them before exiting
+        jobs.get_executor().shutdown(wait=True)
+        self.stdout.write(self.style.SUCCESS("Resumed import jobs finished."))
@@ -0,0 +1,147 @@
+import signal
+import time
+from datetime import datetime, timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import close_old_connections
+from django.utils import timezone
+
+from litigation_api.notifications import drain_outbox, notification_setting, queue_due_reminders
+
+# Longest single sleep, so a stop signal is noticed promptly
+SLEEP_STEP_SECONDS = 60
+
+
+class Command(BaseCommand):
+    help = 'Send hearing reminders every day at NOTIFICATION_SETTINGS REMINDER_TIME (runs until stopped)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--once',
+            action='store_true',
+            help='Queue and send due reminders now, then exit',
+        )
+        parser.add_argument(
+            '--at',
+            type=str,
+            help='Override settings and specify the daily run time (HH:MM, local time)',
+        )
+        parser.add_argument(
+            '--days_ahead',
+            type=int,
+            help='Override settings and remind hearings up to this many days ahead',
+        )
+        parser.add_argument(
+            '--digest',
+            action='store_true',
+            help='Send one digest per advocate instead of one reminder per case',
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Show how many reminders are due without queueing them',
+        )
+        parser.add_argument(
+            '--force',
+            action='store_true',
+            help='Run even if auto reminders are disabled',
+        )
+
+    def handle(self, *args, **options):
+        if not notification_setting('AUTO_REMINDERS', True) and not options['force']:
+            self.stdout.write(
+                self.style.WARNING(
+                    'Auto reminders are disabled in settings. Use --force to override.'
+                )
+            )
+            return
+
+        run_at = options['at'] or notification_setting('REMINDER_TIME', '09:00')
+        try:
+            run_at = datetime.strptime(run_at, '%H:%M').time()
+        except ValueError:
+            raise CommandError(f"Invalid reminder time '{run_at}', expected HH:MM")
+
+        if options['days_ahead'] is None:
+            options['days_ahead'] = notification_setting('REMINDER_DAYS_BEFORE', 1)
+        options['digest'] = options['digest'] or notification_setting('REMINDER_DIGEST', False)
+
+        if options['once']:
+            self.run_reminders(options)
+            return
+
+        self.stopping = False
+        signal.signal(signal.SIGTERM, self.stop)
+        signal.signal(signal.SIGINT, self.stop)
+
+        # A start after today's run time (e.g. a restart) catches up at once;
+        # hearings already reminded are skipped, so nothing is sent twice.
+        next_run = self.next_run_time(run_at)
+        if next_run.date() > timezone.localdate():
+            self.run_reminders(options)
+            next_run = self.next_run_time(run_at)
+
+        while not self.stopping:
+            self.stdout.write(f"Next reminder run at {next_run:%Y-%m-%d %H:%M}")
+            if not self.sleep_until(next_run):
+                break
+            self.run_reminders(options)
+            next_run = self.next_run_time(run_at)
+
+        self.stdout.write('Reminder scheduler stopped.')
+
+    def stop(self, signum, frame):
+        self.stopping = True
+
+    def next_run_time(self, run_at):
+        """Next local datetime at ``run_at`` that has not passed yet"""
+        now = timezone.localtime()
+        candidate = timezone.make_aware(datetime.combine(now.date(), run_at))
+        if candidate <= now:
+            candidate = timezone.make_aware(datetime.combine(now.date() + timedelta(days=1), run_at))
+        return candidate
+
+    def sleep_until(self, moment):
+        """Sleep until ``moment``; False if stopped first"""
+        while not self.stopping:
+            remaining = (moment - timezone.now()).total_seconds()
+            if remaining <= 0:
+                return True
+            time.sleep(min(remaining, SLEEP_STEP_SECONDS))
+        return False
+
+    def run_reminders(self, options):
+        close_old_connections()
+        try:
+            counts = queue_due_reminders(
+                days_ahead=options['days_ahead'],
+                sms_enabled=notification_setting('REMINDER_SMS_ENABLED', True),
+                email_enabled=notification_setting('REMINDER_EMAIL_ENABLED', True),
+                dry_run=options['dry_run'],
+                digest=options['digest'],
+            )
+        except Exception as e:
+            self.stdout.write(self.style.ERROR(f"Failed to queue reminders: {e}"))
+            return
+        finally:
+            close_old_connections()
+
+        self.stdout.write(
+            f"Hearings in the next {options['days_ahead']} days: {counts['due']}, "
+            f"reminders queued: {counts['queued']}, failed retried: {counts['retried']}, "
+            f"already reminded: {counts['skipped']}, "
+            f"template errors: {counts['errors']}"
+        )
+
+        if options['dry_run']:
+            self.stdout.write(
+                self.style.WARNING("Dry run mode - no reminders were queued.")
+            )
+            return
+
+        outcomes = drain_outbox()
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Reminders sent: {outcomes['sent']}, failed: {outcomes['failed']}."
+            )
+        )
@@ -0,0 +1,69 @@
+from django.db import migrations
+
+
+CASE_TABLE = 'litigation_api_case'
+FTS_TABLE = 'litigation_api_case_fts'
+
+SEARCH_FIELDS = [
+    ('case_id', 'A'),
+    ('party_petitioner', 'A'),
+    ('party_respondent', 'A'),
+    ('advocate_name', 'A'),
+    ('case_type', 'B'),
+    ('pending_before_court', 'B'),
+    ('internal_department', 'B'),
+    ('nature_of_claim', 'B'),
+    ('present_status', 'C'),
+    ('relief_claimed', 'C'),
+    ('case_remarks', 'C'),
+    ('brief_description', 'D'),
+]
+
+
+def create_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    columns = ', '.join(field for field, _weight in SEARCH_FIELDS)
+
+    if vendor == 'postgresql':
+        vector = ' || '.join(
+            f"setweight(to_tsvector('simple', coalesce({field}, '')), '{weight}')"
+            for field, weight in SEARCH_FIELDS
+        )
+        schema_editor.execute(
+            f"ALTER TABLE {CASE_TABLE} ADD COLUMN search_vector tsvector "
+            f"GENERATED ALWAYS AS ({vector}) STORED"
+        )
+        schema_editor.execute(
+            f"CREATE INDEX litigation_case_search_gin ON {CASE_TABLE} USING GIN (search_vector)"
+        )
+
+    elif vendor == 'sqlite':
+        try:
+            schema_editor.execute(f"CREATE VIRTUAL TABLE {FTS_TABLE} USING fts5({columns}, tokenize='unicode61')")
+        except Exception:
+            # SQLite built without FTS5: search falls back to icontains
+            return
+        schema_editor.execute(
+            f"INSERT INTO {FTS_TABLE} (rowid, {columns}) SELECT id, {columns} FROM {CASE_TABLE}"
+        )
+
+
+def drop_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+
+    if vendor == 'postgresql':
+        schema_editor.execute("DROP INDEX IF EXISTS litigation_case_search_gin")
+        schema_editor.execute(f"ALTER TABLE {CASE_TABLE} DROP COLUMN IF EXISTS search_vector")
+    elif vendor == 'sqlite':
+        schema_editor.execute(f"DROP TABLE IF EXISTS {FTS_TABLE}")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('litigation_api', '0003_alter_case_case_type_alter_case_internal_department'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
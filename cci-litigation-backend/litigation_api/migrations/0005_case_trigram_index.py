@@ -0,0 +1,36 @@
+from django.db import migrations
+
+
+CASE_TABLE = 'litigation_api_case'
+
+FUZZY_FIELDS = ['party_petitioner', 'party_respondent', 'advocate_name']
+
+
+def create_trigram_indexes(apps, schema_editor):
+    # SQLite uses the in-process n-gram index in litigation_api.search instead
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    for field in FUZZY_FIELDS:
+        schema_editor.execute(
+            f"CREATE INDEX IF NOT EXISTS litigation_case_{field}_trgm "
+            f"ON {CASE_TABLE} USING GIN ({field} gin_trgm_ops)"
+        )
+
+
+def drop_trigram_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for field in FUZZY_FIELDS:
+        schema_editor.execute(f"DROP INDEX IF EXISTS litigation_case_{field}_trgm")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('litigation_api', '0004_case_search_index'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_trigram_indexes, drop_trigram_indexes),
+    ]
@@ -0,0 +1,70 @@
+# Generated by Django 5.0.1 on 2026-10-17 02:45
+
+from collections import Counter
+
+from django.db import migrations, models
+from django.db.models import Count
+from django.db.models.functions import TruncMonth
+
+
+PENDING_STATUSES = ['pending', 'under_hearing', 'admitted']
+DISPOSED_STATUSES = ['disposed', 'closed', 'dismissed']
+
+
+def status_bucket(present_status):
+    key = (present_status or '').strip().lower().replace(' ', '_')
+    if key in PENDING_STATUSES:
+        return 'pending'
+    if key in DISPOSED_STATUSES:
+        return 'disposed'
+    return 'other'
+
+
+def populate_rollup(apps, schema_editor):
+    Case = apps.get_model('litigation_api', 'Case')
+    CaseStatsRollup = apps.get_model('litigation_api', 'CaseStatsRollup')
+    counts = Counter()
+    rows = (
+        Case.objects.order_by()
+        .annotate(month=TruncMonth('date_of_filing'))
+        .values('internal_department', 'present_status', 'month')
+        .annotate(total=Count('id'))
+    )
+    for row in rows:
+        counts[(row['internal_department'], status_bucket(row['present_status']), row['month'])] += row['total']
+    CaseStatsRollup.objects.bulk_create([
+        CaseStatsRollup(department=department, status_bucket=bucket, filing_month=month, case_count=total)
+        for (department, bucket, month), total in counts.items()
+    ])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('litigation_api', '0005_case_trigram_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CaseStatsRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('department', models.CharField(max_length=50)),
+                ('status_bucket', models.CharField(choices=[('pending', 'Pending'), ('disposed', 'Disposed'), ('other', 'Other')], max_length=10)),
+                ('filing_month', models.DateField(help_text='First day of the filing month')),
+                ('case_count', models.IntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'Case Statistics Rollup',
+                'verbose_name_plural': 'Case Statistics Rollups',
+                'ordering': ['department', 'filing_month', 'status_bucket'],
+                'indexes': [models.Index(fields=['filing_month'], name='litigation__filing__e757f7_idx')],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='casestatsrollup',
+            constraint=models.UniqueConstraint(fields=('department', 'status_bucket', 'filing_month'), name='unique_case_stats_rollup_key'),
+        ),
+        migrations.RunPython(populate_rollup, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,44 @@
+# Generated by Django 5.0.1 on 2026-10-17 02:50
+
+import django.db.models.deletion
+import uuid
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('litigation_api', '0006_case_stats_rollup'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ExportJob',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('export_format', models.CharField(choices=[('xlsx', 'Excel (.xlsx)')], default='xlsx', max_length=10)),
+                ('filters', models.JSONField(blank=True, default=dict, help_text='Case list filter parameters')),
+                ('include_summary', models.BooleanField(default=False)),
+                ('signature', models.CharField(db_index=True, help_text='Hash of format, filters and options; identical requests share one artifact', max_length=64)),
+                ('data_version', models.CharField(blank=True, help_text='Row count and latest updated_at of the filtered cases when the job was requested', max_length=64)),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('running', 'Running'), ('completed', 'Completed'), ('failed', 'Failed'), ('expired', 'Expired')], default='pending', max_length=10)),
+                ('total_rows', models.IntegerField(blank=True, null=True)),
+                ('processed_rows', models.IntegerField(default=0)),
+                ('artifact', models.FileField(blank=True, null=True, upload_to='exports/')),
+                ('file_name', models.CharField(blank=True, max_length=255)),
+                ('file_size', models.BigIntegerField(blank=True, null=True)),
+                ('error_message', models.TextField(blank=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('started_at', models.DateTimeField(blank=True, null=True)),
+                ('completed_at', models.DateTimeField(blank=True, null=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('expires_at', models.DateTimeField(blank=True, null=True)),
+                ('created_by', models.ForeignKey(null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='export_jobs', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'ordering': ['-created_at'],
+                'indexes': [models.Index(fields=['signature', 'status'], name='litigation__signatu_8015cf_idx'), models.Index(fields=['status', 'expires_at'], name='litigation__status_930aac_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.0.1 on 2026-10-17 02:54
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('litigation_api', '0007_export_job'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='exportjob',
+            name='export_format',
+            field=models.CharField(choices=[('xlsx', 'Excel (.xlsx)'), ('parquet', 'Parquet (.parquet)')], default='xlsx', max_length=10),
+        ),
+    ]
@@ -0,0 +1,41 @@
+# Generated by Django 5.0.1 on 2026-10-17 02:54
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('litigation_api', '0008_export_job_parquet_format'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CaseTombstone',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('case_pk', models.IntegerField(help_text='Primary key the deleted case had')),
+                ('case_id', models.CharField(max_length=50)),
+                ('internal_department', models.CharField(blank=True, max_length=50)),
+                ('deleted_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'ordering': ['deleted_at', 'id'],
+            },
+        ),
+        migrations.AddIndex(
+            model_name='case',
+            index=models.Index(fields=['updated_at', 'id'], name='litigation_case_delta_idx'),
+        ),
+        migrations.AddField(
+            model_name='casetombstone',
+            name='deleted_by',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='deleted_case_tombstones', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddIndex(
+            model_name='casetombstone',
+            index=models.Index(fields=['deleted_at', 'id'], name='litigation__deleted_368163_idx'),
+        ),
+    ]
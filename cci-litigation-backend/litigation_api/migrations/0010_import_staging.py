@@ -0,0 +1,66 @@
+# Generated by Django 5.0.1 on 2026-10-17 03:01
+
+import django.core.serializers.json
+import django.db.models.deletion
+import uuid
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('litigation_api', '0009_case_delta_sync'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ImportSession',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('source', models.CharField(default='paste', help_text='Where the rows came from (paste, file)', max_length=20)),
+                ('status', models.CharField(choices=[('staged', 'Staged'), ('committing', 'Committing'), ('committed', 'Committed'), ('failed', 'Failed'), ('expired', 'Expired')], default='staged', max_length=12)),
+                ('total_rows', models.IntegerField(default=0)),
+                ('valid_rows', models.IntegerField(default=0)),
+                ('error_rows', models.IntegerField(default=0)),
+                ('duplicate_rows', models.IntegerField(default=0)),
+                ('created_count', models.IntegerField(default=0)),
+                ('skipped_count', models.IntegerField(default=0)),
+                ('error_message', models.TextField(blank=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('committed_at', models.DateTimeField(blank=True, null=True)),
+                ('expires_at', models.DateTimeField()),
+                ('created_by', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='import_sessions', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'ordering': ['-created_at'],
+            },
+        ),
+        migrations.CreateModel(
+            name='ImportStagedRow',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('row_number', models.IntegerField()),
+                ('status', models.CharField(choices=[('valid', 'Valid'), ('error', 'Error'), ('duplicate', 'Duplicate'), ('created', 'Created'), ('skipped', 'Skipped')], max_length=10)),
+                ('case_id', models.CharField(blank=True, max_length=50)),
+                ('data', models.JSONField(blank=True, default=dict, encoder=django.core.serializers.json.DjangoJSONEncoder, help_text='Validated case fields, ready to insert')),
+                ('error', models.TextField(blank=True)),
+                ('session', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='rows', to='litigation_api.importsession')),
+            ],
+            options={
+                'ordering': ['session', 'row_number'],
+            },
+        ),
+        migrations.AddIndex(
+            model_name='importsession',
+            index=models.Index(fields=['status', 'expires_at'], name='litigation__status_c4d6a7_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='importstagedrow',
+            index=models.Index(fields=['session', 'status', 'row_number'], name='litigation__session_22a4ac_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='importstagedrow',
+            constraint=models.UniqueConstraint(fields=('session', 'row_number'), name='unique_import_staged_row'),
+        ),
+    ]
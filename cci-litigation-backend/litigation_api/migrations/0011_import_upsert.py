@@ -0,0 +1,48 @@
+# Generated by Django 5.0.1 on 2026-10-17 03:14
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('litigation_api', '0010_import_staging'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='importsession',
+            name='mode',
+            field=models.CharField(choices=[('insert', 'Insert new cases only'), ('upsert', 'Insert new cases, update existing ones')], default='insert', max_length=10),
+        ),
+        migrations.AddField(
+            model_name='importsession',
+            name='unchanged_count',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='importsession',
+            name='unchanged_rows',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='importsession',
+            name='update_rows',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='importsession',
+            name='updated_count',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='importstagedrow',
+            name='changed_fields',
+            field=models.JSONField(blank=True, default=list, help_text='Fields an upsert changes on the existing case'),
+        ),
+        migrations.AlterField(
+            model_name='importstagedrow',
+            name='status',
+            field=models.CharField(choices=[('valid', 'Valid'), ('error', 'Error'), ('duplicate', 'Duplicate'), ('update', 'Update'), ('unchanged', 'Unchanged'), ('created', 'Created'), ('updated', 'Updated'), ('skipped', 'Skipped')], max_length=10),
+        ),
+    ]
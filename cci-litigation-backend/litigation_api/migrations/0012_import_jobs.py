@@ -0,0 +1,69 @@
+# Generated by Django 5.0.1 on 2026-10-17 03:17
+
+import django.db.models.deletion
+import uuid
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('litigation_api', '0011_import_upsert'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ImportJob',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('source', models.CharField(default='paste', help_text='Where the rows came from (paste, xlsx, csv)', max_length=20)),
+                ('mode', models.CharField(choices=[('insert', 'Insert new cases only'), ('upsert', 'Insert new cases, update existing ones')], default='insert', max_length=10)),
+                ('skip_duplicates', models.BooleanField(default=True)),
+                ('paste_data', models.JSONField(blank=True, null=True)),
+                ('upload', models.FileField(blank=True, null=True, upload_to='imports/')),
+                ('file_name', models.CharField(blank=True, max_length=255)),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('running', 'Running'), ('completed', 'Completed'), ('cancelled', 'Cancelled'), ('failed', 'Failed')], default='pending', max_length=10)),
+                ('cancel_requested', models.BooleanField(default=False)),
+                ('attempts', models.IntegerField(default=0)),
+                ('total_rows', models.IntegerField(blank=True, null=True)),
+                ('processed_rows', models.IntegerField(default=0)),
+                ('last_row', models.IntegerField(default=0, help_text='Input row number of the last committed batch')),
+                ('created_count', models.IntegerField(default=0)),
+                ('updated_count', models.IntegerField(default=0)),
+                ('unchanged_count', models.IntegerField(default=0)),
+                ('skipped_count', models.IntegerField(default=0)),
+                ('error_count', models.IntegerField(default=0)),
+                ('error_message', models.TextField(blank=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('started_at', models.DateTimeField(blank=True, null=True)),
+                ('completed_at', models.DateTimeField(blank=True, null=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('created_by', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='import_jobs', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'ordering': ['-created_at'],
+            },
+        ),
+        migrations.CreateModel(
+            name='ImportJobRowError',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('row_number', models.IntegerField()),
+                ('case_id', models.CharField(blank=True, max_length=50)),
+                ('error', models.TextField()),
+                ('job', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='row_errors', to='litigation_api.importjob')),
+            ],
+            options={
+                'ordering': ['job', 'row_number'],
+            },
+        ),
+        migrations.AddIndex(
+            model_name='importjob',
+            index=models.Index(fields=['status', 'updated_at'], name='litigation__status_e13fc9_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='importjobrowerror',
+            index=models.Index(fields=['job', 'row_number'], name='litigation__job_id_40c37d_idx'),
+        ),
+    ]
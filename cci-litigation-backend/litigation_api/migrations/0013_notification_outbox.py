@@ -0,0 +1,32 @@
+# Generated by Django 5.0.1 on 2026-10-17 03:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('litigation_api', '0012_import_jobs'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='notificationlog',
+            name='claimed_at',
+            field=models.DateTimeField(blank=True, help_text='When a dispatcher worker picked it up', null=True),
+        ),
+        migrations.AddField(
+            model_name='notificationlog',
+            name='subject',
+            field=models.CharField(blank=True, help_text='Email subject', max_length=255),
+        ),
+        migrations.AlterField(
+            model_name='notificationlog',
+            name='status',
+            field=models.CharField(choices=[('pending', 'Pending'), ('sending', 'Sending'), ('sent', 'Sent'), ('failed', 'Failed')], default='pending', max_length=10),
+        ),
+        migrations.AddIndex(
+            model_name='notificationlog',
+            index=models.Index(fields=['status', 'notification_type', 'id'], name='litigation__status_8f14bc_idx'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.0.1 on 2026-10-17 03:24
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('litigation_api', '0013_notification_outbox'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='notificationlog',
+            name='hearing_date',
+            field=models.DateField(blank=True, help_text='Hearing a reminder is for', null=True),
+        ),
+    ]
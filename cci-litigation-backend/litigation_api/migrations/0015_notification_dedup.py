@@ -0,0 +1,46 @@
+# Generated by Django 5.0.1 on 2026-10-17 03:27
+
+from django.db import migrations, models
+from django.db.models import Case, Count, IntegerField, Value, When
+
+# Survivor preference: a delivered reminder, then one still on its way
+STATUS_RANK = Case(
+    When(status='sent', then=Value(0)),
+    When(status__in=('sending', 'pending'), then=Value(1)),
+    default=Value(2),
+    output_field=IntegerField(),
+)
+
+
+def detach_duplicate_reminders(apps, schema_editor):
+    """
+    Keep one reminder per key (sent first, then sending or pending, then the
+    lowest id); the other duplicates stay in the log without a hearing date
+    """
+    NotificationLog = apps.get_model('litigation_api', 'NotificationLog')
+    keys = ('case_id', 'notification_type', 'recipient', 'hearing_date')
+    duplicates = (
+        NotificationLog.objects.filter(hearing_date__isnull=False).order_by()
+        .values(*keys)
+        .annotate(total=Count('id'))
+        .filter(total__gt=1)
+    )
+    for row in duplicates:
+        rows = NotificationLog.objects.filter(**{key: row[key] for key in keys})
+        keep = rows.annotate(rank=STATUS_RANK).order_by('rank', 'id').values_list('pk', flat=True)[0]
+        rows.exclude(pk=keep).update(hearing_date=None)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('litigation_api', '0014_notification_hearing_date'),
+    ]
+
+    operations = [
+        migrations.RunPython(detach_duplicate_reminders, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='notificationlog',
+            constraint=models.UniqueConstraint(condition=models.Q(('hearing_date__isnull', False)), fields=('case', 'notification_type', 'recipient', 'hearing_date'), name='unique_hearing_reminder'),
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 5.0.1 on 2026-10-17 03:29
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('litigation_api', '0015_notification_dedup'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='notificationlog',
+            name='cases',
+            field=models.ManyToManyField(blank=True, help_text='Cases covered by a digest', related_name='digest_notifications', to='litigation_api.case'),
+        ),
+        migrations.AddField(
+            model_name='notificationlog',
+            name='digest_date',
+            field=models.DateField(blank=True, help_text='Day a digest is for', null=True),
+        ),
+        migrations.AlterField(
+            model_name='notificationlog',
+            name='case',
+            field=models.ForeignKey(blank=True, help_text='Case notified; empty for a digest', null=True, on_delete=django.db.models.deletion.CASCADE, related_name='notifications', to='litigation_api.case'),
+        ),
+        migrations.AddConstraint(
+            model_name='notificationlog',
+            constraint=models.UniqueConstraint(condition=models.Q(('digest_date__isnull', False)), fields=('notification_type', 'recipient', 'digest_date'), name='unique_reminder_digest'),
+        ),
+    ]
@@ -0,0 +1,63 @@
+# Generated by Django 5.0.1 on 2026-10-17 04:10
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def copy_digest_links(apps, schema_editor):
+    """Move digest links into DigestCase, covering each case's current hearing"""
+    NotificationLog = apps.get_model('litigation_api', 'NotificationLog')
+    DigestCase = apps.get_model('litigation_api', 'DigestCase')
+    through = NotificationLog.cases.through
+    links = through.objects.select_related('notificationlog', 'case').order_by('notificationlog_id')
+    DigestCase.objects.bulk_create([
+        DigestCase(
+            notification_id=link.notificationlog_id,
+            case_id=link.case_id,
+            notification_type=link.notificationlog.notification_type,
+            recipient=link.notificationlog.recipient,
+            hearing_date=link.case.next_hearing_date,
+        )
+        for link in links.iterator(chunk_size=2000)
+    ], batch_size=500, ignore_conflicts=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('litigation_api', '0016_notification_digest'),
+    ]
+
+    operations = [
+        migrations.RemoveConstraint(
+            model_name='notificationlog',
+            name='unique_reminder_digest',
+        ),
+        migrations.CreateModel(
+            name='DigestCase',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('notification_type', models.CharField(choices=[('sms', 'SMS'), ('email', 'Email')], max_length=10)),
+                ('recipient', models.CharField(max_length=200)),
+                ('hearing_date', models.DateField(blank=True, help_text='Hearing the digest reminded', null=True)),
+                ('case', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='digest_links', to='litigation_api.case')),
+                ('notification', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='digest_links', to='litigation_api.notificationlog')),
+            ],
+            options={
+                'constraints': [
+                    models.UniqueConstraint(fields=('notification', 'case'), name='unique_digest_case'),
+                    models.UniqueConstraint(condition=models.Q(('hearing_date__isnull', False)), fields=('case', 'notification_type', 'recipient', 'hearing_date'), name='unique_digest_hearing'),
+                ],
+            },
+        ),
+        migrations.RunPython(copy_digest_links, migrations.RunPython.noop),
+        migrations.RemoveField(
+            model_name='notificationlog',
+            name='cases',
+        ),
+        migrations.AddField(
+            model_name='notificationlog',
+            name='cases',
+            field=models.ManyToManyField(blank=True, help_text='Cases covered by a digest', related_name='digest_notifications', through='litigation_api.DigestCase', to='litigation_api.case'),
+        ),
+    ]
@@ -2,8 +2,10 @@ from django.db import models
 from django.contrib.auth.models import AbstractUser, BaseUserManager
 from django.core.validators import RegexValidator, MinValueValidator, MaxValueValidator
 from django.core.exceptions import ValidationError
+from django.core.serializers.json import DjangoJSONEncoder
 from decimal import Decimal
 import re
+import uuid
 
 class Department(models.Model):
     """Department model for organizational structure"""
@@ -382,6 +384,7 @@ class Case(models.Model):
             models.Index(fields=['next_hearing_date']),
             models.Index(fields=['created_by']),
             models.Index(fields=['case_id']),
+            models.Index(fields=['updated_at', 'id'], name='litigation_case_delta_idx'),
         ]
     
     def clean(self):
@@ -550,6 +553,7 @@ class NotificationLog(models.Model):
     
     NOTIFICATION_STATUS_CHOICES = [
         ('pending', 'Pending'),
+        ('sending', 'Sending'),
         ('sent', 'Sent'),
         ('failed', 'Failed'),
     ]
@@ -557,7 +561,19 @@ class NotificationLog(models.Model):
     case = models.ForeignKey(
         Case,
         on_delete=models.CASCADE,
-        related_name='notifications'
+        related_name='notifications',
+        null=True,
+        blank=True,
+        help_text="Case notified; empty for a digest"
+    )
+    
+    # A digest covers several of an advocate's due hearings in one message
+    cases = models.ManyToManyField(
+        Case,
+        through='DigestCase',
+        blank=True,
+        related_name='digest_notifications',
+        help_text="Cases covered by a digest"
     )
     
     notification_type = models.CharField(
@@ -570,6 +586,9 @@ class NotificationLog(models.Model):
         help_text="Phone number or email address"
     )
     
+    hearing_date = models.DateField(null=True, blank=True, help_text="Hearing a reminder is for")
+    digest_date = models.DateField(null=True, blank=True, help_text="Day a digest is for")
+    subject = models.CharField(max_length=255, blank=True, help_text="Email subject")
     message_content = models.TextField(
         help_text="Notification message content"
     )
@@ -580,6 +599,7 @@ class NotificationLog(models.Model):
         default='pending'
     )
     
+    claimed_at = models.DateTimeField(null=True, blank=True, help_text="When a dispatcher worker picked it up")
     sent_at = models.DateTimeField(null=True, blank=True)
     error_message = models.TextField(null=True, blank=True)
     
@@ -587,11 +607,49 @@ class NotificationLog(models.Model):
     
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            # Outbox: pending rows per channel, oldest first
+            models.Index(fields=['status', 'notification_type', 'id']),
+        ]
+        constraints = [
+            # One reminder per case, channel, recipient and hearing
+            models.UniqueConstraint(
+                fields=['case', 'notification_type', 'recipient', 'hearing_date'],
+                condition=models.Q(hearing_date__isnull=False),
+                name='unique_hearing_reminder',
+            ),
+        ]
     
     def __str__(self):
+        if self.case_id is None:
+            return f"{self.notification_type.upper()} digest to {self.recipient} for {self.digest_date}"
         return f"{self.notification_type.upper()} to {self.recipient} for {self.case.case_id}"
 
 
+class DigestCase(models.Model):
+    """A hearing covered by a digest notification"""
+    notification = models.ForeignKey(NotificationLog, on_delete=models.CASCADE, related_name='digest_links')
+    case = models.ForeignKey(Case, on_delete=models.CASCADE, related_name='digest_links')
+    # Copied from the digest so the unique constraint can cover them
+    notification_type = models.CharField(max_length=10, choices=NotificationLog.NOTIFICATION_TYPE_CHOICES)
+    recipient = models.CharField(max_length=200)
+    hearing_date = models.DateField(null=True, blank=True, help_text="Hearing the digest reminded")
+    
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['notification', 'case'], name='unique_digest_case'),
+            # A hearing is reminded by at most one digest per channel and recipient
+            models.UniqueConstraint(
+                fields=['case', 'notification_type', 'recipient', 'hearing_date'],
+                condition=models.Q(hearing_date__isnull=False),
+                name='unique_digest_hearing',
+            ),
+        ]
+    
+    def __str__(self):
+        return f"{self.case.case_id} in digest {self.notification_id}"
+
+
 class UserLoginHistory(models.Model):
     """Track user login history"""
     user = models.ForeignKey(
@@ -705,4 +763,322 @@ class Draft(models.Model):
     @property
     def is_recent(self):
         """Check if draft was updated recently (within 1 hour)"""
-        return self.age_in_minutes <= 60
\ No newline at end of file
+        return self.age_in_minutes <= 60
+
+class CaseStatsRollup(models.Model):
+    """
+    Materialized case counts per (department, status bucket, filing month).
+    Maintained incrementally from Case signals and bulk paste (see stats.py);
+    `manage.py rebuild_case_stats` rebuilds it or reports drift.
+    """
+    
+    STATUS_BUCKET_CHOICES = [
+        ('pending', 'Pending'),
+        ('disposed', 'Disposed'),
+        ('other', 'Other'),
+    ]
+    
+    department = models.CharField(max_length=50)
+    status_bucket = models.CharField(max_length=10, choices=STATUS_BUCKET_CHOICES)
+    filing_month = models.DateField(help_text="First day of the filing month")
+    case_count = models.IntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        ordering = ['department', 'filing_month', 'status_bucket']
+        verbose_name = "Case Statistics Rollup"
+        verbose_name_plural = "Case Statistics Rollups"
+        constraints = [
+            models.UniqueConstraint(
+                fields=['department', 'status_bucket', 'filing_month'],
+                name='unique_case_stats_rollup_key'
+            ),
+        ]
+        indexes = [
+            models.Index(fields=['filing_month']),
+        ]
+    
+    def __str__(self):
+        return f"{self.department} / {self.status_bucket} / {self.filing_month:%Y-%m}: {self.case_count}"
+
+
+class ExportJob(models.Model):
+    """Case export built in the background worker pool and kept for download"""
+    
+    FORMAT_CHOICES = [
+        ('xlsx', 'Excel (.xlsx)'),
+        ('parquet', 'Parquet (.parquet)'),
+    ]
+    
+    STATUS_CHOICES = [
+        ('pending', 'Pending'),
+        ('running', 'Running'),
+        ('completed', 'Completed'),
+        ('failed', 'Failed'),
+        ('expired', 'Expired'),
+    ]
+    
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    
+    created_by = models.ForeignKey(
+        User,
+        on_delete=models.SET_NULL,
+        null=True,
+        related_name='export_jobs'
+    )
+    
+    export_format = models.CharField(max_length=10, choices=FORMAT_CHOICES, default='xlsx')
+    filters = models.JSONField(default=dict, blank=True, help_text="Case list filter parameters")
+    include_summary = models.BooleanField(default=False)
+    
+    signature = models.CharField(
+        max_length=64,
+        db_index=True,
+        help_text="Hash of format, filters and options; identical requests share one artifact"
+    )
+    data_version = models.CharField(
+        max_length=64,
+        blank=True,
+        help_text="Row count and latest updated_at of the filtered cases when the job was requested"
+    )
+    
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='pending')
+    total_rows = models.IntegerField(null=True, blank=True)
+    processed_rows = models.IntegerField(default=0)
+    
+    artifact = models.FileField(upload_to='exports/', null=True, blank=True)
+    file_name = models.CharField(max_length=255, blank=True)
+    file_size = models.BigIntegerField(null=True, blank=True)
+    error_message = models.TextField(blank=True)
+    
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    completed_at = models.DateTimeField(null=True, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    expires_at = models.DateTimeField(null=True, blank=True)
+    
+    class Meta:
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['signature', 'status']),
+            models.Index(fields=['status', 'expires_at']),
+        ]
+    
+    def __str__(self):
+        return f"{self.export_format.upper()} export {self.id} ({self.status})"
+    
+    @property
+    def progress_percent(self):
+        if not self.total_rows:
+            return 100 if self.status == 'completed' else 0
+        return min(100, round(self.processed_rows * 100 / self.total_rows))
+
+
+class CaseTombstone(models.Model):
+    """Record of a deleted case, so delta sync clients can drop it"""
+    
+    case_pk = models.IntegerField(help_text="Primary key the deleted case had")
+    case_id = models.CharField(max_length=50)
+    internal_department = models.CharField(max_length=50, blank=True)
+    deleted_by = models.ForeignKey(
+        User,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='deleted_case_tombstones'
+    )
+    deleted_at = models.DateTimeField(auto_now_add=True)
+    
+    class Meta:
+        ordering = ['deleted_at', 'id']
+        indexes = [
+            models.Index(fields=['deleted_at', 'id']),
+        ]
+    
+    def __str__(self):
+        return f"{self.case_id} deleted at {self.deleted_at}"
+
+
+class ImportSession(models.Model):
+    """
+    A bulk import that has been parsed and validated once and is waiting
+    (as ImportStagedRow rows) for the user to commit it.
+    """
+    
+    STATUS_CHOICES = [
+        ('staged', 'Staged'),
+        ('committing', 'Committing'),
+        ('committed', 'Committed'),
+        ('failed', 'Failed'),
+        ('expired', 'Expired'),
+    ]
+    
+    MODE_CHOICES = [
+        ('insert', 'Insert new cases only'),
+        ('upsert', 'Insert new cases, update existing ones'),
+    ]
+    
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    
+    created_by = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='import_sessions'
+    )
+    
+    source = models.CharField(max_length=20, default='paste', help_text="Where the rows came from (paste, file)")
+    status = models.CharField(max_length=12, choices=STATUS_CHOICES, default='staged')
+    mode = models.CharField(max_length=10, choices=MODE_CHOICES, default='insert')
+    
+    total_rows = models.IntegerField(default=0)
+    valid_rows = models.IntegerField(default=0)
+    error_rows = models.IntegerField(default=0)
+    duplicate_rows = models.IntegerField(default=0)
+    update_rows = models.IntegerField(default=0)
+    unchanged_rows = models.IntegerField(default=0)
+    
+    created_count = models.IntegerField(default=0)
+    updated_count = models.IntegerField(default=0)
+    unchanged_count = models.IntegerField(default=0)
+    skipped_count = models.IntegerField(default=0)
+    error_message = models.TextField(blank=True)
+    
+    created_at = models.DateTimeField(auto_now_add=True)
+    committed_at = models.DateTimeField(null=True, blank=True)
+    expires_at = models.DateTimeField()
+    
+    class Meta:
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['status', 'expires_at']),
+        ]
+    
+    def __str__(self):
+        return f"Import {self.id} ({self.status}, {self.total_rows} rows)"
+
+
+class ImportStagedRow(models.Model):
+    """One parsed row of an ImportSession with its validation outcome"""
+    
+    STATUS_CHOICES = [
+        ('valid', 'Valid'),
+        ('error', 'Error'),
+        ('duplicate', 'Duplicate'),
+        ('update', 'Update'),
+        ('unchanged', 'Unchanged'),
+        ('created', 'Created'),
+        ('updated', 'Updated'),
+        ('skipped', 'Skipped'),
+    ]
+    
+    session = models.ForeignKey(ImportSession, on_delete=models.CASCADE, related_name='rows')
+    row_number = models.IntegerField()
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES)
+    case_id = models.CharField(max_length=50, blank=True)
+    data = models.JSONField(
+        default=dict,
+        blank=True,
+        encoder=DjangoJSONEncoder,
+        help_text="Validated case fields, ready to insert"
+    )
+    changed_fields = models.JSONField(default=list, blank=True, help_text="Fields an upsert changes on the existing case")
+    error = models.TextField(blank=True)
+    
+    class Meta:
+        ordering = ['session', 'row_number']
+        indexes = [
+            models.Index(fields=['session', 'status', 'row_number']),
+        ]
+        constraints = [
+            models.UniqueConstraint(fields=['session', 'row_number'], name='unique_import_staged_row'),
+        ]
+    
+    def __str__(self):
+        return f"Row {self.row_number} of import {self.session_id} ({self.status})"
+
+
+class ImportJob(models.Model):
+    """
+    Bulk import run in the background worker pool. Rows are committed in
+    batches, each batch recording its outcome and advancing ``last_row`` in
+    the same transaction, so a job interrupted by a crash or restart resumes
+    after the last committed batch.
+    """
+    
+    STATUS_CHOICES = [
+        ('pending', 'Pending'),
+        ('running', 'Running'),
+        ('completed', 'Completed'),
+        ('cancelled', 'Cancelled'),
+        ('failed', 'Failed'),
+    ]
+    
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    
+    created_by = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='import_jobs'
+    )
+    
+    source = models.CharField(max_length=20, default='paste', help_text="Where the rows came from (paste, xlsx, csv)")
+    mode = models.CharField(max_length=10, choices=ImportSession.MODE_CHOICES, default='insert')
+    skip_duplicates = models.BooleanField(default=True)
+    
+    # Input, kept until the job finishes so it can be resumed
+    paste_data = models.JSONField(null=True, blank=True)
+    upload = models.FileField(upload_to='imports/', null=True, blank=True)
+    file_name = models.CharField(max_length=255, blank=True)
+    
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='pending')
+    cancel_requested = models.BooleanField(default=False)
+    attempts = models.IntegerField(default=0)
+    
+    total_rows = models.IntegerField(null=True, blank=True)
+    processed_rows = models.IntegerField(default=0)
+    last_row = models.IntegerField(default=0, help_text="Input row number of the last committed batch")
+    
+    created_count = models.IntegerField(default=0)
+    updated_count = models.IntegerField(default=0)
+    unchanged_count = models.IntegerField(default=0)
+    skipped_count = models.IntegerField(default=0)
+    error_count = models.IntegerField(default=0)
+    error_message = models.TextField(blank=True)
+    
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    completed_at = models.DateTimeField(null=True, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['status', 'updated_at']),
+        ]
+    
+    def __str__(self):
+        return f"Import job {self.id} ({self.status}, {self.processed_rows} rows)"
+    
+    @property
+    def progress_percent(self):
+        if not self.total_rows:
+            return 100 if self.status == 'completed' else 0
+        return min(100, round(self.processed_rows * 100 / self.total_rows))
+
+
+class ImportJobRowError(models.Model):
+    """A row an ImportJob rejected, with the reason"""
+    
+    job = models.ForeignKey(ImportJob, on_delete=models.CASCADE, related_name='row_errors')
+    row_number = models.IntegerField()
+    case_id = models.CharField(max_length=50, blank=True)
+    error = models.TextField()
+    
+    class Meta:
+        ordering = ['job', 'row_number']
+        indexes = [
+            models.Index(fields=['job', 'row_number']),
+        ]
+    
+    def __str__(self):
+        return f"Row {self.row_number} of import job {self.job_id}: {self.error}"
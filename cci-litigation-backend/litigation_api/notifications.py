@@ -0,0 +1,652 @@
+"""
+Notification outbox.
+
+Hearing reminders are not sent inside the request. The endpoint formats every
+message and writes it as a ``pending`` NotificationLog row in one
+``bulk_create``; the log table is the outbox. A drain started in the local
+worker pool (jobs.py) empties it: each pass claims a batch of pending rows per
+channel, hands them in chunks to that channel's thread pool (whose size caps
+concurrent deliveries, ``CHANNEL_CONCURRENCY``), and writes the outcomes back
+with one update per status and chunk instead of one save per message.
+
+Rows claimed by a worker that died stay ``sending`` until
+``CLAIM_TIMEOUT_MINUTES`` pass, then go back to the outbox.
+
+Email goes out in chunks over a single ``get_connection()`` per chunk and
+``send_messages``, one message at a time so each row gets its own outcome.
+SMS goes through the gateway configured in ``SMS_SETTINGS`` (sms.py), which
+batches and rate-limits requests to the provider. Manual notifications use
+the same senders synchronously (``send_now``).
+
+Reminders are keyed by (case, channel, recipient, hearing date), enforced by
+a unique index. Enqueueing skips keys already pending, sending or sent with
+one lookup per batch and retries failed ones in place, so repeated requests,
+restarts of the run_hearing_reminders command (which queues the day's
+reminders at ``REMINDER_TIME``) and overlapping runs send nothing twice.
+
+In digest mode an advocate gets one message per channel listing their due
+hearings instead of one per case. The digest row has no single case but is
+linked to every hearing it covers (DigestCase, unique per case, channel,
+recipient and hearing date), and hearings already reminded by a reminder or
+digest are left out, so the two modes never remind a hearing twice.
+"""
+import logging
+import smtplib
+import threading
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from itertools import islice
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.db import IntegrityError, connection, transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from . import jobs
+from .sms import get_sms_gateway
+from .models import Case, DigestCase, NotificationLog
+
+logger = logging.getLogger(__name__)
+
+CHANNELS = ('sms', 'email')
+
+# Default notification templates
+DEFAULT_SMS_TEMPLATE = "Dear {advocate_name}, Your case {case_id} has a hearing on {hearing_date} at {court_name}. Please be prepared. - CCI Legal"
+
+DEFAULT_EMAIL_TEMPLATE = """Dear {advocate_name},
+
+This is a reminder for your case {case_id} ({case_type}).
+
+Hearing Details:
+- Date: {hearing_date}
+- Court/Tribunal: {pending_before_court}
+- Petitioner: {party_petitioner}
+- Respondent: {party_respondent}
+- Financial Implications: {financial_implications}
+
+Please ensure you are well-prepared.
+
+Best regards,
+CCI Legal Team
+Department: {internal_department}"""
+
+# Digest templates: one message per advocate listing all their due hearings
+DEFAULT_DIGEST_SMS_TEMPLATE = "Dear {advocate_name}, you have {hearing_count} upcoming hearing(s): {hearing_list}. Please be prepared. - CCI Legal"
+
+DEFAULT_DIGEST_EMAIL_TEMPLATE = """Dear {advocate_name},
+
+This is a reminder of your {hearing_count} upcoming hearing(s):
+
+{hearing_list}
+
+Please ensure you are well-prepared.
+
+Best regards,
+CCI Legal Team"""
+
+# Hearings listed in a digest SMS before "and N more"
+DIGEST_SMS_MAX_CASES = 10
+
+
+def notification_setting(key, default):
+    return getattr(settings, 'NOTIFICATION_SETTINGS', {}).get(key, default)
+
+
+def _truncate(value, length=100):
+    value = value or ''
+    return value[:length] + ('...' if len(value) > length else '')
+
+
+def format_notification_template(template, case):
+    """Format notification template with case data"""
+    return template.format(
+        advocate_name=case.advocate_name or 'Advocate',
+        case_id=case.case_id,
+        case_type=case.case_type or 'Legal Case',
+        hearing_date=case.next_hearing_date.strftime('%d-%m-%Y') if case.next_hearing_date else 'TBD',
+        party_petitioner=_truncate(case.party_petitioner),
+        party_respondent=_truncate(case.party_respondent),
+        pending_before_court=case.pending_before_court or '',
+        financial_implications=case.financial_implications if case.financial_implications is not None else '',
+        internal_department=case.internal_department or '',
+        court_name=case.pending_before_court or '',
+    )
+
+
+# ----- enqueueing -----
+
+# Statuses of a notification that still counts as reminding its hearings
+ACTIVE_STATUSES = ('pending', 'sending', 'sent')
+
+
+def normalize_recipient(channel, value):
+    """Recipient as stored and compared for dedup"""
+    value = (value or '').strip()
+    return value.lower() if channel == 'email' else value
+
+
+def covered_hearings(case_ids, hearing_dates):
+    """
+    (case id, channel, recipient, hearing date) of the given cases already
+    reminded by an active per-case reminder or digest; one query each.
+    """
+    if not case_ids or not hearing_dates:
+        return set()
+    fields = ('case_id', 'notification_type', 'recipient', 'hearing_date')
+    covered = set(NotificationLog.objects.filter(
+        case_id__in=case_ids, hearing_date__in=hearing_dates, status__in=ACTIVE_STATUSES,
+    ).values_list(*fields))
+    covered.update(DigestCase.objects.filter(
+        case_id__in=case_ids, hearing_date__in=hearing_dates, notification__status__in=ACTIVE_STATUSES,
+    ).values_list(*fields))
+    return covered
+
+
+def build_hearing_reminders(cases, sms_enabled=True, email_enabled=True, templates=None):
+    """
+    Unsaved pending NotificationLog rows for the reminders of ``cases``.
+    Returns (logs, errors), errors being cases whose template failed to render.
+    """
+    templates = templates or {}
+    logs = []
+    errors = []
+    for case in cases:
+        try:
+            if sms_enabled and case.advocate_mobile:
+                logs.append(NotificationLog(
+                    case=case,
+                    notification_type='sms',
+                    recipient=normalize_recipient('sms', case.advocate_mobile),
+                    hearing_date=case.next_hearing_date,
+                    message_content=format_notification_template(templates.get('sms') or DEFAULT_SMS_TEMPLATE, case),
+                ))
+            if email_enabled and case.advocate_email:
+                logs.append(NotificationLog(
+                    case=case,
+                    notification_type='email',
+                    recipient=normalize_recipient('email', case.advocate_email),
+                    hearing_date=case.next_hearing_date,
+                    subject=f"Hearing Reminder - {case.case_id}",
+                    message_content=format_notification_template(templates.get('email') or DEFAULT_EMAIL_TEMPLATE, case),
+                ))
+        except Exception as e:
+            logger.error(f"Failed to prepare notification for case {case.case_id}: {str(e)}")
+            errors.append({'case_id': case.case_id, 'error': str(e)})
+    return logs, errors
+
+
+# Case fields a digest lists
+DIGEST_CASE_FIELDS = (
+    'id', 'case_id', 'case_type', 'advocate_name', 'advocate_email', 'advocate_mobile',
+    'next_hearing_date', 'pending_before_court',
+)
+
+
+def _hearing_line(row):
+    hearing_date = row['next_hearing_date'].strftime('%d-%m-%Y') if row['next_hearing_date'] else 'TBD'
+    return row['case_id'], hearing_date
+
+
+def format_digest_template(template, rows, channel):
+    """Format a digest template with the hearings of one advocate"""
+    if channel == 'sms':
+        listed = [f"{case_id} on {hearing_date}" for case_id, hearing_date in map(_hearing_line, rows[:DIGEST_SMS_MAX_CASES])]
+        hearing_list = '; '.join(listed)
+        if len(rows) > DIGEST_SMS_MAX_CASES:
+            hearing_list += f" and {len(rows) - DIGEST_SMS_MAX_CASES} more"
+    else:
+        hearing_list = '\n'.join(
+            f"- {row['case_id']} ({row['case_type']}): {_hearing_line(row)[1]}, {row['pending_before_court'] or 'Court TBD'}"
+            for row in rows
+        )
+    return template.format(
+        advocate_name=rows[0]['advocate_name'] or 'Advocate',
+        hearing_count=len(rows),
+        hearing_list=hearing_list,
+    )
+
+
+def build_hearing_digests(cases, sms_enabled=True, email_enabled=True, digest_date=None, templates=None):
+    """
+    Unsaved pending digest NotificationLog rows for ``cases``: one per
+    advocate mobile number and email address, listing their hearings not
+    yet reminded on that channel by a reminder or digest. Cases are read in
+    one query and checked with covered_hearings(). Each log carries its
+    (case id, hearing date) pairs in ``digest_hearings`` for
+    enqueue_notifications to link.
+    Returns (logs, errors, number of hearings already reminded).
+    """
+    templates = templates or {}
+    digest_date = digest_date or timezone.localdate()
+    groups = {}
+    for row in cases.order_by('next_hearing_date', 'id').values(*DIGEST_CASE_FIELDS):
+        mobile = normalize_recipient('sms', row['advocate_mobile'])
+        email = normalize_recipient('email', row['advocate_email'])
+        if sms_enabled and mobile:
+            groups.setdefault(('sms', mobile), []).append(row)
+        if email_enabled and email:
+            groups.setdefault(('email', email), []).append(row)
+
+    all_rows = [row for rows in groups.values() for row in rows]
+    covered = covered_hearings(
+        {row['id'] for row in all_rows},
+        {row['next_hearing_date'] for row in all_rows if row['next_hearing_date']},
+    )
+
+    logs = []
+    errors = []
+    skipped = 0
+    for (channel, recipient), rows in groups.items():
+        due = [
+            row for row in rows
+            if (row['id'], channel, recipient, row['next_hearing_date']) not in covered
+        ]
+        skipped += len(rows) - len(due)
+        if not due:
+            continue
+        try:
+            log = NotificationLog(
+                notification_type=channel,
+                recipient=recipient,
+                digest_date=digest_date,
+                message_content=format_digest_template(
+                    templates.get(f'digest_{channel}') or (DEFAULT_DIGEST_SMS_TEMPLATE if channel == 'sms' else DEFAULT_DIGEST_EMAIL_TEMPLATE),
+                    due, channel,
+                ),
+            )
+        except Exception as e:
+            logger.error(f"Failed to prepare {channel} digest for {recipient}: {str(e)}")
+            errors.append({'recipient': recipient, 'error': str(e)})
+            continue
+        if channel == 'email':
+            log.subject = f"Hearing Reminders - {len(due)} case(s)"
+        log.digest_hearings = [(row['id'], row['next_hearing_date']) for row in due]
+        logs.append(log)
+    return logs, errors, skipped
+
+
+def reminder_key(log):
+    """Dedup key of a per-case reminder (None without a hearing date)"""
+    if log.hearing_date is None:
+        return None
+    return (log.case_id, log.notification_type, log.recipient, log.hearing_date)
+
+
+def split_reminders(logs):
+    """
+    (new logs, ids of failed rows to retry, number skipped) for per-case
+    reminder ``logs``, looking their keys up in one query per table.
+    Reminders already pending, sending or sent, or covered by an active
+    digest, are skipped; logs without a hearing date are always new.
+    """
+    keyed = [log for log in logs if log.hearing_date is not None]
+    existing = {}
+    in_digests = set()
+    if keyed:
+        case_ids = {log.case_id for log in keyed}
+        hearing_dates = {log.hearing_date for log in keyed}
+        rows = NotificationLog.objects.filter(
+            case_id__in=case_ids, hearing_date__in=hearing_dates,
+        ).values_list('id', 'case_id', 'notification_type', 'recipient', 'hearing_date', 'status')
+        existing = {tuple(row[1:5]): (row[0], row[5]) for row in rows}
+        in_digests = set(DigestCase.objects.filter(
+            case_id__in=case_ids, hearing_date__in=hearing_dates, notification__status__in=ACTIVE_STATUSES,
+        ).values_list('case_id', 'notification_type', 'recipient', 'hearing_date'))
+
+    new, retry, skipped = [], [], 0
+    seen = set()
+    for log in logs:
+        key = reminder_key(log)
+        if key is None:
+            new.append(log)
+            continue
+        if key in seen or key in in_digests:
+            skipped += 1
+            continue
+        seen.add(key)
+        if key not in existing:
+            new.append(log)
+        elif existing[key][1] == 'failed':
+            retry.append(existing[key][0])
+        else:
+            skipped += 1
+    return new, retry, skipped
+
+
+def insert_digest(log):
+    """
+    Save a digest and link its hearings in a savepoint, taking hearings over
+    from failed digests. False if a concurrent run reminded one of its
+    hearings first (the unique index on DigestCase rejects the links).
+    """
+    hearings = Q()
+    for case_id, hearing_date in log.digest_hearings:
+        hearings |= Q(case_id=case_id, hearing_date=hearing_date)
+    try:
+        with transaction.atomic():
+            log.status = 'pending'
+            log.save()
+            if hearings:
+                DigestCase.objects.filter(
+                    hearings, notification_type=log.notification_type,
+                    recipient=log.recipient, notification__status='failed',
+                ).delete()
+            DigestCase.objects.bulk_create([
+                DigestCase(
+                    notification=log, case_id=case_id, notification_type=log.notification_type,
+                    recipient=log.recipient, hearing_date=hearing_date,
+                )
+                for case_id, hearing_date in log.digest_hearings
+            ])
+    except IntegrityError:
+        log.pk = None
+        return False
+    return True
+
+
+def insert_reminders(logs):
+    """
+    Save new per-case reminder ``logs`` in a savepoint and return
+    (inserted logs, number skipped). If a concurrent run inserted one of the
+    keys first, the unique index rejects the batch; the keys are then looked
+    up again and only the reminders still missing are inserted.
+    """
+    skipped = 0
+    while logs:
+        try:
+            with transaction.atomic():
+                NotificationLog.objects.bulk_create(logs)
+            break
+        except IntegrityError:
+            remaining, _retry, _skipped = split_reminders(logs)
+            if len(remaining) == len(logs):
+                raise
+            logs, skipped = remaining, skipped + len(logs) - len(remaining)
+    return logs, skipped
+
+
+def enqueue_notifications(logs, drain=True):
+    """
+    Write ``logs`` to the outbox and, unless ``drain`` is False (the caller
+    drains itself), start a drain once committed. Per batch, reminders
+    already queued or sent are skipped and failed ones go back to pending in
+    place, so repeated runs add no rows; rows a concurrent run inserted
+    first count as skipped, not queued (see insert_reminders). Digests (already reduced to unreminded
+    hearings by build_hearing_digests) are inserted one by one with their
+    links. Returns Counter of 'queued', 'retried' and 'skipped' reminders
+    (for a digest lost to a concurrent run, its hearings count as skipped).
+    """
+    batch_size = notification_setting('DISPATCH_BATCH_SIZE', 200)
+    counts = Counter()
+    for start in range(0, len(logs), batch_size):
+        batch = logs[start:start + batch_size]
+        new, retry, skipped = split_reminders([log for log in batch if log.digest_date is None])
+        for log in new:
+            log.status = 'pending'
+        retried = 0
+        with transaction.atomic():
+            new, raced = insert_reminders(new)
+            if retry:
+                retried = NotificationLog.objects.filter(pk__in=retry, status='failed').update(
+                    status='pending', error_message=None, claimed_at=None,
+                )
+            for log in batch:
+                if log.digest_date is None:
+                    continue
+                if insert_digest(log):
+                    counts.update(queued=1)
+                else:
+                    counts.update(skipped=len(log.digest_hearings))
+        counts.update(queued=len(new), retried=retried, skipped=skipped + raced + len(retry) - retried)
+    if (counts['queued'] or counts['retried']) and drain:
+        jobs.submit_on_commit(drain_outbox)
+    return counts
+
+
+# Case fields the reminder templates read
+REMINDER_CASE_FIELDS = (
+    'id', 'case_id', 'case_type', 'advocate_name', 'advocate_email', 'advocate_mobile',
+    'next_hearing_date', 'party_petitioner', 'party_respondent', 'pending_before_court',
+    'financial_implications', 'internal_department',
+)
+
+
+def due_hearing_cases(days_ahead=1, today=None):
+    """Cases with a hearing from today to ``days_ahead`` days out (a range scan of the next_hearing_date index)"""
+    today = today or timezone.localdate()
+    return Case.objects.filter(
+        next_hearing_date__gte=today,
+        next_hearing_date__lte=today + timedelta(days=days_ahead),
+    ).only(*REMINDER_CASE_FIELDS).order_by('next_hearing_date', 'id')
+
+
+def queue_due_reminders(days_ahead=1, sms_enabled=True, email_enabled=True, today=None, dry_run=False, digest=False):
+    """
+    Enqueue reminders for every due hearing that has not had one, batch by
+    batch, without draining; with ``digest`` one digest per advocate instead.
+    Safe to repeat: reminders already queued or sent are skipped. Returns
+    Counter of 'due' cases, 'queued', 'retried' and 'skipped' reminders and
+    template 'errors'.
+    """
+    batch_size = notification_setting('DISPATCH_BATCH_SIZE', 200)
+    counts = Counter()
+    if digest:
+        cases = due_hearing_cases(days_ahead, today)
+        logs, errors, skipped = build_hearing_digests(cases, sms_enabled, email_enabled, today)
+        if dry_run:
+            counts.update(queued=len(logs))
+        else:
+            counts.update(enqueue_notifications(logs, drain=False))
+        counts.update(due=cases.count(), skipped=skipped, errors=len(errors))
+        return counts
+    cases = due_hearing_cases(days_ahead, today).iterator(chunk_size=batch_size)
+    while True:
+        batch = list(islice(cases, batch_size))
+        if not batch:
+            break
+        logs, errors = build_hearing_reminders(batch, sms_enabled, email_enabled)
+        if dry_run:
+            new, retry, skipped = split_reminders(logs)
+            counts.update(queued=len(new), retried=len(retry), skipped=skipped)
+        else:
+            counts.update(enqueue_notifications(logs, drain=False))
+        counts.update(due=len(batch), errors=len(errors))
+    return counts
+
+
+# ----- dispatching -----
+
+_channel_pools = {}
+_channel_pools_lock = threading.Lock()
+
+_drain_lock = threading.Lock()
+_drain_requested = False
+
+
+def channel_concurrency(channel):
+    return notification_setting('CHANNEL_CONCURRENCY', {}).get(channel, 2)
+
+
+def channel_pool(channel):
+    """The thread pool delivering ``channel`` messages, created on first use"""
+    with _channel_pools_lock:
+        if channel not in _channel_pools:
+            _channel_pools[channel] = ThreadPoolExecutor(
+                max_workers=channel_concurrency(channel),
+                thread_name_prefix=f'cci-notify-{channel}',
+            )
+        return _channel_pools[channel]
+
+
+def send_sms_batch(logs):
+    """Send a chunk of SMS notifications through the configured gateway (sms.py)"""
+    return get_sms_gateway().send_bulk([(log.pk, log.recipient, log.message_content) for log in logs])
+
+
+def email_delivery_enabled():
+    return getattr(settings, 'CCI_LITIGATION_SETTINGS', {}).get('ENABLE_EMAIL_NOTIFICATIONS', False)
+
+
+def _send_message(mail_connection, message):
+    """None if the server accepted ``message``, else the reason; a dropped connection is reopened once"""
+    try:
+        sent = mail_connection.send_messages([message])
+    except smtplib.SMTPServerDisconnected:
+        mail_connection.close()
+        mail_connection.open()
+        sent = mail_connection.send_messages([message])
+    return None if sent else 'Not accepted by the mail server'
+
+
+def send_email_batch(logs):
+    """
+    Send a chunk of email notifications over one connection to EMAIL_BACKEND
+    (one SMTP/TLS session for the chunk instead of one per message). A
+    refused recipient fails only its own message. With
+    ENABLE_EMAIL_NOTIFICATIONS off the messages are only logged.
+    """
+    if not email_delivery_enabled():
+        for log in logs:
+            logger.info(f"Email to {log.recipient}: {log.subject}")
+        return {log.pk: None for log in logs}
+
+    from_email = getattr(settings, 'DEFAULT_FROM_EMAIL', 'noreply@cci.gov.in')
+    outcomes = {}
+    mail_connection = get_connection(fail_silently=False)
+    mail_connection.open()
+    try:
+        for log in logs:
+            message = EmailMessage(
+                subject=log.subject,
+                body=log.message_content,
+                from_email=from_email,
+                to=[log.recipient],
+                connection=mail_connection,
+            )
+            try:
+                outcomes[log.pk] = _send_message(mail_connection, message)
+            except Exception as e:
+                outcomes[log.pk] = str(e) or e.__class__.__name__
+    finally:
+        mail_connection.close()
+    return outcomes
+
+
+# Each sender takes a chunk of NotificationLog rows and returns {pk: None or error}
+CHANNEL_SENDERS = {
+    'sms': send_sms_batch,
+    'email': send_email_batch,
+}
+
+
+def release_stale_claims():
+    """Return rows stuck in 'sending' (their worker died) to the outbox"""
+    cutoff = timezone.now() - timedelta(minutes=notification_setting('CLAIM_TIMEOUT_MINUTES', 10))
+    return NotificationLog.objects.filter(status='sending', claimed_at__lt=cutoff).update(
+        status='pending', claimed_at=None
+    )
+
+
+def claim_batch(channel, limit):
+    """Mark up to ``limit`` of the oldest pending ``channel`` rows as sending and return them"""
+    with transaction.atomic():
+        queryset = NotificationLog.objects.filter(status='pending', notification_type=channel).order_by('id')
+        if connection.features.has_select_for_update_skip_locked:
+            # Concurrent drains (other server processes) take disjoint rows
+            queryset = queryset.select_for_update(skip_locked=True)
+        ids = list(queryset.values_list('id', flat=True)[:limit])
+        if not ids:
+            return []
+        now = timezone.now()
+        NotificationLog.objects.filter(pk__in=ids, status='pending').update(status='sending', claimed_at=now)
+        return list(NotificationLog.objects.filter(pk__in=ids, status='sending', claimed_at=now).order_by('id'))
+
+
+def _deliver_chunk(channel, logs):
+    try:
+        return CHANNEL_SENDERS[channel](logs)
+    except Exception as e:
+        logger.error(f"{channel} delivery of {len(logs)} notifications failed: {str(e)}")
+        return {log.pk: str(e) for log in logs}
+
+
+def record_outcomes(logs, outcomes):
+    """Write a delivered chunk's outcomes back with one update per status; returns Counter of statuses"""
+    now = timezone.now()
+    sent = [log.pk for log in logs if outcomes.get(log.pk, 'Not attempted') is None]
+    failed = [log for log in logs if outcomes.get(log.pk, 'Not attempted') is not None]
+    for log in failed:
+        log.status = 'failed'
+        log.error_message = outcomes.get(log.pk) or 'Not attempted'
+    with transaction.atomic():
+        if sent:
+            NotificationLog.objects.filter(pk__in=sent).update(status='sent', sent_at=now, error_message=None)
+        if failed:
+            NotificationLog.objects.bulk_update(failed, ['status', 'error_message'])
+    return Counter(sent=len(sent), failed=len(failed))
+
+
+def drain_pass():
+    """Claim one batch per channel, deliver the channels concurrently; returns Counter of outcomes"""
+    claim_size = notification_setting('DISPATCH_BATCH_SIZE', 200)
+    chunk_size = notification_setting('CHANNEL_BATCH_SIZE', 50)
+
+    in_flight = []
+    for channel in CHANNELS:
+        logs = claim_batch(channel, claim_size)
+        for start in range(0, len(logs), chunk_size):
+            chunk = logs[start:start + chunk_size]
+            in_flight.append((chunk, channel_pool(channel).submit(_deliver_chunk, channel, chunk)))
+
+    counts = Counter()
+    for chunk, future in in_flight:
+        counts.update(record_outcomes(chunk, future.result()))
+    return counts
+
+
+def drain_outbox():
+    """
+    Send pending notifications until the outbox is empty; returns Counter of
+    outcomes. Only one drain runs per process: a call made while one is
+    running asks it to go round again and returns at once.
+    """
+    global _drain_requested
+    _drain_requested = True
+    totals = Counter()
+    while _drain_requested:
+        if not _drain_lock.acquire(blocking=False):
+            return totals
+        try:
+            _drain_requested = False
+            release_stale_claims()
+            while True:
+                counts = drain_pass()
+                if not counts:
+                    break
+                totals.update(counts)
+        finally:
+            _drain_lock.release()
+    if totals:
+        logger.info(f"Notification outbox drained: {totals['sent']} sent, {totals['failed']} failed")
+    return totals
+
+
+def send_now(logs):
+    """
+    Deliver ``logs`` immediately in the calling thread through the channel
+    senders (for one-off notifications the user waits for) and record them;
+    returns Counter of outcomes.
+    """
+    now = timezone.now()
+    for log in logs:
+        log.status = 'sending'
+        log.claimed_at = now
+    logs = NotificationLog.objects.bulk_create(logs)
+    counts = Counter()
+    for channel in CHANNELS:
+        chunk = [log for log in logs if log.notification_type == channel]
+        if chunk:
+            counts.update(record_outcomes(chunk, _deliver_chunk(channel, chunk)))
+    return counts
@@ -0,0 +1,254 @@
+"""
+Pagination for the case list.
+
+Page-number pagination stays the default. ``?pagination=cursor`` (or any
+request carrying a ``cursor``) switches to keyset pagination: the page is
+fetched with a WHERE clause that seeks past the last row of the previous
+page on the active sort key plus ``id``. Page N then costs the same as
+page 1, and no COUNT(*) runs unless ``?count=exact`` is asked for.
+"""
+import base64
+import binascii
+import json
+from collections import OrderedDict
+from datetime import date, datetime
+
+from django.conf import settings
+from django.db import connection
+from django.db.models import F, Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination, PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+def _litigation_setting(key, default):
+    return getattr(settings, 'CCI_LITIGATION_SETTINGS', {}).get(key, default)
+
+
+def estimate_count(queryset):
+    """
+    Planner row estimate for ``queryset`` on PostgreSQL (no table scan).
+    Returns None on backends without a cheap estimate.
+    """
+    if connection.vendor != 'postgresql':
+        return None
+    sql, params = queryset.order_by().query.sql_with_params()
+    with connection.cursor() as cursor:
+        cursor.execute(f"EXPLAIN (FORMAT JSON) {sql}", params)
+        plan = cursor.fetchone()[0]
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]['Plan']['Plan Rows'])
+
+
+class KeysetPagination(BasePagination):
+    """
+    Seek pagination over (sort fields..., id).
+
+    The view supplies the key through ``get_keyset_ordering(queryset)``
+    returning ``(fields, descending)``. NULLs always sort last in the forward direction.
+    """
+    cursor_query_param = 'cursor'
+    count_query_param = 'count'
+    page_size_query_param = 'page_size'
+
+    def __init__(self):
+        self.page_size = _litigation_setting('DEFAULT_PAGE_SIZE', 20)
+        self.max_page_size = _litigation_setting('MAX_PAGE_SIZE', 100)
+
+    # ----- cursor encoding -----
+
+    def _encode_cursor(self, values, reverse):
+        payload = json.dumps({'v': [self._dump_value(v) for v in values], 'r': int(reverse)}, separators=(',', ':'))
+        return base64.urlsafe_b64encode(payload.encode()).decode()
+
+    def _decode_cursor(self, encoded):
+        try:
+            payload = json.loads(base64.urlsafe_b64decode(encoded.encode()).decode())
+            values = payload['v']
+            reverse = bool(payload.get('r'))
+        except (binascii.Error, ValueError, KeyError, TypeError, UnicodeDecodeError):
+            raise NotFound('Invalid cursor')
+        if not isinstance(values, list) or len(values) != len(self.fields):
+            raise NotFound('Invalid cursor')
+        return [self._load_value(field, value) for field, value in zip(self.fields, values)], reverse
+
+    @staticmethod
+    def _dump_value(value):
+        if isinstance(value, (date, datetime)):
+            return value.isoformat()
+        return value
+
+    def _load_value(self, field, value):
+        if value is None:
+            return None
+        try:
+            model_field = self.model._meta.get_field(field)
+        except Exception:
+            return value  # annotation such as search_rank
+        try:
+            if model_field.get_internal_type() == 'DateField':
+                return date.fromisoformat(value)
+            if model_field.get_internal_type() == 'DateTimeField':
+                return datetime.fromisoformat(value)
+            return model_field.to_python(value)
+        except (ValueError, TypeError):
+            raise NotFound('Invalid cursor')
+
+    # ----- query building -----
+
+    def _is_nullable(self, field):
+        try:
+            return self.model._meta.get_field(field).null
+        except Exception:
+            return False
+
+    def _ordering(self, reverse):
+        # Forward: sort direction with NULLs last; reverse flips both
+        descending = self.descending != reverse
+        nulls = {'nulls_first': True} if reverse else {'nulls_last': True}
+        ordering = []
+        for field in self.fields:
+            expression = F(field)
+            if self._is_nullable(field):
+                ordering.append(expression.desc(**nulls) if descending else expression.asc(**nulls))
+            else:
+                ordering.append(expression.desc() if descending else expression.asc())
+        return ordering
+
+    def _seek(self, values, reverse):
+        """Rows strictly after ``values`` in forward order (or before them if reverse)"""
+        descending = self.descending != reverse
+        lookup = 'lt' if descending else 'gt'
+        condition = Q(pk__in=[])
+        equal_prefix = Q()
+        for field, value in zip(self.fields, values):
+            nullable = self._is_nullable(field)
+            if value is None:
+                # Forward: nothing follows NULL; reverse: every non-NULL precedes it
+                after = Q(**{f'{field}__isnull': False}) if reverse else None
+                equal = Q(**{f'{field}__isnull': True})
+            else:
+                after = Q(**{f'{field}__{lookup}': value})
+                if nullable and not reverse:
+                    after |= Q(**{f'{field}__isnull': True})
+                equal = Q(**{field: value})
+            if after is not None:
+                condition |= equal_prefix & after
+            equal_prefix &= equal
+        return condition
+
+    # ----- pagination API -----
+
+    def get_page_size(self, request):
+        try:
+            size = int(request.query_params[self.page_size_query_param])
+            if size > 0:
+                return min(size, self.max_page_size)
+        except (KeyError, ValueError):
+            pass
+        return self.page_size
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.model = queryset.model
+        fields, self.descending = view.get_keyset_ordering(queryset)
+        self.fields = list(fields) + ['id']
+        page_size = self.get_page_size(request)
+
+        encoded = request.query_params.get(self.cursor_query_param)
+        values, reverse = self._decode_cursor(encoded) if encoded else (None, False)
+
+        self.count, self.count_is_estimate = self._count(queryset, request)
+
+        page_queryset = queryset.order_by(*self._ordering(reverse))
+        if values is not None:
+            page_queryset = page_queryset.filter(self._seek(values, reverse))
+        rows = list(page_queryset[:page_size + 1])
+        has_more = len(rows) > page_size
+        rows = rows[:page_size]
+        if reverse:
+            rows.reverse()
+
+        self.next_values = self.previous_values = None
+        if rows:
+            first = [getattr(rows[0], f) for f in self.fields]
+            last = [getattr(rows[-1], f) for f in self.fields]
+            if reverse:
+                self.previous_values = first if has_more else None
+                self.next_values = last
+            else:
+                self.next_values = last if has_more else None
+                self.previous_values = first if values is not None else None
+        elif values is not None:
+            # Ran past either end: offer the way back
+            if reverse:
+                self.next_values = values
+            else:
+                self.previous_values = values
+        return rows
+
+    def _count(self, queryset, request):
+        mode = request.query_params.get(self.count_query_param, 'estimate')
+        if mode == 'exact':
+            return queryset.order_by().count(), False
+        if mode == 'none':
+            return None, False
+        estimate = estimate_count(queryset)
+        return estimate, estimate is not None
+
+    def _link(self, values, reverse):
+        if values is None:
+            return None
+        url = self.request.build_absolute_uri()
+        url = remove_query_param(url, 'page')
+        return replace_query_param(url, self.cursor_query_param, self._encode_cursor(values, reverse))
+
+    def get_paginated_response(self, data):
+        return Response(OrderedDict([
+            ('count', self.count),
+            ('count_is_estimate', self.count_is_estimate),
+            ('next', self._link(self.next_values, False)),
+            ('previous', self._link(self.previous_values, True)),
+            ('results', data),
+        ]))
+
+
+class CasePagination(PageNumberPagination):
+    """
+    Page-number pagination (honouring ?page_size=) that hands over to
+    KeysetPagination for ?pagination=cursor or when a cursor is supplied.
+    """
+    page_size_query_param = 'page_size'
+    mode_query_param = 'pagination'
+
+    def __init__(self):
+        self.page_size = _litigation_setting('DEFAULT_PAGE_SIZE', 20)
+        self.max_page_size = _litigation_setting('MAX_PAGE_SIZE', 100)
+        self.keyset = None
+
+    def paginate_queryset(self, queryset, request, view=None):
+        use_keyset = (
+            request.query_params.get(self.mode_query_param) == 'cursor'
+            or KeysetPagination.cursor_query_param in request.query_params
+        )
+        if use_keyset and view is not None and hasattr(view, 'get_keyset_ordering'):
+            self.keyset = KeysetPagination()
+            return self.keyset.paginate_queryset(queryset, request, view)
+        self.keyset = None
+        return super().paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        if self.keyset is not None:
+            return self.keyset.get_paginated_response(data)
+        return super().get_paginated_response(data)
+
+
+class StagedRowPagination(PageNumberPagination):
+    """Page-number pagination (honouring ?page_size=) for staged import rows"""
+    page_size_query_param = 'page_size'
+
+    def __init__(self):
+        self.page_size = _litigation_setting('DEFAULT_PAGE_SIZE', 20)
+        self.max_page_size = _litigation_setting('MAX_PAGE_SIZE', 100)
@@ -0,0 +1,490 @@
+"""
+Full-text search for litigation cases.
+
+PostgreSQL keeps a weighted ``search_vector`` tsvector column on the case
+table. It is a stored generated column with a GIN index, so the database
+maintains it on every write. SQLite keeps an FTS5 shadow table
+(``litigation_api_case_fts``, rowid = case id) which is synced from the Case
+save/delete signals and explicitly by bulk import paths. Both structures are
+created by migration 0004. Any other backend falls back to an icontains chain.
+
+Fuzzy (typo-tolerant) name search over the party and advocate columns uses
+pg_trgm GIN indexes on PostgreSQL (migration 0005) and an in-process trigram
+inverted index everywhere else.
+"""
+import heapq
+import logging
+import re
+import threading
+import time
+from collections import Counter, defaultdict
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import BooleanField, Count, FloatField, Max, Q, Value
+from django.db.models.expressions import RawSQL
+
+from .models import Case
+
+logger = logging.getLogger(__name__)
+
+CASE_TABLE = Case._meta.db_table
+FTS_TABLE = f"{CASE_TABLE}_fts"
+
+# Indexed columns and their relevance weight (A highest, D lowest)
+SEARCH_FIELDS = [
+    ('case_id', 'A'),
+    ('party_petitioner', 'A'),
+    ('party_respondent', 'A'),
+    ('advocate_name', 'A'),
+    ('case_type', 'B'),
+    ('pending_before_court', 'B'),
+    ('internal_department', 'B'),
+    ('nature_of_claim', 'B'),
+    ('present_status', 'C'),
+    ('relief_claimed', 'C'),
+    ('case_remarks', 'C'),
+    ('brief_description', 'D'),
+]
+
+# bm25() column weights for the SQLite FTS5 table, same order as SEARCH_FIELDS
+FTS5_WEIGHTS = {'A': 10.0, 'B': 4.0, 'C': 2.0, 'D': 1.0}
+
+# SQLite limits the number of bound parameters per statement
+SYNC_CHUNK_SIZE = 500
+
+TERM_PATTERN = re.compile(r'\w+', re.UNICODE)
+
+
+def tokenize_query(query):
+    """Split a raw search string into lowercase word terms"""
+    return [term.lower() for term in TERM_PATTERN.findall(query or '')]
+
+
+class IContainsSearchBackend:
+    """Fallback for databases without a full-text index"""
+    vendor = None
+
+    def is_available(self):
+        return True
+
+    def search(self, queryset, terms):
+        search_q = Q()
+        for term in terms:
+            term_q = Q()
+            for field_name, _weight in SEARCH_FIELDS:
+                term_q |= Q(**{f'{field_name}__icontains': term})
+            search_q &= term_q
+        return queryset.filter(search_q).annotate(search_rank=Value(0.0, output_field=FloatField()))
+
+    def index_cases(self, case_ids):
+        """Nothing to maintain"""
+
+    def unindex_cases(self, case_ids):
+        """Nothing to maintain"""
+
+    def rebuild(self):
+        return 0
+
+
+class PostgresSearchBackend(IContainsSearchBackend):
+    """tsvector + GIN index; the generated column keeps itself in sync"""
+    vendor = 'postgresql'
+
+    def search(self, queryset, terms):
+        # Every term must match, each as a prefix so partial words keep working while typing
+        tsquery = ' & '.join(f'{term}:*' for term in terms)
+        return queryset.filter(
+            RawSQL(f"{CASE_TABLE}.search_vector @@ to_tsquery('simple', %s)", [tsquery], output_field=BooleanField())
+        ).annotate(
+            search_rank=RawSQL(
+                f"ts_rank({CASE_TABLE}.search_vector, to_tsquery('simple', %s))",
+                [tsquery],
+                output_field=FloatField(),
+            )
+        )
+
+    def rebuild(self):
+        with connection.cursor() as cursor:
+            cursor.execute(f"SELECT COUNT(*) FROM {CASE_TABLE}")
+            return cursor.fetchone()[0]
+
+
+class SQLiteFTSSearchBackend(IContainsSearchBackend):
+    """FTS5 shadow table keyed by case id"""
+    vendor = 'sqlite'
+    # Whether the FTS table exists, looked up once per process (either way)
+    _table_checked = False
+    _table_exists = False
+
+    def is_available(self):
+        if not SQLiteFTSSearchBackend._table_checked:
+            SQLiteFTSSearchBackend._table_exists = FTS_TABLE in connection.introspection.table_names()
+            SQLiteFTSSearchBackend._table_checked = True
+        return SQLiteFTSSearchBackend._table_exists
+
+    @classmethod
+    def forget_table_check(cls):
+        """Look the table up again on next use (after migrations ran in this process)"""
+        cls._table_checked = False
+
+    def search(self, queryset, terms):
+        match = ' AND '.join(f'"{term}"*' for term in terms)
+        weights = ', '.join(str(FTS5_WEIGHTS[weight]) for _field, weight in SEARCH_FIELDS)
+        return queryset.filter(
+            id__in=RawSQL(f"SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s", [match])
+        ).annotate(
+            # bm25() is lower-is-better; negate so that search_rank sorts like ts_rank
+            search_rank=RawSQL(
+                f"SELECT -bm25({FTS_TABLE}, {weights}) FROM {FTS_TABLE} "
+                f"WHERE {FTS_TABLE} MATCH %s AND rowid = {CASE_TABLE}.id",
+                [match],
+                output_field=FloatField(),
+            )
+        )
+
+    def index_cases(self, case_ids):
+        case_ids = [case_id for case_id in case_ids if case_id is not None]
+        if not case_ids or not self.is_available():
+            return
+        columns = ', '.join(field_name for field_name, _weight in SEARCH_FIELDS)
+        with connection.cursor() as cursor:
+            for start in range(0, len(case_ids), SYNC_CHUNK_SIZE):
+                chunk = case_ids[start:start + SYNC_CHUNK_SIZE]
+                placeholders = ', '.join(['%s'] * len(chunk))
+                cursor.execute(f"DELETE FROM {FTS_TABLE} WHERE rowid IN ({placeholders})", chunk)
+                cursor.execute(
+                    f"INSERT INTO {FTS_TABLE} (rowid, {columns}) "
+                    f"SELECT id, {columns} FROM {CASE_TABLE} WHERE id IN ({placeholders})",
+                    chunk,
+                )
+
+    def unindex_cases(self, case_ids):
+        case_ids = [case_id for case_id in case_ids if case_id is not None]
+        if not case_ids or not self.is_available():
+            return
+        with connection.cursor() as cursor:
+            for start in range(0, len(case_ids), SYNC_CHUNK_SIZE):
+                chunk = case_ids[start:start + SYNC_CHUNK_SIZE]
+                placeholders = ', '.join(['%s'] * len(chunk))
+                cursor.execute(f"DELETE FROM {FTS_TABLE} WHERE rowid IN ({placeholders})", chunk)
+
+    def rebuild(self):
+        if not self.is_available():
+            return 0
+        columns = ', '.join(field_name for field_name, _weight in SEARCH_FIELDS)
+        with connection.cursor() as cursor:
+            cursor.execute(f"DELETE FROM {FTS_TABLE}")
+            cursor.execute(
+                f"INSERT INTO {FTS_TABLE} (rowid, {columns}) SELECT id, {columns} FROM {CASE_TABLE}"
+            )
+            cursor.execute(f"SELECT COUNT(*) FROM {FTS_TABLE}")
+            return cursor.fetchone()[0]
+
+
+SEARCH_BACKENDS = {
+    'postgresql': PostgresSearchBackend(),
+    'sqlite': SQLiteFTSSearchBackend(),
+}
+
+
+def get_search_backend():
+    """Return the full-text backend for the active database, or the icontains fallback"""
+    backend = SEARCH_BACKENDS.get(connection.vendor)
+    if backend and backend.is_available():
+        return backend
+    return IContainsSearchBackend()
+
+
+def search_cases(queryset, query):
+    """
+    Filter a Case queryset to rows matching every term of ``query``.
+    The result is annotated with ``search_rank`` (higher is more relevant).
+    """
+    terms = tokenize_query(query)
+    if not terms:
+        return queryset
+    return get_search_backend().search(queryset, terms)
+
+
+def index_cases(case_ids):
+    """(Re)index the given cases; call after writes that bypass Case.save()"""
+    case_ids = list(case_ids)
+    try:
+        get_search_backend().index_cases(case_ids)
+        if connection.vendor != 'postgresql':
+            name_index.update(case_ids)
+    except Exception as e:
+        logger.error(f"Search index sync failed: {str(e)}")
+
+
+def unindex_cases(case_ids):
+    """Drop the given cases from the search index"""
+    case_ids = list(case_ids)
+    try:
+        get_search_backend().unindex_cases(case_ids)
+        name_index.remove(case_ids)
+    except Exception as e:
+        logger.error(f"Search index removal failed: {str(e)}")
+
+
+def rebuild_search_index():
+    """Rebuild the whole index from the case table; returns the number of indexed cases"""
+    return get_search_backend().rebuild()
+
+
+# ===== FUZZY NAME SEARCH =====
+
+FUZZY_FIELDS = ['party_petitioner', 'party_respondent', 'advocate_name']
+
+
+def _search_setting(key, default):
+    return getattr(settings, 'SEARCH_SETTINGS', {}).get(key, default)
+
+
+def trigrams(text):
+    """pg_trgm-compatible trigrams: each word padded with two leading spaces and one trailing"""
+    grams = set()
+    for word in TERM_PATTERN.findall((text or '').lower()):
+        padded = f"  {word} "
+        for i in range(len(padded) - 2):
+            grams.add(padded[i:i + 3])
+    return grams
+
+
+class TrigramNameIndex:
+    """
+    In-process trigram inverted index over FUZZY_FIELDS.
+
+    Built lazily on first use, updated from the Case signals in this process,
+    and rebuilt when the case table's (count, max updated_at) signature shows
+    writes from another process (checked at most every FUZZY_INDEX_REFRESH_SECONDS).
+    In-process writes advance the stored signature by their own effect only
+    (no COUNT/MAX per save), so foreign writes made meanwhile still show as a
+    mismatch; when that cannot be told, the index is marked stale instead.
+    """
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._postings = defaultdict(set)  # trigram -> {(case pk, field)}
+        self._documents = {}               # (case pk, field) -> trigram set
+        self._updated = {}                 # case pk -> updated_at, for the signature
+        self._signature = None
+        self._checked_at = None
+        self._stale = False
+
+    @property
+    def is_built(self):
+        return self._signature is not None
+
+    def _table_signature(self):
+        stats = Case.objects.aggregate(total=Count('id'), latest=Max('updated_at'))
+        return (stats['total'], stats['latest'])
+
+    def _add(self, case_pk, field, value):
+        grams = trigrams(value)
+        if not grams:
+            return
+        self._documents[(case_pk, field)] = grams
+        for gram in grams:
+            self._postings[gram].add((case_pk, field))
+
+    def _discard(self, case_pk):
+        for field in FUZZY_FIELDS:
+            grams = self._documents.pop((case_pk, field), None)
+            for gram in grams or ():
+                postings = self._postings.get(gram)
+                if postings is not None:
+                    postings.discard((case_pk, field))
+                    if not postings:
+                        del self._postings[gram]
+
+    def build(self):
+        with self._lock:
+            signature = self._table_signature()
+            self._postings = defaultdict(set)
+            self._documents = {}
+            self._updated = {}
+            rows = Case.objects.values_list('id', 'updated_at', *FUZZY_FIELDS).iterator(chunk_size=2000)
+            for row in rows:
+                self._updated[row[0]] = row[1]
+                for field, value in zip(FUZZY_FIELDS, row[2:]):
+                    self._add(row[0], field, value)
+            self._signature = signature
+            self._checked_at = time.monotonic()
+            self._stale = False
+            logger.debug(f"Trigram name index built: {len(self._documents)} values, {len(self._postings)} trigrams")
+
+    def ensure_fresh(self):
+        if not self.is_built or self._stale:
+            self.build()
+            return
+        refresh_seconds = _search_setting('FUZZY_INDEX_REFRESH_SECONDS', 60)
+        if time.monotonic() - self._checked_at < refresh_seconds:
+            return
+        with self._lock:
+            if self._table_signature() != self._signature:
+                self.build()
+            else:
+                self._checked_at = time.monotonic()
+
+    def _forget(self, case_pk, total, latest):
+        """Drop a case; returns the signature adjusted for its removal"""
+        self._discard(case_pk)
+        if case_pk not in self._updated:
+            return total, latest
+        if self._updated.pop(case_pk) == latest:
+            # The new max(updated_at) is unknown without a query
+            self._stale = True
+        return total - 1, latest
+
+    def update(self, case_ids):
+        """Re-read the given cases into the index (no-op until the index is first used)"""
+        if not self.is_built or not case_ids:
+            return
+        rows = list(Case.objects.filter(id__in=case_ids).values_list('id', 'updated_at', *FUZZY_FIELDS))
+        with self._lock:
+            if self._signature is None:
+                return
+            total, latest = self._signature
+            # Advancing max(updated_at) past another writer's change would hide
+            # it; counts are never re-read, so foreign inserts/deletes stay visible
+            if latest is not None and Case.objects.filter(updated_at__gt=latest).exclude(id__in=case_ids).exists():
+                self._stale = True
+            found = {row[0] for row in rows}
+            for case_pk in case_ids:
+                if case_pk in found:
+                    self._discard(case_pk)
+                else:
+                    total, latest = self._forget(case_pk, total, latest)
+            for row in rows:
+                if row[0] not in self._updated:
+                    total += 1
+                self._updated[row[0]] = row[1]
+                if row[1] is not None and (latest is None or row[1] > latest):
+                    latest = row[1]
+                for field, value in zip(FUZZY_FIELDS, row[2:]):
+                    self._add(row[0], field, value)
+            self._signature = (total, latest)
+
+    def remove(self, case_ids):
+        if not self.is_built:
+            return
+        with self._lock:
+            if self._signature is None:
+                return
+            total, latest = self._signature
+            for case_pk in case_ids:
+                total, latest = self._forget(case_pk, total, latest)
+            self._signature = (total, latest)
+
+    def search(self, query, fields, limit, min_similarity):
+        """
+        Return up to ``limit`` (all if None) (similarity, case pk, field) tuples, best first.
+        Similarity is the share of the query's trigrams found in the value,
+        which approximates pg_trgm's word_similarity().
+        """
+        query_grams = trigrams(query)
+        if not query_grams:
+            return []
+        self.ensure_fresh()
+        fields = set(fields)
+        with self._lock:
+            hits = Counter()
+            for gram in query_grams:
+                for key in self._postings.get(gram, ()):
+                    if key[1] in fields:
+                        hits[key] += 1
+        best = {}
+        for (case_pk, field), common in hits.items():
+            similarity = common / len(query_grams)
+            if similarity >= min_similarity and similarity > best.get(case_pk, (0, None))[0]:
+                best[case_pk] = (similarity, field)
+        candidates = ((similarity, case_pk, field) for case_pk, (similarity, field) in best.items())
+        if limit is None:
+            return sorted(candidates, reverse=True)
+        return heapq.nlargest(limit, candidates)
+
+
+name_index = TrigramNameIndex()
+
+
+def _fuzzy_search_postgres(queryset, query, fields, limit, min_similarity):
+    match_sql = ' OR '.join(f"%s <%% {CASE_TABLE}.{field}" for field in fields)
+    annotations = {
+        f'{field}_similarity': RawSQL(
+            f"word_similarity(%s, {CASE_TABLE}.{field})", [query], output_field=FloatField()
+        )
+        for field in fields
+    }
+    annotations['similarity'] = RawSQL(
+        'GREATEST(' + ', '.join(f"word_similarity(%s, {CASE_TABLE}.{field})" for field in fields) + ')',
+        [query] * len(fields),
+        output_field=FloatField(),
+    )
+    rows = (
+        queryset
+        .filter(RawSQL(f"({match_sql})", [query] * len(fields), output_field=BooleanField()))
+        .annotate(**annotations)
+        .order_by('-similarity', '-id')
+        .values('id', 'case_id', *FUZZY_FIELDS, 'similarity', *[f'{field}_similarity' for field in fields])
+        [:limit]
+    )
+    # The <% operator (GIN-indexable) compares against this threshold, set for
+    # this transaction only so it does not stick to a pooled connection
+    with transaction.atomic():
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT set_config('pg_trgm.word_similarity_threshold', %s, true)", [str(min_similarity)])
+        rows = list(rows)
+    results = []
+    for row in rows:
+        row['matched_field'] = max(fields, key=lambda field: row.pop(f'{field}_similarity') or 0)
+        results.append(row)
+    return results
+
+
+# Index hits checked against the queryset per query, best first
+FUZZY_CANDIDATE_CHUNK = 500
+
+
+def _fuzzy_search_in_process(queryset, query, fields, limit, min_similarity):
+    # All hits, so ones outside ``queryset`` do not crowd out those inside it
+    hits = name_index.search(query, fields, None, min_similarity)
+    results = []
+    for start in range(0, len(hits), FUZZY_CANDIDATE_CHUNK):
+        chunk = hits[start:start + FUZZY_CANDIDATE_CHUNK]
+        rows = {
+            row['id']: row
+            for row in queryset.filter(id__in=[case_pk for _similarity, case_pk, _field in chunk])
+            .order_by()
+            .values('id', 'case_id', *FUZZY_FIELDS)
+        }
+        for similarity, case_pk, field in chunk:
+            row = rows.get(case_pk)
+            if row is not None:
+                row['similarity'] = round(similarity, 4)
+                row['matched_field'] = field
+                results.append(row)
+                if len(results) == limit:
+                    return results
+    return results
+
+
+def fuzzy_search_cases(queryset, query, fields=None, limit=None):
+    """
+    Typo-tolerant lookup of party/advocate names.
+
+    Returns up to ``limit`` dicts (id, case_id, the name fields, similarity,
+    matched_field) ordered by similarity, restricted to rows of ``queryset``.
+    """
+    fields = [field for field in (fields or FUZZY_FIELDS) if field in FUZZY_FIELDS]
+    query = (query or '').strip()
+    if not fields or not query:
+        return []
+    max_limit = _search_setting('FUZZY_MAX_LIMIT', 50)
+    limit = max(1, min(limit or _search_setting('FUZZY_DEFAULT_LIMIT', 10), max_limit))
+    min_similarity = _search_setting('FUZZY_MIN_SIMILARITY', 0.3)
+
+    if connection.vendor == 'postgresql':
+        return _fuzzy_search_postgres(queryset, query, fields, limit, min_similarity)
+    return _fuzzy_search_in_process(queryset, query, fields, limit, min_similarity)
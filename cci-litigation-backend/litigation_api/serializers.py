@@ -1,5 +1,5 @@
 from rest_framework import serializers
-from .models import User, Case, Department, CaseNote, CaseAutoSave, NotificationLog, UserLoginHistory
+from .models import User, Case, Department, CaseNote, CaseAutoSave, NotificationLog, UserLoginHistory, ExportJob, ImportSession, ImportStagedRow, ImportJob, ImportJobRowError
 from rest_framework_simplejwt.serializers import TokenObtainPairSerializer
 from django.contrib.auth.password_validation import validate_password
 from django.core.exceptions import ValidationError as DjangoValidationError
@@ -449,9 +449,39 @@ class UserSummarySerializer(serializers.ModelSerializer):
         ]
 
 
+# Columns shown by the CaseTable grid (?view=grid); popup text fields are fetched per case
+CASE_GRID_FIELDS = [
+    'id', 'case_id', 'case_type', 'case_number', 'case_year',
+    'date_of_filing', 'pending_before_court', 'party_petitioner', 'party_respondent',
+    'nature_of_claim', 'advocate_name', 'advocate_email', 'advocate_mobile',
+    'financial_implications', 'internal_department',
+    'last_hearing_date', 'next_hearing_date', 'is_hearing_due_soon',
+    'created_by_username', 'updated_at',
+]
+
+# Model columns read by computed CaseSerializer fields, used to narrow SELECTs with .only()
+CASE_COMPUTED_FIELD_COLUMNS = {
+    'date_of_filing_formatted': ['date_of_filing'],
+    'last_hearing_date_formatted': ['last_hearing_date'],
+    'next_hearing_date_formatted': ['next_hearing_date'],
+    'nature_of_claim_display': ['nature_of_claim'],
+    'internal_department_display': ['internal_department'],
+    'case_type_display': ['case_type'],
+    'formatted_case_number': ['case_id'],
+    'formatted_financial_amount': ['financial_implications'],
+    'case_age_days': ['date_of_filing'],
+    'is_hearing_due_soon': ['next_hearing_date'],
+    'created_by_username': ['created_by__username'],
+    'created_by_name': ['created_by__first_name', 'created_by__last_name'],
+    'last_updated_by_username': ['last_updated_by__username'],
+    'last_updated_by_name': ['last_updated_by__first_name', 'last_updated_by__last_name'],
+}
+
+
 class CaseSerializer(serializers.ModelSerializer):
     """
-    Updated Case serializer matching exact Excel format requirements
+    Updated Case serializer matching exact Excel format requirements.
+    Pass ``fields=[...]`` to serialize a sparse fieldset.
     """
     # Computed fields for display
     created_by_username = serializers.CharField(source='created_by.username', read_only=True)
@@ -506,6 +536,18 @@ class CaseSerializer(serializers.ModelSerializer):
             'last_updated_by_username', 'last_updated_by_name', 'auto_save_timestamp'
         )
     
+    # Bulk imports resolve duplicates for a whole batch at once instead
+    check_uniqueness = True
+    
+    def __init__(self, *args, **kwargs):
+        fields = kwargs.pop('fields', None)
+        super().__init__(*args, **kwargs)
+        
+        # Drop everything outside the requested sparse fieldset
+        if fields is not None:
+            for field_name in set(self.fields) - set(fields):
+                self.fields.pop(field_name)
+    
     def get_date_of_filing_formatted(self, obj):
         """Format date as DD-MM-YYYY"""
         return obj.date_of_filing.strftime('%d-%m-%Y') if obj.date_of_filing else None
@@ -760,7 +802,7 @@ class CaseSerializer(serializers.ModelSerializer):
         case_number = data.get('case_number')
         case_year = data.get('case_year')
         
-        if case_type and case_number and case_year:
+        if self.check_uniqueness and case_type and case_number and case_year:
             # Check uniqueness (excluding current instance for updates)
             queryset = Case.objects.filter(
                 case_type=case_type,
@@ -805,14 +847,27 @@ class CaseSerializer(serializers.ModelSerializer):
         return data
 
 
+class CaseImportSerializer(CaseSerializer):
+    """
+    CaseSerializer's field and cross-field rules without any database lookups,
+    for validating imported rows in memory. One instance can validate many rows
+    through ``run_validation()``.
+    """
+    check_uniqueness = False
+    
+    def get_validators(self):
+        # Skip the unique_together validator (one query per row)
+        return []
+
+
 class CaseSummarySerializer(serializers.ModelSerializer):
     """Lightweight case serializer for lists and references"""
     created_by_name = serializers.CharField(source='created_by.get_full_name', read_only=True)
     internal_department_display = serializers.CharField(source='get_internal_department_display', read_only=True)
-    case_age_days = serializers.IntegerField(source='case_age_days', read_only=True)
-    is_hearing_due_soon = serializers.BooleanField(source='is_hearing_due_soon', read_only=True)
-    formatted_case_number = serializers.CharField(source='formatted_case_number', read_only=True)
-    formatted_financial_amount = serializers.CharField(source='formatted_financial_amount', read_only=True)
+    case_age_days = serializers.IntegerField(read_only=True)
+    is_hearing_due_soon = serializers.BooleanField(read_only=True)
+    formatted_case_number = serializers.CharField(read_only=True)
+    formatted_financial_amount = serializers.CharField(read_only=True)
     
     class Meta:
         model = Case
@@ -863,6 +918,79 @@ class NotificationLogSerializer(serializers.ModelSerializer):
         read_only_fields = ('id', 'sent_at', 'created_at')
 
 
+class ExportJobSerializer(serializers.ModelSerializer):
+    """Background export job with progress and download link"""
+    progress_percent = serializers.IntegerField(read_only=True)
+    created_by_name = serializers.CharField(source='created_by.get_full_name', read_only=True, default='')
+    download_url = serializers.SerializerMethodField()
+    
+    class Meta:
+        model = ExportJob
+        fields = [
+            'id', 'export_format', 'filters', 'status', 'total_rows', 'processed_rows',
+            'progress_percent', 'file_name', 'file_size', 'error_message', 'created_by_name',
+            'created_at', 'started_at', 'completed_at', 'expires_at', 'download_url'
+        ]
+        read_only_fields = fields
+    
+    def get_download_url(self, obj):
+        if obj.status != 'completed':
+            return None
+        from django.urls import reverse
+        request = self.context.get('request')
+        path = reverse('export-job-download', kwargs={'pk': obj.pk})
+        return request.build_absolute_uri(path) if request else path
+
+
+class ImportSessionSerializer(serializers.ModelSerializer):
+    """Staged bulk import with its validation summary"""
+    created_by_name = serializers.CharField(source='created_by.get_full_name', read_only=True)
+    
+    class Meta:
+        model = ImportSession
+        fields = [
+            'id', 'source', 'mode', 'status', 'total_rows', 'valid_rows', 'error_rows', 'duplicate_rows',
+            'update_rows', 'unchanged_rows', 'created_count', 'updated_count', 'unchanged_count',
+            'skipped_count', 'error_message', 'created_by_name',
+            'created_at', 'committed_at', 'expires_at'
+        ]
+        read_only_fields = fields
+
+
+class ImportStagedRowSerializer(serializers.ModelSerializer):
+    """Validation outcome of one staged import row"""
+    
+    class Meta:
+        model = ImportStagedRow
+        fields = ['row_number', 'status', 'case_id', 'data', 'changed_fields', 'error']
+        read_only_fields = fields
+
+
+class ImportJobSerializer(serializers.ModelSerializer):
+    """Background import job with progress and outcome counts"""
+    progress_percent = serializers.IntegerField(read_only=True)
+    created_by_name = serializers.CharField(source='created_by.get_full_name', read_only=True)
+    
+    class Meta:
+        model = ImportJob
+        fields = [
+            'id', 'source', 'mode', 'skip_duplicates', 'file_name', 'status', 'cancel_requested', 'attempts',
+            'total_rows', 'processed_rows', 'last_row', 'progress_percent', 'created_count', 'updated_count',
+            'unchanged_count', 'skipped_count', 'error_count', 'error_message', 'created_by_name',
+            'created_at', 'started_at', 'completed_at', 'updated_at'
+        ]
+        read_only_fields = fields
+
+
+class ImportJobRowErrorSerializer(serializers.ModelSerializer):
+    """A row rejected by an import job"""
+    
+    class Meta:
+        model = ImportJobRowError
+        fields = ['row_number', 'case_id', 'error']
+        read_only_fields = fields
+
+
 class DepartmentSerializer(serializers.ModelSerializer):
     """Enhanced Department serializer with statistics"""
     total_users = serializers.SerializerMethodField()
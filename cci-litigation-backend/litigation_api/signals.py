@@ -1,8 +1,15 @@
 from django.contrib.auth.signals import user_logged_in
+from django.db.models.signals import pre_save, post_save, post_delete, post_migrate
 from django.dispatch import receiver
 from django.conf import settings
+from django.db import transaction
 from django.core.management import call_command
 import threading
+from collections import Counter
+
+from .models import Case, CaseTombstone
+from . import search, stats
+from .caching import bump_case_generation
 
 @receiver(user_logged_in)
 def cleanup_on_login(sender, request, user, **kwargs):
@@ -20,4 +27,68 @@ def cleanup_on_login(sender, request, user, **kwargs):
         
         cleanup_thread = threading.Thread(target=background_cleanup)
         cleanup_thread.daemon = True
-        cleanup_thread.start()
\ No newline at end of file
+        cleanup_thread.start()
+
+
+@receiver(post_save, sender=Case)
+def sync_case_search_index(sender, instance, **kwargs):
+    """Keep the full-text index in step with saved cases"""
+    search.index_cases([instance.pk])
+
+
+@receiver(post_save, sender=Case)
+@receiver(post_delete, sender=Case)
+def invalidate_case_list_cache(sender, instance, **kwargs):
+    """Any write to the case table retires every cached case list, once committed"""
+    # Bumping before commit would let a concurrent read cache the old rows under the new generation
+    transaction.on_commit(bump_case_generation)
+
+
+@receiver(post_delete, sender=Case)
+def remove_case_from_search_index(sender, instance, **kwargs):
+    """Drop deleted cases from the full-text index"""
+    search.unindex_cases([instance.pk])
+
+
+@receiver(post_migrate)
+def recheck_search_table(sender, **kwargs):
+    """Migrations may have created the FTS table this process found missing"""
+    search.SQLiteFTSSearchBackend.forget_table_check()
+
+
+@receiver(pre_save, sender=Case)
+def remember_case_rollup_key(sender, instance, **kwargs):
+    """Note which rollup bucket an existing case is counted under before it changes"""
+    instance._rollup_old_key = None
+    if instance.pk:
+        old = Case.objects.filter(pk=instance.pk).values_list(
+            'internal_department', 'present_status', 'date_of_filing'
+        ).first()
+        if old:
+            instance._rollup_old_key = stats.rollup_key(*old)
+
+
+@receiver(post_save, sender=Case)
+def update_case_stats_rollup(sender, instance, created, **kwargs):
+    """Move the case between rollup buckets"""
+    deltas = Counter({stats.case_rollup_key(instance): 1})
+    old_key = getattr(instance, '_rollup_old_key', None)
+    if old_key is not None:
+        deltas[old_key] -= 1
+    stats.apply_rollup_deltas(deltas)
+
+
+@receiver(post_delete, sender=Case)
+def remove_case_from_stats_rollup(sender, instance, **kwargs):
+    stats.apply_rollup_deltas({stats.case_rollup_key(instance): -1})
+
+
+@receiver(post_delete, sender=Case)
+def record_case_tombstone(sender, instance, **kwargs):
+    """Keep a tombstone so delta sync clients learn about the deletion"""
+    CaseTombstone.objects.create(
+        case_pk=instance.pk,
+        case_id=instance.case_id,
+        internal_department=instance.internal_department or '',
+        deleted_by=getattr(instance, '_deleted_by', None),
+    )
@@ -0,0 +1,237 @@
+"""
+SMS gateways.
+
+``get_sms_gateway()`` returns the process-wide gateway named by
+``SMS_SETTINGS['BACKEND']``, built once with ``SMS_SETTINGS['OPTIONS']``:
+
+- ``LogSmsGateway`` (default) only logs messages.
+- ``TextLocalGateway`` posts to the TextLocal API over one pooled
+  ``requests.Session``; messages with the same text go out in one request.
+- ``FakeSmsGateway`` sends nothing but takes ``latency_ms`` per request and
+  fails ``failure_rate`` of messages, for load testing the reminder dispatcher.
+
+Every gateway shares one token bucket across the delivery threads of the
+process (``rate_per_second`` requests, bursts of ``burst``), so concurrent
+senders stay inside the provider's quota instead of being rejected by it.
+"""
+import logging
+import random
+import threading
+import time
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.utils.module_loading import import_string
+
+logger = logging.getLogger(__name__)
+
+
+class SmsGatewayError(Exception):
+    """The gateway rejected a message or could not be reached"""
+
+
+class TokenBucket:
+    """Thread-safe token bucket: ``rate`` tokens per second, holding at most ``capacity``"""
+
+    def __init__(self, rate, capacity=None):
+        self.rate = float(rate)
+        self.capacity = float(capacity or max(1.0, self.rate))
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        """Take one token, sleeping until one is available"""
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+
+class SmsGateway:
+    """
+    Base gateway. Subclasses implement send_one(); providers with a bulk API
+    also override send_bulk(). Options a gateway does not use are ignored,
+    so one OPTIONS dict can be kept while switching backends.
+    """
+
+    def __init__(self, rate_per_second=None, burst=None, **options):
+        self.limiter = TokenBucket(rate_per_second, burst) if rate_per_second else None
+
+    def throttle(self):
+        """Wait for the rate limiter before each request to the provider"""
+        if self.limiter is not None:
+            self.limiter.acquire()
+
+    def send(self, phone_number, message):
+        """Send one message; raises SmsGatewayError if it is not accepted"""
+        self.throttle()
+        self.send_one(phone_number, message)
+
+    def send_one(self, phone_number, message):
+        raise NotImplementedError
+
+    def send_bulk(self, messages):
+        """{key: None or error} for [(key, phone number, text)]; one request per message by default"""
+        outcomes = {}
+        for key, phone_number, message in messages:
+            try:
+                self.send(phone_number, message)
+                outcomes[key] = None
+            except Exception as e:
+                outcomes[key] = str(e) or e.__class__.__name__
+        return outcomes
+
+
+class LogSmsGateway(SmsGateway):
+    """Logs messages instead of sending them"""
+
+    def send_one(self, phone_number, message):
+        logger.info(f"SMS to {phone_number}: {message}")
+
+
+def _group_by_text(messages, size):
+    """[(text, [(key, phone number)])] with at most ``size`` recipients per group"""
+    groups = {}
+    for key, phone_number, message in messages:
+        groups.setdefault(message, []).append((key, phone_number))
+    return [
+        (message, recipients[start:start + size])
+        for message, recipients in groups.items()
+        for start in range(0, len(recipients), size)
+    ]
+
+
+class HttpSmsGateway(SmsGateway):
+    """Gateway reached over HTTP through one pooled requests.Session per process"""
+
+    def __init__(self, timeout=10, pool_size=10, **options):
+        super().__init__(**options)
+        try:
+            import requests
+            from requests.adapters import HTTPAdapter
+        except ImportError:
+            raise ImproperlyConfigured('HTTP SMS gateways require requests (pip install requests)')
+        self.timeout = timeout
+        self.session = requests.Session()
+        # Kept-alive connections shared by the delivery threads; pool_size should cover SMS concurrency
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+
+
+class TextLocalGateway(HttpSmsGateway):
+    """TextLocal; one request carries up to ``bulk_size`` numbers receiving the same text"""
+    url = 'https://api.textlocal.in/send/'
+
+    def __init__(self, api_key=None, sender=None, bulk_size=1000, **options):
+        super().__init__(**options)
+        self.api_key = api_key or getattr(settings, 'SMS_API_KEY', None)
+        self.sender = sender or getattr(settings, 'SMS_SENDER_ID', '')
+        self.bulk_size = bulk_size
+        if not self.api_key:
+            raise ImproperlyConfigured('TextLocalGateway requires SMS_API_KEY')
+
+    def _post(self, phone_numbers, message):
+        response = self.session.post(
+            self.url,
+            data={
+                'apikey': self.api_key,
+                'numbers': ','.join(phone_numbers),
+                'sender': self.sender,
+                'message': message,
+            },
+            timeout=self.timeout,
+        )
+        response.raise_for_status()
+        body = response.json()
+        if body.get('status') != 'success':
+            errors = body.get('errors') or [{'message': 'Rejected by gateway'}]
+            raise SmsGatewayError('; '.join(str(error.get('message', error)) for error in errors))
+
+    def send_one(self, phone_number, message):
+        self._post([phone_number], message)
+
+    def send_bulk(self, messages):
+        outcomes = {}
+        for message, recipients in _group_by_text(messages, self.bulk_size):
+            self.throttle()
+            try:
+                self._post([phone_number for _, phone_number in recipients], message)
+                error = None
+            except Exception as e:
+                error = str(e) or e.__class__.__name__
+            for key, _ in recipients:
+                outcomes[key] = error
+        return outcomes
+
+
+class FakeSmsGateway(SmsGateway):
+    """
+    Sends nothing: each request takes ``latency_ms`` and each message fails
+    with probability ``failure_rate``. Requests carry up to ``bulk_size``
+    messages. Accepted messages are kept in ``sent`` for inspection.
+    """
+
+    def __init__(self, latency_ms=50, failure_rate=0.0, bulk_size=100, seed=None, **options):
+        super().__init__(**options)
+        self.latency = latency_ms / 1000
+        self.failure_rate = failure_rate
+        self.bulk_size = bulk_size
+        self.random = random.Random(seed)
+        self.sent = []
+        self.requests = 0
+        self.lock = threading.Lock()
+
+    def _request(self, messages):
+        time.sleep(self.latency)
+        outcomes = {}
+        with self.lock:
+            self.requests += 1
+            for key, phone_number, message in messages:
+                if self.random.random() < self.failure_rate:
+                    outcomes[key] = 'Simulated gateway failure'
+                else:
+                    self.sent.append((phone_number, message))
+                    outcomes[key] = None
+        return outcomes
+
+    def send_one(self, phone_number, message):
+        error = self._request([(None, phone_number, message)])[None]
+        if error:
+            raise SmsGatewayError(error)
+
+    def send_bulk(self, messages):
+        outcomes = {}
+        for start in range(0, len(messages), self.bulk_size):
+            self.throttle()
+            outcomes.update(self._request(messages[start:start + self.bulk_size]))
+        return outcomes
+
+
+_gateway = None
+_gateway_lock = threading.Lock()
+
+
+def get_sms_gateway():
+    """The configured gateway, created on first use and shared by all threads"""
+    global _gateway
+    with _gateway_lock:
+        if _gateway is None:
+            sms_settings = getattr(settings, 'SMS_SETTINGS', {})
+            gateway_class = import_string(sms_settings.get('BACKEND', 'litigation_api.sms.LogSmsGateway'))
+            _gateway = gateway_class(**sms_settings.get('OPTIONS', {}))
+        return _gateway
+
+
+def reset_sms_gateway():
+    """Drop the shared gateway so the next use rebuilds it from settings"""
+    global _gateway
+    with _gateway_lock:
+        _gateway = None
@@ -0,0 +1,248 @@
+"""
+Case statistics for the dashboard.
+
+``present_status`` is free text, so statuses are normalized (trimmed,
+lower-cased, spaces to underscores) and mapped onto pending / disposed
+buckets inside the database. Every figure is computed with grouped
+aggregates using conditional ``Count(filter=...)``, so the number of queries
+does not depend on how many departments or months are shown.
+
+Unfiltered figures are read from ``CaseStatsRollup``, a small table of counts
+per (department, status bucket, filing month) kept current by the Case
+signals and bulk paste, so a dashboard read costs O(departments x months)
+rows instead of a scan of the case table. Only "overdue" depends on today's
+date and stays a live query over the next_hearing_date index.
+"""
+from collections import Counter
+from datetime import date
+
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, Q, Sum, TextField, Value
+from django.db.models.functions import Lower, Replace, Trim, TruncMonth
+from django.utils import timezone
+
+from .models import Case, CaseStatsRollup
+
+PENDING_STATUSES = ['pending', 'under_hearing', 'admitted']
+DISPOSED_STATUSES = ['disposed', 'closed', 'dismissed']
+
+DASHBOARD_MONTHS = 12
+
+
+def normalized_status():
+    """present_status as 'under_hearing' style text"""
+    return Replace(Lower(Trim('present_status')), Value(' '), Value('_'), output_field=TextField())
+
+
+def status_bucket(present_status):
+    """'pending', 'disposed' or 'other' for a present_status value (mirrors normalized_status)"""
+    key = (present_status or '').strip().lower().replace(' ', '_')
+    if key in PENDING_STATUSES:
+        return 'pending'
+    if key in DISPOSED_STATUSES:
+        return 'disposed'
+    return 'other'
+
+
+def status_bucket_filters(today=None):
+    """Conditional Count() filters for the status buckets (expects a ``status_key`` annotation)"""
+    today = today or timezone.now().date()
+    pending = Q(status_key__in=PENDING_STATUSES)
+    return {
+        'pending': pending,
+        'disposed': Q(status_key__in=DISPOSED_STATUSES),
+        'overdue': pending & Q(next_hearing_date__lt=today),
+    }
+
+
+def last_months(count=DASHBOARD_MONTHS, today=None):
+    """First day of the current and previous ``count - 1`` calendar months, newest first"""
+    today = today or timezone.now().date()
+    year, month = today.year, today.month
+    months = []
+    for _ in range(count):
+        months.append(date(year, month, 1))
+        year, month = (year - 1, 12) if month == 1 else (year, month - 1)
+    return months
+
+
+def department_breakdown(queryset, departments, today=None):
+    """
+    {department: {'total', 'pending', 'disposed', 'overdue'}} for ``departments``
+    (zeros where a department has no cases) plus overall totals across every
+    department, from a single GROUP BY query.
+    """
+    filters = status_bucket_filters(today)
+    rows = (
+        queryset.order_by()
+        .annotate(status_key=normalized_status())
+        .values('internal_department')
+        .annotate(
+            total=Count('id'),
+            pending=Count('id', filter=filters['pending']),
+            disposed=Count('id', filter=filters['disposed']),
+            overdue=Count('id', filter=filters['overdue']),
+        )
+    )
+
+    keys = ('total', 'pending', 'disposed', 'overdue')
+    totals = dict.fromkeys(keys, 0)
+    by_department = {name: dict.fromkeys(keys, 0) for name in departments}
+    for row in rows:
+        for key in keys:
+            totals[key] += row[key]
+        if row['internal_department'] in by_department:
+            by_department[row['internal_department']] = {key: row[key] for key in keys}
+    return by_department, totals
+
+
+def monthly_filings(queryset, months=DASHBOARD_MONTHS, today=None):
+    """{'YYYY-MM': cases filed that month} for the last ``months`` months, newest first"""
+    month_starts = last_months(months, today)
+    counts = dict.fromkeys((m.strftime('%Y-%m') for m in month_starts), 0)
+    rows = (
+        queryset.order_by()
+        .filter(date_of_filing__gte=month_starts[-1])
+        .annotate(month=TruncMonth('date_of_filing'))
+        .values('month')
+        .annotate(total=Count('id'))
+    )
+    for row in rows:
+        key = row['month'].strftime('%Y-%m')
+        if key in counts:
+            counts[key] = row['total']
+    return counts
+
+
+# ----- rollup maintenance -----
+
+def rollup_key(department, present_status, date_of_filing):
+    """(department, status bucket, filing month) a case is counted under"""
+    return (department, status_bucket(present_status), date_of_filing.replace(day=1))
+
+
+def case_rollup_key(case):
+    return rollup_key(case.internal_department, case.present_status, case.date_of_filing)
+
+
+def apply_rollup_deltas(deltas):
+    """Add ``{rollup_key: +/-n}`` to the rollup table inside the caller's transaction"""
+    for (department, bucket, month), delta in deltas.items():
+        if not delta:
+            continue
+        key = {'department': department, 'status_bucket': bucket, 'filing_month': month}
+        updated = CaseStatsRollup.objects.filter(**key).update(case_count=F('case_count') + delta)
+        if updated:
+            continue
+        try:
+            with transaction.atomic():
+                CaseStatsRollup.objects.create(case_count=delta, **key)
+        except IntegrityError:
+            # Created concurrently by another writer
+            CaseStatsRollup.objects.filter(**key).update(case_count=F('case_count') + delta)
+
+
+def record_cases_added(cases):
+    """Count newly inserted cases (e.g. after bulk_create, which sends no signals)"""
+    apply_rollup_deltas(Counter(case_rollup_key(case) for case in cases))
+
+
+def compute_rollup():
+    """{rollup_key: count} straight from the case table"""
+    counts = Counter()
+    rows = (
+        Case.objects.order_by()
+        .annotate(month=TruncMonth('date_of_filing'))
+        .values('internal_department', 'present_status', 'month')
+        .annotate(total=Count('id'))
+    )
+    for row in rows:
+        counts[(row['internal_department'], status_bucket(row['present_status']), row['month'])] += row['total']
+    return counts
+
+
+def rollup_drift():
+    """[(key, stored, actual)] for every rollup key whose stored count is wrong"""
+    actual = compute_rollup()
+    stored = Counter({
+        (row.department, row.status_bucket, row.filing_month): row.case_count
+        for row in CaseStatsRollup.objects.all()
+    })
+    return sorted(
+        ((key, stored.get(key, 0), actual.get(key, 0))
+         for key in set(actual) | set(stored)
+         if stored.get(key, 0) != actual.get(key, 0)),
+        key=lambda item: (item[0][0], item[0][2], item[0][1])
+    )
+
+
+@transaction.atomic
+def rebuild_rollup():
+    """Replace the rollup table with fresh counts; returns the number of rows written"""
+    counts = compute_rollup()
+    CaseStatsRollup.objects.all().delete()
+    CaseStatsRollup.objects.bulk_create([
+        CaseStatsRollup(department=department, status_bucket=bucket, filing_month=month, case_count=total)
+        for (department, bucket, month), total in counts.items() if total
+    ])
+    return len(counts)
+
+
+# ----- rollup reads -----
+
+def overdue_by_department(today=None):
+    """{department: pending cases whose next hearing date has passed} (live, index-backed)"""
+    today = today or timezone.now().date()
+    rows = (
+        Case.objects.order_by()
+        .filter(next_hearing_date__lt=today)
+        .annotate(status_key=normalized_status())
+        .filter(status_key__in=PENDING_STATUSES)
+        .values('internal_department')
+        .annotate(total=Count('id'))
+    )
+    return {row['internal_department']: row['total'] for row in rows}
+
+
+def rollup_department_breakdown(departments, today=None):
+    """Same result as department_breakdown() over all cases, read from the rollup"""
+    keys = ('total', 'pending', 'disposed', 'overdue')
+    totals = dict.fromkeys(keys, 0)
+    by_department = {name: dict.fromkeys(keys, 0) for name in departments}
+    rows = (
+        CaseStatsRollup.objects.order_by()
+        .values('department', 'status_bucket')
+        .annotate(total=Sum('case_count'))
+    )
+    for row in rows:
+        counts = by_department.get(row['department'])
+        totals['total'] += row['total']
+        if counts is not None:
+            counts['total'] += row['total']
+        if row['status_bucket'] in ('pending', 'disposed'):
+            totals[row['status_bucket']] += row['total']
+            if counts is not None:
+                counts[row['status_bucket']] += row['total']
+
+    for department, overdue in overdue_by_department(today).items():
+        totals['overdue'] += overdue
+        if department in by_department:
+            by_department[department]['overdue'] = overdue
+    return by_department, totals
+
+
+def rollup_monthly_filings(months=DASHBOARD_MONTHS, today=None):
+    """Same result as monthly_filings() over all cases, read from the rollup"""
+    month_starts = last_months(months, today)
+    counts = dict.fromkeys((m.strftime('%Y-%m') for m in month_starts), 0)
+    rows = (
+        CaseStatsRollup.objects.order_by()
+        .filter(filing_month__gte=month_starts[-1])
+        .values('filing_month')
+        .annotate(total=Sum('case_count'))
+    )
+    for row in rows:
+        key = row['filing_month'].strftime('%Y-%m')
+        if key in counts:
+            counts[key] = row['total']
+    return counts
@@ -0,0 +1,134 @@
+from datetime import date, timedelta
+from unittest import mock
+
+from django.conf import settings
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from litigation_api import imports, jobs
+from litigation_api.models import Case, ImportJob, NotificationLog, User
+
+
+def register_row(number, **changes):
+    """One pasted register row (the 19 import columns)"""
+    row = dict(
+        case_type='WP', case_number=str(number), case_year='2024', date_of_filing='05-03-2024',
+        pending_before_court='High Court of Delhi', party_petitioner=f'Ramesh Kumar {number}',
+        party_respondent='CCI Ltd', nature_of_claim='Service', advocate_name='Suresh Advocate',
+        advocate_email='advocate@example.com', advocate_mobile='98765 43210',
+        financial_implications='Rs. 1,00,000.00', internal_department='Tandur', last_hearing_date='',
+        next_hearing_date='', brief_description='Land acquisition dispute at the plant',
+        relief_claimed='Compensation', present_status='Pending', case_remarks='',
+    )
+    row.update(changes)
+    return [row[column] for column in imports.IMPORT_COLUMNS]
+
+
+@override_settings(CCI_LITIGATION_SETTINGS={
+    **settings.CCI_LITIGATION_SETTINGS, 'IMPORT_BATCH_SIZE': 2, 'IMPORT_VALIDATION_WORKERS': 1,
+})
+class CaseImportTests(TestCase):
+
+    def setUp(self):
+        self.user = User.objects.create_user(
+            'importer', 'importer@example.com', 'Passw0rd!', user_type='admin', department_name='Corporate Office',
+        )
+
+    def test_job_resumes_after_committed_batch(self):
+        rows = [register_row(number) for number in range(1, 6)]
+        job = ImportJob.objects.create(created_by=self.user, paste_data=rows, total_rows=len(rows))
+
+        commit_batch = imports._commit_import_job_batch
+        calls = []
+
+        def crash_on_second_batch(*args):
+            calls.append(args)
+            if len(calls) == 2:
+                raise RuntimeError('worker stopped')
+            commit_batch(*args)
+
+        with mock.patch.object(imports, '_commit_import_job_batch', crash_on_second_batch):
+            imports.run_import_job(job.pk)
+
+        job.refresh_from_db()
+        self.assertEqual(job.status, 'failed')
+        self.assertEqual((job.last_row, job.processed_rows, job.created_count), (2, 2, 2))
+        self.assertEqual(Case.objects.count(), 2)
+
+        with mock.patch.object(jobs, 'submit') as submit:
+            self.assertTrue(imports.resume_import_job(job))
+        submit.assert_called_once_with(imports.run_import_job, job.pk)
+        imports.run_import_job(job.pk)
+
+        job.refresh_from_db()
+        self.assertEqual(job.status, 'completed')
+        self.assertEqual(job.attempts, 2)
+        self.assertEqual((job.last_row, job.processed_rows, job.created_count), (5, 5, 5))
+        self.assertEqual((job.skipped_count, job.error_count), (0, 0))
+        self.assertEqual(
+            sorted(Case.objects.values_list('case_number', flat=True)), [1, 2, 3, 4, 5],
+        )
+
+    def test_upsert_rerun_reports_unchanged(self):
+        rows = [register_row(number) for number in range(1, 4)]
+
+        first = imports.import_case_rows(rows, self.user, mode='upsert')
+        self.assertEqual(len(first.created), 3)
+        self.assertEqual(first.errors, [])
+
+        updated_at = dict(Case.objects.values_list('id', 'updated_at'))
+        second = imports.import_case_rows(rows, self.user, mode='upsert')
+        self.assertEqual((second.created, second.updated, second.errors), ([], [], []))
+        self.assertEqual(
+            sorted(outcome['case_id'] for outcome in second.unchanged), ['WP/1/2024', 'WP/2/2024', 'WP/3/2024'],
+        )
+        self.assertEqual(dict(Case.objects.values_list('id', 'updated_at')), updated_at)
+
+
+class HearingReminderTests(TestCase):
+
+    def setUp(self):
+        user = User.objects.create_user(
+            'reminders', 'reminders@example.com', 'Passw0rd!', user_type='admin', department_name='Corporate Office',
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(user)
+        hearing_date = timezone.now().date() + timedelta(days=1)
+        for number in range(1, 4):
+            Case.objects.create(
+                case_type='WP', case_number=number, case_year=2024, date_of_filing=date(2024, 3, 5),
+                pending_before_court='High Court of Delhi', party_petitioner=f'Ramesh Kumar {number}',
+                party_respondent='CCI Ltd', nature_of_claim='Service', advocate_name='Suresh Advocate',
+                advocate_email=f'advocate{number % 2}@example.com', advocate_mobile=f'987654321{number % 2}',
+                internal_department='Tandur', next_hearing_date=hearing_date,
+                brief_description='Land acquisition dispute', relief_claimed='Compensation', present_status='Pending',
+            )
+
+    def send_reminders(self, **data):
+        response = self.client.post(reverse('send_hearing_reminders'), {'days_ahead': 1, **data}, format='json')
+        self.assertEqual(response.status_code, 202)
+        return response.json()
+
+    def test_repeated_request_queues_nothing(self):
+        first = self.send_reminders()
+        self.assertEqual(first['notifications_queued'], 6)
+
+        second = self.send_reminders()
+        self.assertEqual(second['notifications_queued'], 0)
+        self.assertEqual(second['notifications_skipped'], 6)
+        self.assertEqual(NotificationLog.objects.count(), 6)
+
+    def test_per_case_reminder_after_digest_queues_nothing(self):
+        # Two advocates, one SMS and one email digest each
+        first = self.send_reminders(digest=True)
+        self.assertEqual(first['notifications_queued'], 4)
+
+        again = self.send_reminders(digest=True)
+        self.assertEqual(again['notifications_queued'], 0)
+
+        per_case = self.send_reminders(digest=False)
+        self.assertEqual(per_case['notifications_queued'], 0)
+        self.assertEqual(per_case['notifications_skipped'], 6)
+        self.assertEqual(NotificationLog.objects.count(), 4)
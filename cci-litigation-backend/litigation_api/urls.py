@@ -4,7 +4,7 @@ from rest_framework.routers import DefaultRouter
 from rest_framework_simplejwt.views import TokenRefreshView
 from .views import (
     UserViewSet, CaseViewSet, DepartmentViewSet, 
-    MyTokenObtainPairView, DraftViewSet, CaseDataValidationView,
+    MyTokenObtainPairView, DraftViewSet, CaseDataValidationView, ExportJobViewSet, ImportSessionViewSet, ImportJobViewSet,
     upcoming_hearings, send_hearing_reminders, 
     notification_history, send_manual_notification, 
     notification_settings
@@ -17,6 +17,9 @@ router.register(r'cases', CaseViewSet, basename='case')
 router.register(r'departments', DepartmentViewSet, basename='department')
 router.register(r'drafts', DraftViewSet, basename='draft')  # NEW: Draft endpoints
 router.register(r'validation', CaseDataValidationView, basename='validation')  # NEW: Case validation endpoint
+router.register(r'export-jobs', ExportJobViewSet, basename='export-job')
+router.register(r'import-sessions', ImportSessionViewSet, basename='import-session')
+router.register(r'import-jobs', ImportJobViewSet, basename='import-job')
 
 urlpatterns = [
     # Authentication endpoints
@@ -25,6 +28,7 @@ urlpatterns = [
     path('token/refresh/', TokenRefreshView.as_view(), name='token_refresh_alt'),  # Optional alternative
 path('cases/preview-bulk-paste/', views.preview_bulk_paste, name='preview-bulk-paste'),
 path('cases/bulk-paste/', views.bulk_paste_cases, name='bulk-paste-cases'),
+path('cases/import-file/', views.import_case_file, name='import-case-file'),
 # Validation endpoints
 path('validate/case-id/', views.CaseDataValidationView.as_view({'post': 'validate_case_id'}), name='validate-case-id'),
 path('validate/mobile/', views.CaseDataValidationView.as_view({'post': 'validate_mobile'}), name='validate-mobile'),
@@ -9,12 +9,9 @@ from rest_framework_simplejwt.views import TokenObtainPairView
 from django.db.models import Q, Count, Case as DjangoCase, When, IntegerField
 from django.contrib.auth import authenticate
 from django.utils import timezone
-from django.http import HttpResponse, JsonResponse
+from django.http import HttpResponse, JsonResponse, FileResponse, StreamingHttpResponse
 from django.views.decorators.csrf import csrf_exempt
 from django.utils.decorators import method_decorator
-from openpyxl import Workbook
-from openpyxl.styles import Font, Alignment, PatternFill, Border, Side
-from openpyxl.utils import get_column_letter
 from django.utils.html import strip_tags
 import datetime
 import logging
@@ -24,20 +21,49 @@ import csv
 import io
 import re
 from decimal import Decimal
-from rest_framework.decorators import api_view, permission_classes
+from rest_framework.decorators import api_view, permission_classes, parser_classes
+from rest_framework.parsers import MultiPartParser
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from django.utils import timezone
 from datetime import timedelta
 import json
 
-from .models import User, Case, Department,NotificationLog
+from .models import User, Case, Department,NotificationLog, ExportJob, ImportSession, ImportJob
 from .serializers import (
     UserSerializer, CaseSerializer, DepartmentSerializer, 
     MyTokenObtainPairSerializer, UserSummarySerializer,
-    CaseSummarySerializer
+    CaseSummarySerializer, ExportJobSerializer, ImportSessionSerializer, ImportStagedRowSerializer,
+    ImportJobSerializer, ImportJobRowErrorSerializer,
+    CASE_GRID_FIELDS, CASE_COMPUTED_FIELD_COLUMNS
 )
 from .permissions import IsAdminUser, IsDepartmentalEmployeeOrAdmin
+from .search import fuzzy_search_cases, FUZZY_FIELDS
+from .filters import filter_cases
+from .imports import (
+    import_case_rows, stage_import, stage_register_file, commit_import_session,
+    ImportSessionError, ImportFileError, IMPORT_MODES,
+    request_import_job, cancel_import_job, resume_import_job,
+)
+from .notifications import (
+    DEFAULT_SMS_TEMPLATE, DEFAULT_EMAIL_TEMPLATE, format_notification_template,
+    build_hearing_reminders, build_hearing_digests, enqueue_notifications, send_now, notification_setting,
+)
+from .delta import (
+    DeltaCursorError, DeltaExpiredError, resolve_position, delta_page, changed_cases,
+    settled_upto, position_to_cursor, tombstone_data, departed_data, delta_filters, delta_setting,
+)
+from .pagination import CasePagination, StagedRowPagination
+from .stats import rollup_department_breakdown, rollup_monthly_filings
+from .exports import (
+    XLSX_CONTENT_TYPE, CSV_CONTENT_TYPE, NDJSON_CONTENT_TYPE, PARQUET_CONTENT_TYPE, ARROW_CONTENT_TYPE,
+    EXPORT_JOB_WRITERS, build_case_workbook, build_case_columnar, export_file_name, request_export_job,
+    iter_case_csv, iter_case_ndjson, encode_stream, gzip_stream,
+)
+from .caching import (
+    case_list_validators, case_detail_validators, conditional_response, set_validators,
+    get_cached_case_list, set_cached_case_list, case_list_cache_stats, reset_case_list_cache_stats,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -329,77 +355,6 @@ class DraftViewSet(viewsets.ModelViewSet):
             logger.error(f"Old draft cleanup failed: {str(e)}")
 
 
-# Default notification templates
-DEFAULT_SMS_TEMPLATE = "Dear {advocate_name}, Your case {case_id} has a hearing on {hearing_date} at {court_name}. Please be prepared. - CCI Legal"
-
-DEFAULT_EMAIL_TEMPLATE = """Dear {advocate_name},
-
-This is a reminder for your case {case_id} ({case_type}).
-
-Hearing Details:
-- Date: {hearing_date}
-- Court/Tribunal: {pending_before_court}
-- Petitioner: {party_petitioner}
-- Respondent: {party_respondent}
-- Financial Implications: {financial_implications}
-
-Please ensure you are well-prepared.
-
-Best regards,
-CCI Legal Team
-Department: {internal_department}"""
-
-
-def format_notification_template(template, case):
-    """Format notification template with case data"""
-    return template.format(
-        advocate_name=getattr(case, 'advocate_name', 'Advocate'),
-        case_id=case.case_id,
-        case_type=getattr(case, 'case_type', 'Legal Case'),
-        hearing_date=case.next_hearing_date.strftime('%d-%m-%Y') if getattr(case, 'next_hearing_date', None) else 'TBD',
-        party_petitioner=getattr(case, 'parties_involved_complainant', '')[:100] + ('...' if len(getattr(case, 'parties_involved_complainant', '')) > 100 else ''),
-        party_respondent=getattr(case, 'parties_involved_opposite', '')[:100] + ('...' if len(getattr(case, 'parties_involved_opposite', '')) > 100 else ''),
-        pending_before_court=getattr(case, 'bench', ''),
-        financial_implications=getattr(case, 'financial_implications', ''),
-        internal_department=getattr(case, 'department_name', ''),
-        court_name=getattr(case, 'bench', '')
-    )
-
-
-def send_sms(phone_number, message):
-    """Send SMS using your SMS gateway"""
-    # For now, just log the SMS - implement actual SMS sending later
-    logger.info(f"SMS to {phone_number}: {message}")
-    # TODO: Implement SMS sending logic using services like:
-    # - Twilio
-    # - AWS SNS
-    # - MSG91
-    # - TextLocal
-
-
-def send_email(email, subject, content):
-    """Send email using Django's email backend"""
-    from django.core.mail import send_mail
-    from django.conf import settings
-    
-    try:
-        # For development, just log the email - uncomment send_mail for production
-        logger.info(f"Email to {email}: {subject}")
-        logger.info(f"Content: {content}")
-        
-        # Uncomment for actual email sending:
-        # send_mail(
-        #     subject=subject,
-        #     message=content,
-        #     from_email=getattr(settings, 'DEFAULT_FROM_EMAIL', 'noreply@cci.gov.in'),
-        #     recipient_list=[email],
-        #     fail_silently=False
-        # )
-    except Exception as e:
-        logger.error(f"Failed to send email: {str(e)}")
-        raise e
-
-
 # Notification API Views
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
@@ -430,7 +385,7 @@ def upcoming_hearings(request):
 @api_view(['POST'])
 @permission_classes([IsAuthenticated])
 def send_hearing_reminders(request):
-    """Send SMS/Email reminders for upcoming hearings"""
+    """Queue SMS/Email reminders for upcoming hearings; the outbox dispatcher sends them"""
     data = request.data
     hearing_ids = data.get('hearing_ids')
     days_ahead = data.get('days_ahead', 1)
@@ -438,6 +393,7 @@ def send_hearing_reminders(request):
     sms_enabled = data.get('sms_enabled', True)
     email_enabled = data.get('email_enabled', True)
     custom_templates = data.get('custom_templates', {})
+    digest = data.get('digest', notification_setting('REMINDER_DIGEST', False))
     
     if hearing_ids:
         cases = Case.objects.filter(id__in=hearing_ids)
@@ -451,60 +407,23 @@ def send_hearing_reminders(request):
         if departments:
             cases = cases.filter(internal_department__in=departments)
     
-    notifications_sent = 0
-    errors = []
-    
-    for case in cases:
-        try:
-            # Send SMS
-            if sms_enabled and getattr(case, 'advocate_mobile', None):
-                sms_content = format_notification_template(
-                    custom_templates.get('sms', DEFAULT_SMS_TEMPLATE),
-                    case
-                )
-                send_sms(case.advocate_mobile, sms_content)
-                
-                # Create actual database record
-                NotificationLog.objects.create(
-                    case=case,
-                    notification_type='sms',
-                    recipient=case.advocate_mobile,
-                    message_content=sms_content,
-                    status='sent',
-                    sent_at=timezone.now()
-                )
-                notifications_sent += 1
-            
-            # Send Email
-            if email_enabled and getattr(case, 'advocate_email', None):
-                email_content = format_notification_template(
-                    custom_templates.get('email', DEFAULT_EMAIL_TEMPLATE),
-                    case
-                )
-                send_email(case.advocate_email, f"Hearing Reminder - {case.case_id}", email_content)
-                
-                # Create actual database record
-                NotificationLog.objects.create(
-                    case=case,
-                    notification_type='email',
-                    recipient=case.advocate_email,
-                    message_content=email_content,
-                    status='sent',
-                    sent_at=timezone.now()
-                )
-                notifications_sent += 1
-                
-        except Exception as e:
-            logger.error(f"Failed to send notification for case {case.case_id}: {str(e)}")
-            errors.append({
-                'case_id': case.case_id,
-                'error': str(e)
-            })
+    # Formatted here, written as pending NotificationLog rows in one bulk_create;
+    # a digest groups each advocate's hearings into one message per channel
+    already_reminded = 0
+    if digest:
+        logs, errors, already_reminded = build_hearing_digests(cases, sms_enabled, email_enabled, templates=custom_templates)
+    else:
+        logs, errors = build_hearing_reminders(cases, sms_enabled, email_enabled, custom_templates)
+    counts = enqueue_notifications(logs)
+    counts['skipped'] += already_reminded
+    queued = counts['queued'] + counts['retried']
+    logger.info(f"Queued {queued} hearing reminders for {request.user.username} ({counts['skipped']} already sent or queued)")
     
     return Response({
-        'notifications_sent': notifications_sent,
+        'notifications_queued': queued,
+        'notifications_skipped': counts['skipped'],
         'errors': errors
-    })
+    }, status=status.HTTP_202_ACCEPTED)
 
 
 @api_view(['GET'])
@@ -515,14 +434,14 @@ def notification_history(request):
     department = request.GET.get('department')
     
     # Query actual NotificationLog records from database
-    queryset = NotificationLog.objects.all().order_by('-created_at')
+    queryset = NotificationLog.objects.select_related('case').prefetch_related('cases').order_by('-created_at')
     
-    # Filter by department if specified and user is not admin
-    if not request.user.is_admin and department:
-        queryset = queryset.filter(case__internal_department=department)
-    elif not request.user.is_admin:
-        # Non-admin users see only their department's notifications
-        queryset = queryset.filter(case__internal_department=request.user.department_name)
+    # Filter by department if specified and user is not admin; digests match through their cases
+    if not request.user.is_admin:
+        department = department or request.user.department_name
+        queryset = queryset.filter(
+            Q(case__internal_department=department) | Q(cases__internal_department=department)
+        ).distinct()
     
     # Apply limit
     queryset = queryset[:limit]
@@ -536,6 +455,7 @@ def notification_history(request):
                 'case_id': notification.case.case_id if notification.case else 'Unknown',
                 'id': notification.case.id if notification.case else None
             },
+            'digest_cases': [case.case_id for case in notification.cases.all()],
             'notification_type': notification.notification_type,
             'recipient': notification.recipient,
             'status': notification.status,
@@ -567,47 +487,43 @@ def send_manual_notification(request):
     except Case.DoesNotExist:
         return Response({'error': 'Case not found'}, status=404)
     
-    notifications_sent = 0
-    errors = []
-    
     try:
+        logs = []
         if message_type in ['sms', 'both']:
             phone = recipient_phone or getattr(case, 'advocate_mobile', '')
             if phone:
                 message = custom_message if not use_template else format_notification_template(DEFAULT_SMS_TEMPLATE, case)
-                send_sms(phone, message)
-                
-                # Create actual database record
-                NotificationLog.objects.create(
+                logs.append(NotificationLog(
                     case=case,
                     notification_type='sms',
                     recipient=phone,
-                    message_content=message,
-                    status='sent',
-                    sent_at=timezone.now()
-                )
-                notifications_sent += 1
+                    message_content=message
+                ))
         
         if message_type in ['email', 'both']:
             email = recipient_email or getattr(case, 'advocate_email', '')
             if email:
                 message = custom_message if not use_template else format_notification_template(DEFAULT_EMAIL_TEMPLATE, case)
-                send_email(email, f"Manual Notification - {case.case_id}", message)
-                
-                # Create actual database record
-                NotificationLog.objects.create(
+                logs.append(NotificationLog(
                     case=case,
                     notification_type='email',
                     recipient=email,
-                    message_content=message,
-                    status='sent',
-                    sent_at=timezone.now()
-                )
-                notifications_sent += 1
+                    subject=f"Manual Notification - {case.case_id}",
+                    message_content=message
+                ))
+        
+        # Sent now through the same channel senders as the outbox, and logged with each outcome
+        outcomes = send_now(logs)
+        failed = [log for log in logs if log.status == 'failed']
+        if failed:
+            return Response({
+                'error': failed[0].error_message,
+                'notifications_sent': outcomes['sent']
+            }, status=502)
         
         return Response({
             'success': True,
-            'notifications_sent': notifications_sent,
+            'notifications_sent': outcomes['sent'],
             'message': 'Manual notification sent successfully'
         })
         
@@ -622,13 +538,14 @@ def notification_settings(request):
     user = request.user
     
     if request.method == 'GET':
-        # Return default settings - implement with user preferences model later
+        # Scheduled reminder settings - per-user preferences to be implemented later
         return Response({
-            'sms_enabled': True,
-            'email_enabled': True,
-            'auto_reminders': True,
-            'reminder_days_before': 1,
-            'notification_time': '09:00',
+            'sms_enabled': notification_setting('REMINDER_SMS_ENABLED', True),
+            'email_enabled': notification_setting('REMINDER_EMAIL_ENABLED', True),
+            'auto_reminders': notification_setting('AUTO_REMINDERS', True),
+            'reminder_days_before': notification_setting('REMINDER_DAYS_BEFORE', 1),
+            'notification_time': notification_setting('REMINDER_TIME', '09:00'),
+            'digest_mode': notification_setting('REMINDER_DIGEST', False),
             'include_departments': [user.department_name] if not user.is_admin else [],
             'sms_template': DEFAULT_SMS_TEMPLATE,
             'email_template': DEFAULT_EMAIL_TEMPLATE
@@ -646,6 +563,33 @@ def notification_settings(request):
 
 # Add these bulk paste endpoints to your views.py file
 
+# Errors returned inline by the preview; the rest are paged via /import-sessions/<token>/rows/
+PREVIEW_ERROR_LIMIT = 100
+
+
+def staged_import_preview(session):
+    """Summary, first errors and sample rows of a staged import"""
+    staged = session.rows.order_by('row_number')
+    errors = staged.filter(status__in=['error', 'duplicate'])[:PREVIEW_ERROR_LIMIT]
+    sample = staged.filter(status='valid')[:10]
+    
+    return {
+        'token': str(session.pk),
+        'total_rows': session.total_rows,
+        'mode': session.mode,
+        'valid_rows': session.valid_rows,
+        'update_rows': session.update_rows,
+        'unchanged_rows': session.unchanged_rows,
+        'error_count': session.error_rows + session.duplicate_rows,
+        'errors': [f"Row {row.row_number}: {row.error}" for row in errors],
+        'sample_data': [
+            {'row': row.row_number, 'case_id': row.case_id, 'valid': True, **row.data} for row in sample
+        ],  # First 10 rows for preview
+        'expires_at': session.expires_at,
+        'preview_only': True
+    }
+
+
 @api_view(['POST'])
 @permission_classes([IsAuthenticated])
 def preview_bulk_paste(request):
@@ -653,79 +597,18 @@ def preview_bulk_paste(request):
     try:
         data = request.data
         paste_data = data.get('paste_data', [])
+        mode = data.get('options', {}).get('mode', 'insert')
         
         if not paste_data:
             return Response({
                 'error': 'No data provided for preview'
             }, status=400)
+        if mode not in IMPORT_MODES:
+            return Response({'error': f"Unknown import mode '{mode}'"}, status=400)
         
-        # Process and validate the data
-        processed_data = []
-        errors = []
-        valid_rows = 0
-        
-        for row_index, row in enumerate(paste_data):
-            try:
-                if len(row) < 3:  # Minimum required columns
-                    errors.append(f"Row {row_index + 1}: Insufficient columns (minimum 3 required)")
-                    continue
-                
-                # Map tab-separated data to case fields
-                # Adjust this mapping based on your Excel format
-                case_data = {
-                    'case_type': row[0].strip() if len(row) > 0 else '',
-                    'case_number': row[1].strip() if len(row) > 1 else '',
-                    'case_year': row[2].strip() if len(row) > 2 else '',
-                    'department_name': row[3].strip() if len(row) > 3 else request.user.department_name,
-                    'bench': row[4].strip() if len(row) > 4 else '',
-                    'parties_involved_complainant': row[5].strip() if len(row) > 5 else '',
-                    'parties_involved_opposite': row[6].strip() if len(row) > 6 else '',
-                    'financial_implications': row[7].strip() if len(row) > 7 else '0',
-                    'status_of_case': row[8].strip() if len(row) > 8 else 'pending',
-                }
-                
-                # Generate case_id
-                if case_data['case_type'] and case_data['case_number'] and case_data['case_year']:
-                    case_data['case_id'] = f"{case_data['case_type']}/{case_data['case_number']}/{case_data['case_year']}"
-                else:
-                    errors.append(f"Row {row_index + 1}: Missing case type, number, or year")
-                    continue
-                
-                # Basic validation
-                validation_errors = []
-                
-                if not case_data['case_type']:
-                    validation_errors.append("Case type is required")
-                
-                if not case_data['case_number']:
-                    validation_errors.append("Case number is required")
-                
-                if not case_data['case_year']:
-                    validation_errors.append("Case year is required")
-                
-                # Check for duplicate case_id
-                if Case.objects.filter(case_id=case_data['case_id']).exists():
-                    validation_errors.append(f"Case ID {case_data['case_id']} already exists")
-                
-                if validation_errors:
-                    errors.append(f"Row {row_index + 1}: {'; '.join(validation_errors)}")
-                    case_data['valid'] = False
-                else:
-                    case_data['valid'] = True
-                    valid_rows += 1
-                
-                processed_data.append(case_data)
-                
-            except Exception as e:
-                errors.append(f"Row {row_index + 1}: Processing error - {str(e)}")
-        
-        return Response({
-            'total_rows': len(paste_data),
-            'valid_rows': valid_rows,
-            'errors': errors,
-            'sample_data': processed_data[:10],  # First 10 rows for preview
-            'preview_only': True
-        })
+        # Parsed and validated once; the client commits the staged rows by token
+        session = stage_import(enumerate(paste_data, start=1), request.user, mode=mode)
+        return Response(staged_import_preview(session))
         
     except Exception as e:
         logger.error(f"Bulk paste preview failed: {str(e)}")
@@ -735,6 +618,38 @@ def preview_bulk_paste(request):
         }, status=500)
 
 
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+@parser_classes([MultiPartParser])
+def import_case_file(request):
+    """
+    Stage a case register uploaded as .xlsx or .csv (the 19-column export
+    format). Returns the same preview as the bulk paste; commit it with
+    /import-sessions/<token>/commit/. Send mode=upsert to update existing cases.
+    """
+    from django.conf import settings
+    
+    uploaded_file = request.FILES.get('file')
+    if not uploaded_file:
+        return Response({'error': 'Upload the register as "file"'}, status=400)
+    
+    max_mb = getattr(settings, 'CCI_LITIGATION_SETTINGS', {}).get('IMPORT_MAX_FILE_SIZE_MB', 50)
+    if uploaded_file.size > max_mb * 1024 * 1024:
+        return Response({'error': f'File is larger than {max_mb} MB'}, status=400)
+    
+    mode = request.data.get('mode', 'insert')
+    if mode not in IMPORT_MODES:
+        return Response({'error': f"Unknown import mode '{mode}'"}, status=400)
+    
+    try:
+        session = stage_register_file(uploaded_file, request.user, mode=mode)
+    except ImportFileError as e:
+        return Response({'error': str(e)}, status=400)
+    
+    logger.info(f"Register {uploaded_file.name} staged by {request.user.username}: {session.total_rows} rows")
+    return Response(staged_import_preview(session))
+
+
 @api_view(['POST'])
 @permission_classes([IsAuthenticated])
 def bulk_paste_cases(request):
@@ -745,97 +660,54 @@ def bulk_paste_cases(request):
         options = data.get('options', {})
         skip_duplicates = options.get('skip_duplicates', True)
         validate_only = options.get('validate_only', False)
+        mode = options.get('mode', 'insert')
+        
+        # Commit a previewed import from staging
+        if data.get('token'):
+            session = ImportSession.objects.filter(pk=data['token'], created_by=request.user).first()
+            if session is None:
+                return Response({'error': 'Import session not found'}, status=404)
+            try:
+                commit_import_session(session)
+            except ImportSessionError as e:
+                return Response({'error': str(e)}, status=409)
+            return Response({
+                'created': session.created_count,
+                'updated': session.updated_count,
+                'unchanged': session.unchanged_count,
+                'errors': [
+                    {'row': row.row_number, 'error': row.error}
+                    for row in session.rows.filter(status='error').order_by('row_number')
+                ],
+                'skipped': session.skipped_count,
+                'validate_only': False,
+                'created_cases': []
+            })
         
         if not paste_data:
             return Response({
                 'error': 'No data provided for import'
             }, status=400)
-        
-        created_cases = []
-        errors = []
-        skipped = 0
-        
-        for row_index, row in enumerate(paste_data):
-            try:
-                if len(row) < 3:
-                    errors.append({
-                        'row': row_index + 1,
-                        'error': 'Insufficient columns (minimum 3 required)'
-                    })
-                    continue
-                
-                # Map data to case fields
-                case_data = {
-                    'case_type': row[0].strip() if len(row) > 0 else '',
-                    'case_number': row[1].strip() if len(row) > 1 else '',
-                    'case_year': row[2].strip() if len(row) > 2 else '',
-                    'department_name': row[3].strip() if len(row) > 3 else request.user.department_name,
-                    'bench': row[4].strip() if len(row) > 4 else '',
-                    'parties_involved_complainant': row[5].strip() if len(row) > 5 else '',
-                    'parties_involved_opposite': row[6].strip() if len(row) > 6 else '',
-                    'financial_implications': row[7].strip() if len(row) > 7 else '0',
-                    'status_of_case': row[8].strip() if len(row) > 8 else 'pending',
-                    'date_of_filing': timezone.now().date(),  # Default to today
-                    'created_by': request.user,
-                    'last_updated_by': request.user,
-                }
-                
-                # Generate case_id
-                if case_data['case_type'] and case_data['case_number'] and case_data['case_year']:
-                    case_data['case_id'] = f"{case_data['case_type']}/{case_data['case_number']}/{case_data['case_year']}"
-                else:
-                    errors.append({
-                        'row': row_index + 1,
-                        'error': 'Missing case type, number, or year'
-                    })
-                    continue
-                
-                # Check for duplicates
-                if Case.objects.filter(case_id=case_data['case_id']).exists():
-                    if skip_duplicates:
-                        skipped += 1
-                        continue
-                    else:
-                        errors.append({
-                            'row': row_index + 1,
-                            'error': f'Case ID {case_data["case_id"]} already exists'
-                        })
-                        continue
-                
-                # Validate only mode
-                if validate_only:
-                    created_cases.append(case_data)
-                    continue
-                
-                # Create the case
-                case_serializer = CaseSerializer(data=case_data)
-                if case_serializer.is_valid():
-                    case = case_serializer.save()
-                    created_cases.append({
-                        'case_id': case.case_id,
-                        'id': case.id,
-                        'row': row_index + 1
-                    })
-                    logger.info(f"Bulk paste: Created case {case.case_id}")
-                else:
-                    errors.append({
-                        'row': row_index + 1,
-                        'error': f'Validation failed: {case_serializer.errors}'
-                    })
-                
-            except Exception as e:
-                logger.error(f"Bulk paste error on row {row_index + 1}: {str(e)}")
-                errors.append({
-                    'row': row_index + 1,
-                    'error': str(e)
-                })
+        if mode not in IMPORT_MODES:
+            return Response({'error': f"Unknown import mode '{mode}'"}, status=400)
+        
+        # Validated in memory, duplicates resolved per batch, inserted with bulk_create
+        # (upsert: changed existing cases updated with bulk_update, unchanged ones untouched)
+        result = import_case_rows(
+            paste_data, request.user,
+            skip_duplicates=skip_duplicates, validate_only=validate_only, mode=mode
+        )
         
         return Response({
-            'created': len(created_cases),
-            'errors': errors,
-            'skipped': skipped,
+            'created': len(result.created),
+            'updated': len(result.updated),
+            'unchanged': len(result.unchanged),
+            'errors': result.errors,
+            'skipped': result.skipped,
             'validate_only': validate_only,
-            'created_cases': created_cases if validate_only else []
+            'created_cases': result.created if validate_only or mode == 'upsert' else [],
+            'updated_cases': result.updated,
+            'unchanged_cases': result.unchanged
         })
         
     except Exception as e:
@@ -1190,27 +1062,35 @@ class DepartmentViewSet(viewsets.ReadOnlyModelViewSet):
     @action(detail=False, methods=['get'])
     def stats(self, request):
         """Get department-wise statistics"""
-        stats = {}
+        departments = [dept_choice[0] for dept_choice in User.DEPARTMENT_CHOICES]
+        case_stats, _totals = rollup_department_breakdown(departments)
+        
+        # User stats, one grouped query
+        user_rows = (
+            User.objects.filter(is_active=True).order_by()
+            .values('department_name')
+            .annotate(
+                total=Count('id'),
+                admins=Count('id', filter=Q(user_type='admin')),
+                regular=Count('id', filter=Q(user_type='user')),
+            )
+        )
+        user_stats = {row['department_name']: row for row in user_rows}
         
-        for dept_choice in User.DEPARTMENT_CHOICES:
-            dept_name = dept_choice[0]
-            
-            # User stats
-            users = User.objects.filter(department_name=dept_name, is_active=True)
-            
-            # Case stats
-            cases = Case.objects.filter(department_name=dept_name)
-            
+        stats = {}
+        for dept_name in departments:
+            users = user_stats.get(dept_name, {})
+            cases = case_stats[dept_name]
             stats[dept_name] = {
                 'users': {
-                    'total': users.count(),
-                    'admins': users.filter(user_type='admin').count(),
-                    'regular': users.filter(user_type='user').count(),
+                    'total': users.get('total', 0),
+                    'admins': users.get('admins', 0),
+                    'regular': users.get('regular', 0),
                 },
                 'cases': {
-                    'total': cases.count(),
-                    'pending': cases.filter(status_of_case__in=['pending', 'under_hearing']).count(),
-                    'disposed': cases.filter(status_of_case__in=['disposed', 'closed']).count(),
+                    'total': cases['total'],
+                    'pending': cases['pending'],
+                    'disposed': cases['disposed'],
                 }
             }
         
@@ -1224,6 +1104,16 @@ class CaseViewSet(viewsets.ModelViewSet):
     queryset = Case.objects.all().select_related('created_by', 'last_updated_by')
     serializer_class = CaseSerializer
     permission_classes = [IsAuthenticated, IsDepartmentalEmployeeOrAdmin]
+    pagination_class = CasePagination
+    
+    # Seek keys for ?pagination=cursor, by sort_by value (``id`` is always appended)
+    KEYSET_SORT_KEYS = {
+        'date_of_filing': ['date_of_filing'],
+        'date_of_institution': ['date_of_filing'],
+        'case_year': ['case_year', 'case_number'],
+        'case_number': ['case_year', 'case_number'],
+        'next_hearing_date': ['next_hearing_date'],
+    }
     
     def get_queryset(self):
         """Enhanced filtering based on user role and permissions"""
@@ -1236,95 +1126,130 @@ class CaseViewSet(viewsets.ModelViewSet):
             # For viewing, we allow all cases as per requirement
             pass  # Allow viewing all cases
         
-        # Enhanced search functionality - Excel format compatible
-        search_query = self.request.query_params.get('search', None)
-        if search_query:
-            # Split search query for better matching
-            search_terms = search_query.split()
-            search_q = Q()
-            
-            for term in search_terms:
-                search_q |= (
-                    Q(case_id__icontains=term) |
-                    Q(case_name__icontains=term) |
-                    Q(parties_involved_complainant__icontains=term) |
-                    Q(parties_involved_opposite__icontains=term) |
-                    Q(bench__icontains=term) |
-                    Q(sections_involved__icontains=term) |
-                    Q(status_of_case__icontains=term) |
-                    Q(type_of_litigation__icontains=term) |
-                    Q(relief_orders_prayed__icontains=term) |
-                    Q(important_directions_orders__icontains=term) |
-                    Q(outcome__icontains=term) |
-                    Q(department_name__icontains=term)
-                )
-            
-            queryset = queryset.filter(search_q)
-        
-        # Department filter
-        department = self.request.query_params.get('department', None)
-        if department:
-            queryset = queryset.filter(internal_department=department)
-        
-        # Status filter
-        status_filter = self.request.query_params.get('status', None)
-        if status_filter:
-            queryset = queryset.filter(status_of_case=status_filter)
+        # Search, department, status and date filters plus ordering (shared with export jobs)
+        return filter_cases(queryset, self.request.query_params)
+    
+    def get_keyset_ordering(self, queryset):
+        """Sort key and direction for keyset pagination, matching get_queryset's ordering"""
+        sort_by = self.request.query_params.get('sort_by', None)
+        descending = self.request.query_params.get('sort_order', 'desc') == 'desc'
         
-        # Date range filters
-        date_from = self.request.query_params.get('date_from', None)
-        date_to = self.request.query_params.get('date_to', None)
+        if not sort_by and 'search_rank' in queryset.query.annotations:
+            return ['search_rank'], True
         
-        if date_from:
-            try:
-                from datetime import datetime
-                date_from = datetime.strptime(date_from, '%d-%m-%Y').date()
-                queryset = queryset.filter(date_of_institution__gte=date_from)
-            except ValueError:
-                pass
-        
-        if date_to:
-            try:
-                from datetime import datetime
-                date_to = datetime.strptime(date_to, '%d-%m-%Y').date()
-                queryset = queryset.filter(date_of_institution__lte=date_to)
-            except ValueError:
-                pass
-        
-        # Sorting
-        sort_by = self.request.query_params.get('sort_by', 'date_of_filing')
-        sort_order = self.request.query_params.get('sort_order', 'desc')
-
-        # Map frontend field names to actual model fields
-        SORT_FIELD_MAP = {
-    "date_of_institution": "date_of_filing",  # frontend → backend mapping
-        }
-
-        # Apply mapping if necessary
-        sort_by = SORT_FIELD_MAP.get(sort_by, sort_by)
-
-        # Validate sort field
-        allowed_sort_fields = [f.name for f in Case._meta.get_fields()]
-        if sort_by not in allowed_sort_fields:
-             sort_by = 'date_of_filing'
-
-        # Apply sort order
-        if sort_order == 'desc':
-             sort_by = f'-{sort_by}'
-
-        try:
-            queryset = queryset.order_by(sort_by)
-        except Exception as e:
-            logger.warning(f"Invalid sort_by '{sort_by}', defaulting to date_of_filing. Error: {e}")
-            queryset = queryset.order_by('-date_of_filing')
+        if not sort_by:
+            return ['date_of_filing'], descending
+        if sort_by not in self.KEYSET_SORT_KEYS:
+            from rest_framework.exceptions import ValidationError
+            raise ValidationError({
+                'sort_by': f"Cursor pagination supports sort_by: {', '.join(self.KEYSET_SORT_KEYS)}."
+            })
+        return self.KEYSET_SORT_KEYS[sort_by], descending
+    
+    def get_requested_fields(self):
+        """
+        Sparse fieldset from ?fields=a,b,c or ?view=grid|full.
+        Returns None when every field should be serialized.
+        """
+        fields_param = self.request.query_params.get('fields', None)
+        view_param = self.request.query_params.get('view', 'full')
+        
+        if fields_param:
+            fields = [f.strip() for f in fields_param.split(',') if f.strip()]
+        elif view_param == 'grid':
+            fields = list(CASE_GRID_FIELDS)
+        elif view_param == 'full':
+            return None
+        else:
+            from rest_framework.exceptions import ValidationError
+            raise ValidationError({'view': "Must be 'grid' or 'full'."})
+        
+        invalid_fields = [f for f in fields if f not in CaseSerializer.Meta.fields]
+        if invalid_fields:
+            from rest_framework.exceptions import ValidationError
+            raise ValidationError({'fields': f'Unknown fields: {", ".join(invalid_fields)}'})
+        
+        if 'id' not in fields:
+            fields.insert(0, 'id')
+        return fields
+    
+    def apply_sparse_fieldset(self, queryset):
+        """Select only the columns the requested fields read (skips brief_description etc.)"""
+        fields = self.get_requested_fields()
+        if fields is None:
+            return queryset
+        
+        # Sort keys stay loaded so ordering and keyset cursors never hit deferred columns
+        columns = {'id', 'case_id', 'case_year', 'case_number', 'date_of_filing', 'next_hearing_date', 'updated_at'}
+        for field in fields:
+            columns.update(CASE_COMPUTED_FIELD_COLUMNS.get(field, [field]))
+        
+        relations = sorted({column.split('__')[0] for column in columns if '__' in column})
+        return queryset.select_related(None).select_related(*relations).only(*sorted(columns))
+    
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)
+        if self.action in ['list', 'retrieve']:
+            queryset = self.apply_sparse_fieldset(queryset)
         return queryset
-
+    
+    def get_serializer(self, *args, **kwargs):
+        if self.action in ['list', 'retrieve']:
+            fields = self.get_requested_fields()
+            if fields is not None:
+                kwargs.setdefault('fields', fields)
+        return super().get_serializer(*args, **kwargs)
     
     def get_serializer_class(self):
         if self.action in ['summary', 'dashboard_stats']:
             return CaseSummarySerializer
         return CaseSerializer
     
+    def list(self, request, *args, **kwargs):
+        """
+        Case list with ETag / Last-Modified; unchanged sets are answered with 304.
+        Identical filter combinations are served from the versioned list cache
+        until a case is written.
+        """
+        cached, cache_key = get_cached_case_list(request)
+        if cached is not None:
+            etag, last_modified = cached['etag'], cached['last_modified']
+            not_modified = conditional_response(request, etag, last_modified)
+            if not_modified is not None:
+                return not_modified
+            return set_validators(Response(cached['data']), etag, last_modified)
+        
+        queryset = self.filter_queryset(self.get_queryset())
+        etag, last_modified = case_list_validators(queryset, request)
+        
+        not_modified = conditional_response(request, etag, last_modified)
+        if not_modified is not None:
+            return not_modified
+        
+        response = super().list(request, *args, **kwargs)
+        if response.status_code == status.HTTP_200_OK:
+            set_cached_case_list(cache_key, response.data, etag, last_modified)
+        return set_validators(response, etag, last_modified)
+    
+    def retrieve(self, request, *args, **kwargs):
+        """Case detail with ETag / Last-Modified; unchanged cases are answered with 304"""
+        lookup_value = kwargs.get(self.lookup_url_kwarg or self.lookup_field)
+        updated_at = self.get_queryset().filter(
+            **{self.lookup_field: lookup_value}
+        ).values_list('updated_at', flat=True).first()
+        
+        # Unknown cases fall through to the regular 404 handling
+        if updated_at is None:
+            return super().retrieve(request, *args, **kwargs)
+        
+        etag, last_modified = case_detail_validators(lookup_value, updated_at, request)
+        not_modified = conditional_response(request, etag, last_modified)
+        if not_modified is not None:
+            return not_modified
+        
+        response = super().retrieve(request, *args, **kwargs)
+        return set_validators(response, etag, last_modified)
+    
     def perform_create(self, serializer):
         """Set creator and department automatically"""
         user = self.request.user
@@ -1386,6 +1311,11 @@ class CaseViewSet(viewsets.ModelViewSet):
         
         return super().destroy(request, *args, **kwargs)
     
+    def perform_destroy(self, instance):
+        # Recorded on the tombstone written by the post_delete signal
+        instance._deleted_by = self.request.user
+        instance.delete()
+    
     @action(detail=False, methods=['post'], permission_classes=[IsAuthenticated])
     def auto_save(self, request):
         """
@@ -1512,6 +1442,97 @@ class CaseViewSet(viewsets.ModelViewSet):
             logger.error(f"Auto-save clear failed: {str(e)}")
             return Response({'success': False})
     
+    @action(detail=False, methods=['get'])
+    def fuzzy_search(self, request):
+        """
+        Typo-tolerant party/advocate name lookup for autocomplete.
+        Query params: q, fields (comma separated subset of the name fields), limit.
+        """
+        query = request.query_params.get('q', '').strip()
+        if len(query) < 2:
+            return Response({'results': [], 'count': 0})
+        
+        fields = request.query_params.get('fields')
+        fields = [f.strip() for f in fields.split(',')] if fields else FUZZY_FIELDS
+        invalid_fields = [f for f in fields if f not in FUZZY_FIELDS]
+        if invalid_fields:
+            return Response(
+                {'error': f'Invalid fields: {", ".join(invalid_fields)}. Must be among: {", ".join(FUZZY_FIELDS)}'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        try:
+            limit = int(request.query_params.get('limit', 0)) or None
+        except ValueError:
+            limit = None
+        
+        results = fuzzy_search_cases(Case.objects.all(), query, fields=fields, limit=limit)
+        return Response({'results': results, 'count': len(results)})
+    
+    @action(detail=False, methods=['get'])
+    def delta(self, request):
+        """
+        Cases created or updated, and ids deleted, since ?since=<ISO timestamp>
+        or the ?cursor= returned by the previous call. With list filters
+        (search, department, status, date_from, date_to), cases changed out
+        of the filter are listed under ``deleted`` with reason ``filtered_out``
+        and tombstones are limited to the department filter (see delta.py).
+        """
+        try:
+            position = resolve_position(request.query_params)
+        except DeltaCursorError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        if position is None:
+            return Response(
+                {'error': 'Provide since (ISO timestamp) or cursor'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        try:
+            limit = int(request.query_params.get('limit', delta_setting('DEFAULT_LIMIT', 500)))
+        except ValueError:
+            return Response({'error': 'limit must be an integer'}, status=status.HTTP_400_BAD_REQUEST)
+        limit = max(1, min(limit, delta_setting('MAX_LIMIT', 2000)))
+        
+        try:
+            changed, departed, deleted, next_position, has_more = delta_page(
+                self.queryset, position, limit, delta_filters(request.query_params)
+            )
+        except DeltaExpiredError as e:
+            return Response({'error': str(e), 'full_resync_required': True}, status=status.HTTP_410_GONE)
+        
+        return Response({
+            'changed': self.get_serializer(changed, many=True).data,
+            'deleted': [departed_data(case) for case in departed] + [tombstone_data(t) for t in deleted],
+            'cursor': position_to_cursor(next_position),
+            'has_more': has_more,
+        })
+    
+    def apply_delta_filter(self, queryset, response_headers):
+        """
+        For incremental exports: restrict to cases changed since ?since= / ?cursor=
+        and report the cursor to resume from in X-Delta-Cursor.
+        """
+        position = resolve_position(self.request.query_params)
+        if position is None:
+            return queryset
+        upto = settled_upto()
+        # Exports carry no deletions, so only the change watermark moves on
+        response_headers['X-Delta-Cursor'] = position_to_cursor(dict(position, u=upto, i=0))
+        return changed_cases(queryset, position, upto)
+    
+    @action(detail=False, methods=['get', 'delete'])
+    def cache_stats(self, request):
+        """Hit/miss counters of the case list cache; DELETE resets them (admin only)"""
+        if request.method == 'DELETE':
+            if not request.user.is_admin:
+                return Response(
+                    {'error': 'Only administrators can reset cache statistics.'},
+                    status=status.HTTP_403_FORBIDDEN
+                )
+            reset_case_list_cache_stats()
+        return Response(case_list_cache_stats())
+    
     @action(detail=False, methods=['get'])
     def dashboard_stats(self, request):
         """Get dashboard statistics based on user role"""
@@ -1524,52 +1545,22 @@ class CaseViewSet(viewsets.ModelViewSet):
             # Regular users see all cases for viewing but stats can be customized
             cases_queryset = Case.objects.all()
         
-        # Calculate statistics
-        total_cases = cases_queryset.count()
-        pending_cases = cases_queryset.filter(
-            status_of_case__in=['pending', 'under_hearing', 'admitted']
-        ).count()
-        disposed_cases = cases_queryset.filter(
-            status_of_case__in=['disposed', 'closed', 'dismissed']
-        ).count()
-        
-        # Overdue cases (where next hearing date has passed)
-        overdue_cases = cases_queryset.filter(
-            date_of_next_hearing_order__lt=timezone.now().date(),
-            status_of_case__in=['pending', 'under_hearing', 'admitted']
-        ).count()
+        # Read from the (department, status bucket, filing month) rollup table
+        today = timezone.now().date()
+        departments = [dept_choice[0] for dept_choice in User.DEPARTMENT_CHOICES]
+        dept_stats, totals = rollup_department_breakdown(departments, today)
+        monthly_stats = rollup_monthly_filings(today=today)
+        
+        total_cases = totals['total']
+        pending_cases = totals['pending']
+        disposed_cases = totals['disposed']
+        overdue_cases = totals['overdue']
         
         # Recent cases (last 30 days)
-        thirty_days_ago = timezone.now().date() - timedelta(days=30)
+        thirty_days_ago = timezone.now() - timedelta(days=30)
         recent_cases = cases_queryset.filter(
             created_at__gte=thirty_days_ago
-        ).order_by('-created_at')[:10]
-        
-        # Department-wise statistics
-        dept_stats = {}
-        for dept_choice in User.DEPARTMENT_CHOICES:
-            dept_name = dept_choice[0]
-            dept_cases = cases_queryset.filter(department_name=dept_name)
-            dept_stats[dept_name] = {
-                'total': dept_cases.count(),
-                'pending': dept_cases.filter(present_status__in=['pending', 'under_hearing']).count(),
-                'disposed': dept_cases.filter(present_status__in=['disposed', 'closed']).count(),
-                'overdue': dept_cases.filter(
-                    date_of_next_hearing_order__lt=timezone.now().date(),
-                    present_status__in=['pending', 'under_hearing']
-                ).count()
-            }
-        
-        # Monthly statistics (last 12 months)
-        monthly_stats = {}
-        for i in range(12):
-            month_date = timezone.now().date().replace(day=1) - timedelta(days=30*i)
-            month_key = month_date.strftime('%Y-%m')
-            monthly_cases = cases_queryset.filter(
-                date_of_institution__year=month_date.year,
-                date_of_institution__month=month_date.month
-            ).count()
-            monthly_stats[month_key] = monthly_cases
+        ).select_related('created_by').order_by('-created_at')[:10]
         
         return Response({
             'total_cases': total_cases,
@@ -1592,6 +1583,8 @@ class CaseViewSet(viewsets.ModelViewSet):
     def export_excel(self, request, *args, **kwargs):
         """
         Enhanced Excel export matching exact format requirements with Indian formatting.
+        Written in openpyxl write-only mode and streamed from a spooled temp file,
+        so memory stays bounded regardless of the number of rows.
         """
         # Use the same filtering as get_queryset but ensure role-based access
         queryset = self.get_queryset()
@@ -1603,405 +1596,273 @@ class CaseViewSet(viewsets.ModelViewSet):
             # but this can be restricted if needed
             pass
         
-        # Prepare HTTP response for Excel file
-        current_time = timezone.now()
-        file_name = f"CCI_Litigation_Cases_{current_time.strftime('%d-%m-%Y_%H%M%S')}.xlsx"
-        response = HttpResponse(
-            content_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
-        )
-        response['Content-Disposition'] = f'attachment; filename="{file_name}"'
+        # ?since= / ?cursor= exports only the cases changed since then
+        delta_headers = {}
+        try:
+            queryset = self.apply_delta_filter(queryset, delta_headers)
+        except DeltaCursorError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
         
+        workbook_file, record_count = build_case_workbook(queryset, user)
         
-
-        # Create workbook and worksheet
-        wb = Workbook()
-        ws = wb.active
-        ws.title = "CCI Litigation Cases"
-        
-        # Define headers matching Excel format exactly
-        # First header row (merged titles)
-        header_row_1 = [
-        "Case Number",           # Col 1 (will merge A1:C1)
-        "",                      # Col 2 (part of Case Number merge)
-        "",                      # Col 3 (part of Case Number merge)
-        "Date of Filing/Intimation",  # Col 4
-        "Pending Before Court",  # Col 5
-        "Party Details",         # Col 6 (will merge F1:G1)
-        "",                      # Col 7 (part of Party Details merge)
-        "Nature of Claim",       # Col 8
-        "Advocate",              # Col 9 (will merge I1:K1)
-        "",                      # Col 10 (part of Advocate merge)
-        "",                      # Col 11 (part of Advocate merge)
-        "Financial Implications", # Col 12
-        "Internal Department of CCI", # Col 13
-        "Last Date of Hearing",  # Col 14
-        "Next Date of Hearing",  # Col 15
-        "Brief Description of Matter", # Col 16
-        "Relief Claimed by Party", # Col 17
-        "Present Status",        # Col 18
-        "Remarks"               # Col 19
-    ]
-        
-        header_row_2 = [
-    "Type",        # A2
-    "Number",      # B2
-    "Year",        # C2
-    None,          # D2 - merged from row 1
-    None,          # E2 - merged from row 1
-    "Petitioner",  # F2
-    "Respondent",  # G2
-    None,          # H2 - merged from row 1
-    "Name",        # I2
-    "Email",       # J2
-    "Mobile",      # K2
-    None,          # L2 - merged from row 1
-    None,          # M2 - merged from row 1
-    None,          # N2 - merged from row 1
-    None,          # O2 - merged from row 1
-    None,          # P2 - merged from row 1
-    None,          # Q2 - merged from row 1
-    None,          # R2 - merged from row 1
-    None           # S2 - merged from row 1
-]
-
-        ws.append(header_row_1)
-        ws.append(header_row_2)
-        
-        header_font = Font(bold=True, color="FFFFFF", size=11)
-        header_fill = PatternFill(start_color="366092", end_color="366092", fill_type="solid")
-        header_border = Border(
-            left=Side(style='thin'),
-            right=Side(style='thin'),
-            top=Side(style='thin'),
-            bottom=Side(style='thin')
+        response = FileResponse(
+            workbook_file,
+            as_attachment=True,
+            filename=export_file_name('xlsx'),
+            content_type=XLSX_CONTENT_TYPE
         )
+        for header, value in delta_headers.items():
+            response[header] = value
         
-        header_alignment = Alignment(horizontal='center', vertical='center', wrap_text=True)
-
-        
-        # Apply styling ONLY to row 1 (merged header row)
-        for col_num in range(1, 20):  # 19 columns total
-           cell = ws.cell(row=1, column=col_num)
-           cell.font = header_font
-           cell.fill = header_fill
-           cell.alignment = Alignment(horizontal='center', vertical='center', wrap_text=True)
-           cell.border = header_border
-
-# Apply minimal styling to row 2 (second header row)
-        for col_num in range(1, 20):
-            cell = ws.cell(row=2, column=col_num)
-            cell.font = Font(bold=True)
-            cell.fill = PatternFill(fill_type=None)
-            cell.alignment = Alignment(horizontal='left', vertical='center', wrap_text=True)
-            cell.border = header_border  # optional: keep borders consistent
-        
-        ws.row_dimensions[2].height = 25
-
-
-        ws.merge_cells(start_row=1, start_column=1, end_row=1, end_column=3)   # Case Number (A1:C1)
-       # ws.merge_cells(start_row=1, start_column=4, end_row=2, end_column=4)   # Date of Filing (D1:D2)
-        #ws.merge_cells(start_row=1, start_column=5, end_row=2, end_column=5)   # Pending Before Court (E1:E2)
-        ws.merge_cells(start_row=1, start_column=6, end_row=1, end_column=7)   # Party Details (F1:G1)
-        #ws.merge_cells(start_row=1, start_column=8, end_row=2, end_column=8)   # Nature of Claim (H1:H2)
-        ws.merge_cells(start_row=1, start_column=9, end_row=1, end_column=11)  # Advocate (I1:K1)
-        # ws.merge_cells(start_row=1, start_column=12, end_row=2, end_column=12) # Financial (L1:L2)
-        # ws.merge_cells(start_row=1, start_column=13, end_row=2, end_column=13) # Internal Dept (M1:M2)
-        # ws.merge_cells(start_row=1, start_column=14, end_row=2, end_column=14) # Last Hearing (N1:N2)
-        # ws.merge_cells(start_row=1, start_column=15, end_row=2, end_column=15) # Next Hearing (O1:O2)
-        # ws.merge_cells(start_row=1, start_column=16, end_row=2, end_column=16) # Brief Desc (P1:P2)
-        # ws.merge_cells(start_row=1, start_column=17, end_row=2, end_column=17) # Relief Claimed (Q1:Q2)
-        # ws.merge_cells(start_row=1, start_column=18, end_row=2, end_column=18) # Present Status (R1:R2)
-        # ws.merge_cells(start_row=1, start_column=19, end_row=2, end_column=19) # Remarks (S1:S2)
-
-# Merge other headers if needed in future
-
-        # Enhanced header styling
-        
-        merged_ranges = [
-        (1, 1, 1, 3),   # Case Number
-        (1, 4, 2, 4),   # Date of Filing
-        (1, 5, 2, 5),   # Pending Before Court
-        (1, 6, 1, 7),   # Party Details
-        (1, 8, 2, 8),   # Nature of Claim
-        (1, 9, 1, 11),  # Advocate
-        (1, 12, 2, 12), # Financial
-        (1, 13, 2, 13), # Internal Dept
-        (1, 14, 2, 14), # Last Hearing
-        (1, 15, 2, 15), # Next Hearing
-        (1, 16, 2, 16), # Brief Desc
-        (1, 17, 2, 17), # Relief Claimed
-        (1, 18, 2, 18), # Present Status
-        (1, 19, 2, 19)  # Remarks
-    ]
-        
-        
-        for start_row, start_col, end_row, end_col in merged_ranges:
-            for row in range(start_row, end_row + 1):
-                for col in range(start_col, end_col + 1):
-                    cell = ws.cell(row=row, column=col)
-                    if row == 1:
-                        cell.font = header_font
-                        cell.fill = header_fill
-                    else:
-                        cell.font = Font(bold=False)
-                        cell.fill = PatternFill(fill_type=None)
-
-                    cell.alignment = header_alignment
-                    cell.border = header_border
-                
-        ws.freeze_panes = 'A3'
-            
+        # Log export
+        logger.info(f"Excel export generated by {user.username} with {record_count} records")
         
-
+        return response
+    
+    @action(detail=False, methods=['get'], permission_classes=[IsAuthenticated])
+    def export_csv(self, request, *args, **kwargs):
+        """Stream the filtered cases as CSV, gzip-compressed when the client accepts it"""
+        return self._stream_export(request, 'csv', iter_case_csv, CSV_CONTENT_TYPE)
+    
+    @action(detail=False, methods=['get'], permission_classes=[IsAuthenticated])
+    def export_ndjson(self, request, *args, **kwargs):
+        """Stream the filtered cases as JSON lines, gzip-compressed when the client accepts it"""
+        return self._stream_export(request, 'ndjson', iter_case_ndjson, NDJSON_CONTENT_TYPE)
+    
+    @action(detail=False, methods=['get'], permission_classes=[IsAuthenticated])
+    def export_parquet(self, request, *args, **kwargs):
+        """Typed columnar snapshot of the filtered cases as Parquet (for pandas / analytics)"""
+        return self._columnar_export(request, 'parquet', PARQUET_CONTENT_TYPE)
+    
+    @action(detail=False, methods=['get'], permission_classes=[IsAuthenticated])
+    def export_arrow(self, request, *args, **kwargs):
+        """Typed columnar snapshot of the filtered cases as an Arrow IPC file"""
+        return self._columnar_export(request, 'arrow', ARROW_CONTENT_TYPE)
+    
+    def _columnar_export(self, request, export_format, content_type):
+        from django.conf import settings
+        from django.core.exceptions import ImproperlyConfigured
+        export_formats = getattr(settings, 'CCI_LITIGATION_SETTINGS', {}).get('EXPORT_FORMATS', [])
+        if export_format not in export_formats:
+            return Response(
+                {'error': f'{export_format.upper()} export is not enabled'},
+                status=status.HTTP_404_NOT_FOUND
+            )
         
-        # Add data rows with proper formatting
-        for case in queryset:
-            # Format case data according to Excel requirements
-            case_number = self._format_case_number(case)
-            filing_date = self._format_indian_date(case.date_of_filing)
-            party_details = self._combine_party_details(case)
-            nature_of_claim = getattr(case, 'nature_of_claim', 'Others')  # New field
-            advocate_details = self._format_advocate_details(case)  # New field
-            financial = self._format_indian_currency(case.financial_implications)
-            last_hearing = self._format_indian_date(getattr(case, 'last_hearing_date', None))  # New field
-            next_hearing = self._format_indian_date(case.next_hearing_date)
-            brief_description = strip_tags(getattr(case, 'brief_description', '') or '')
-            relief_claimed = strip_tags(getattr(case, 'relief_claimed', '') or '')  # New field
-            present_status = strip_tags(getattr(case, 'present_status', '') or '')# New field
-            remarks = strip_tags(getattr(case, 'case_remarks', '') or '') # New field
-            
-            row = [
-    case.case_type or '',
-    case.case_number or '',
-    case.case_year or '',
-    filing_date,
-    getattr(case, 'pending_before_court', '') or '',
-    self._format_party_list(case.party_petitioner),
-    self._format_party_list(case.party_respondent),
-    nature_of_claim,
-    case.advocate_name or '',
-    case.advocate_email or '',
-    case.advocate_mobile or '',
-    financial,
-    case.internal_department or '',
-    last_hearing,
-    next_hearing,
-    brief_description,
-    relief_claimed,
-    present_status,
-    remarks
-]
-
-            ws.append(row)
-            last_row_idx = ws.max_row
-            for col_idx in range(1, 20):  # Adjust the range if more columns are added
-                cell = ws.cell(row=last_row_idx, column=col_idx)
-                if col_idx in [1, 2, 3]:
-                    try:
-                        cell.alignment = Alignment(vertical='bottom', horizontal='left', wrap_text=True)
-                    except ValueError:
-                # Fallback for older openpyxl versions
-                        cell.alignment = Alignment(vertical='justify', horizontal='left', wrap_text=True)
-
-                    #cell.alignment = Alignment(vertical='bottom', wrap_text=True)
-
+        try:
+            export_file, record_count = build_case_columnar(self.get_queryset(), export_format)
+        except ImproperlyConfigured as e:
+            return Response({'error': str(e)}, status=status.HTTP_501_NOT_IMPLEMENTED)
+        
+        logger.info(f"{export_format.title()} export generated by {request.user.username} with {record_count} records")
+        return FileResponse(
+            export_file,
+            as_attachment=True,
+            filename=export_file_name(export_format),
+            content_type=content_type
+        )
+    
+    def _stream_export(self, request, export_format, row_stream, content_type):
+        """Row-by-row export over the same filters as the case list, in constant memory"""
+        from django.conf import settings
+        export_formats = getattr(settings, 'CCI_LITIGATION_SETTINGS', {}).get('EXPORT_FORMATS', [])
+        if export_format not in export_formats:
+            return Response(
+                {'error': f'{export_format.upper()} export is not enabled'},
+                status=status.HTTP_404_NOT_FOUND
+            )
         
-                # Wrap text in Petitioner and Respondent cells
-            
-            #for cell in ws.cell(row=last_row_idx, column=4), ws.cell(row=last_row_idx, column=5):
-                else:
-                    cell.alignment = Alignment(wrap_text=True, vertical='top')
+        delta_headers = {}
+        try:
+            queryset = self.apply_delta_filter(self.get_queryset(), delta_headers)
+        except DeltaCursorError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        stream = encode_stream(row_stream(queryset))
+        
+        # ?gzip=0 turns compression off for clients that mis-handle it
+        use_gzip = (
+            'gzip' in request.META.get('HTTP_ACCEPT_ENCODING', '')
+            and request.query_params.get('gzip', '1') != '0'
+        )
+        if use_gzip:
+            stream = gzip_stream(stream)
+        
+        response = StreamingHttpResponse(stream, content_type=content_type)
+        response['Content-Disposition'] = f'attachment; filename="{export_file_name(export_format)}"'
+        response['Vary'] = 'Accept-Encoding'
+        if use_gzip:
+            response['Content-Encoding'] = 'gzip'
+        for header, value in delta_headers.items():
+            response[header] = value
+        
+        logger.info(f"{export_format.upper()} export streamed for {request.user.username}")
+        return response
 
-            for col_idx in [6, 7]: 
-                cell = ws.cell(row=last_row_idx, column=col_idx)
-                cell.alignment = Alignment(wrap_text=True, vertical='top')
-        # Auto-adjust column widths with better sizing
-        column_widths = [12, 10, 10, 18, 25, 30, 30, 20, 25, 30, 15, 20, 25, 18, 18, 50, 40, 30, 40]
 
-        for i, width in enumerate(column_widths, 1):
-            column_letter = get_column_letter(i)
-            ws.column_dimensions[column_letter].width = width
-        
-        # Add data validation and formatting
-        self._apply_excel_formatting(ws, queryset.count())
-        
-        # Add summary sheet for admins
-        if user.is_admin:
-            summary_ws = wb.create_sheet("Summary Statistics")
-            self._create_summary_sheet(summary_ws, queryset, user)
+class ExportJobViewSet(viewsets.ReadOnlyModelViewSet):
+    """
+    Background case exports.
+    POST with the usual case list filters queues a job (or returns the identical
+    one already queued or completed); poll the job for progress, then download it.
+    """
+    serializer_class = ExportJobSerializer
+    permission_classes = [IsAuthenticated]
+    
+    def get_queryset(self):
+        queryset = ExportJob.objects.select_related('created_by')
+        if self.action == 'list' and not self.request.user.is_admin:
+            # Job ids are unguessable UUIDs; shared (deduplicated) jobs stay reachable by id
+            queryset = queryset.filter(created_by=self.request.user)
+        return queryset
+    
+    def create(self, request):
+        params = {**request.query_params.dict(), **dict(request.data.items())}
         
-        # Add export metadata
-        metadata_ws = wb.create_sheet("Export Information")
-        self._create_metadata_sheet(metadata_ws, user, queryset.count())
+        export_format = params.get('format', 'xlsx')
+        if export_format not in dict(ExportJob.FORMAT_CHOICES):
+            return Response(
+                {'error': f'Unsupported export format: {export_format}'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
         
-        # Save and return
-        wb.save(response)
+        job, created = request_export_job(request.user, params, export_format)
+        logger.info(f"Export job {job.pk} {'queued' if created else 'reused'} for {request.user.username}")
+        return Response(
+            self.get_serializer(job).data,
+            status=status.HTTP_202_ACCEPTED if created else status.HTTP_200_OK
+        )
+    
+    @action(detail=True, methods=['get'])
+    def download(self, request, pk=None):
+        job = self.get_object()
         
-        # Log export
-        logger.info(f"Excel export generated by {user.username} with {queryset.count()} records")
+        if job.status == 'expired' or (job.expires_at and job.expires_at <= timezone.now()):
+            return Response({'error': 'This export has expired. Please request it again.'}, status=status.HTTP_410_GONE)
+        if job.status != 'completed' or not job.artifact:
+            return Response(
+                {'error': 'Export is not ready yet', 'status': job.status, 'progress_percent': job.progress_percent},
+                status=status.HTTP_409_CONFLICT
+            )
         
-        return response
+        return FileResponse(
+            job.artifact.open('rb'),
+            as_attachment=True,
+            filename=job.file_name,
+            content_type=EXPORT_JOB_WRITERS[job.export_format][2]
+        )
+
+
+class ImportSessionViewSet(viewsets.ReadOnlyModelViewSet):
+    """
+    Staged bulk imports created by the bulk paste preview.
+    Page through the validated rows, then commit the session to insert them.
+    """
+    serializer_class = ImportSessionSerializer
+    permission_classes = [IsAuthenticated]
     
-    def _format_case_number(self, case):
-        """Format case number as Type/Number/Year"""
-        case_type = getattr(case, 'case_type', '')
-        case_number = getattr(case, 'case_number', '')
-        case_year = getattr(case, 'case_year', '')
+    def get_queryset(self):
+        queryset = ImportSession.objects.select_related('created_by')
+        if not self.request.user.is_admin:
+            queryset = queryset.filter(created_by=self.request.user)
+        return queryset
+    
+    @action(detail=True, methods=['get'])
+    def rows(self, request, pk=None):
+        """Staged rows in row order; filter with ?status=valid|error|duplicate|created|skipped"""
+        session = self.get_object()
+        queryset = session.rows.order_by('row_number')
+        row_status = request.query_params.get('status')
+        if row_status:
+            queryset = queryset.filter(status__in=row_status.split(','))
         
-        if case_type and case_number and case_year:
-            return f"{case_type}/{case_number}/{case_year}"
-        else:
-            return case.case_id or ''
-    def _format_party_list(self, party_str):
-            if not party_str:
-               return ''
-            lines = [f"{i+1}. {line.strip()}" for i, line in enumerate(party_str.split(','))]
-            return "\n".join(lines)
-    
-    def _format_indian_date(self, date_obj):
-        """Format date as DD-MM-YYYY (Indian format)"""
-        if date_obj:
-            return date_obj.strftime('%d-%m-%Y')
-        return ''
-    
-    def _combine_party_details(self, case):
-        """Combine party details in proper format"""
-        complainant = getattr(case, 'parties_involved_complainant', '')
-        respondent = getattr(case, 'parties_involved_opposite', '')
-        
-        if complainant and respondent:
-            return f"Petitioner: {complainant}\nRespondent: {respondent}"
-        elif complainant:
-            return f"Petitioner: {complainant}"
-        elif respondent:
-            return f"Respondent: {respondent}"
-        return ''
-    
-    def _format_advocate_details(self, case):
-        """Format advocate details as Name/Email/Mobile"""
-        advocate_name = getattr(case, 'advocate_name', '')
-        advocate_email = getattr(case, 'advocate_email', '')
-        advocate_mobile = getattr(case, 'advocate_mobile', '')
-        
-        details = []
-        if advocate_name:
-            details.append(f"Name: {advocate_name}")
-        if advocate_email:
-            details.append(f"Email: {advocate_email}")
-        if advocate_mobile:
-            details.append(f"Mobile: {advocate_mobile}")
-        
-        return '\n'.join(details)
+        paginator = StagedRowPagination()
+        page = paginator.paginate_queryset(queryset, request, view=self)
+        return paginator.get_paginated_response(ImportStagedRowSerializer(page, many=True).data)
     
-    def _format_indian_currency(self, amount):
-        """Format currency in Indian format Rs. 1,00,00,00,00,00,000.00"""
-        if not amount:
-            return ''
+    @action(detail=True, methods=['post'])
+    def commit(self, request, pk=None):
+        session = self.get_object()
+        if session.created_by_id != request.user.id:
+            return Response({'error': 'Only the user who staged an import can commit it'}, status=status.HTTP_403_FORBIDDEN)
         
         try:
-            # Convert to Decimal for precision
-            if isinstance(amount, str):
-                amount = Decimal(amount)
-            elif not isinstance(amount, Decimal):
-                amount = Decimal(str(amount))
-            
-            # Format with Indian numbering system
-            amount_str = f"{amount:,.2f}"
-            
-            # Convert to Indian numbering (add commas at appropriate places)
-            parts = amount_str.split('.')
-            integer_part = parts[0].replace(',', '')
-            decimal_part = parts[1] if len(parts) > 1 else '00'
-            
-            # Indian numbering system
-            if len(integer_part) > 3:
-                # First group of 3 from right
-                result = integer_part[-3:]
-                integer_part = integer_part[:-3]
-                
-                # Then groups of 2
-                while len(integer_part) > 2:
-                    result = integer_part[-2:] + ',' + result
-                    integer_part = integer_part[:-2]
-                
-                if integer_part:
-                    result = integer_part + ',' + result
-            else:
-                result = integer_part
-            
-            return f"Rs. {result}.{decimal_part}"
-            
-        except (ValueError, TypeError):
-            return str(amount) if amount else ''
+            commit_import_session(session)
+        except ImportSessionError as e:
+            return Response({'error': str(e)}, status=status.HTTP_409_CONFLICT)
+        return Response(self.get_serializer(session).data)
+
+
+class ImportJobViewSet(viewsets.ReadOnlyModelViewSet):
+    """
+    Background bulk imports.
+    POST pasted rows (JSON ``paste_data``) or a register ``file`` (multipart) to
+    queue a job, then poll it for progress. Rows are committed batch by batch;
+    a cancelled job keeps the batches already committed.
+    """
+    serializer_class = ImportJobSerializer
+    permission_classes = [IsAuthenticated]
     
-    def _apply_excel_formatting(self, ws, row_count):
-        """Apply formatting to Excel sheet"""
-        # Add borders to all cells
-        thin_border = Border(
-            left=Side(style='thin'),
-            right=Side(style='thin'),
-            top=Side(style='thin'),
-            bottom=Side(style='thin')
-        )
+    def get_queryset(self):
+        queryset = ImportJob.objects.select_related('created_by').defer('paste_data')
+        if not self.request.user.is_admin:
+            queryset = queryset.filter(created_by=self.request.user)
+        return queryset
+    
+    def create(self, request):
+        from django.conf import settings
+        
+        options = request.data.get('options') or {}
+        if not isinstance(options, dict):
+            options = {}
+        mode = request.data.get('mode', options.get('mode', 'insert'))
+        skip_duplicates = str(request.data.get('skip_duplicates', options.get('skip_duplicates', True))).lower() not in ('false', '0')
+        if mode not in IMPORT_MODES:
+            return Response({'error': f"Unknown import mode '{mode}'"}, status=status.HTTP_400_BAD_REQUEST)
+        
+        uploaded_file = request.FILES.get('file')
+        paste_data = request.data.get('paste_data')
+        if uploaded_file:
+            max_mb = getattr(settings, 'CCI_LITIGATION_SETTINGS', {}).get('IMPORT_MAX_FILE_SIZE_MB', 50)
+            if uploaded_file.size > max_mb * 1024 * 1024:
+                return Response({'error': f'File is larger than {max_mb} MB'}, status=status.HTTP_400_BAD_REQUEST)
+        elif not paste_data or not isinstance(paste_data, list):
+            return Response({'error': 'No data provided for import'}, status=status.HTTP_400_BAD_REQUEST)
         
-        for row in ws.iter_rows(min_row=1, max_row=row_count + 1):
-            for cell in row:
-                cell.border = thin_border
-                if cell.row > 1:  # Data rows
-                    cell.alignment = Alignment(vertical='top', wrap_text=True)
+        try:
+            job = request_import_job(
+                request.user, paste_data=paste_data, upload=uploaded_file,
+                mode=mode, skip_duplicates=skip_duplicates
+            )
+        except ImportFileError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
         
-        # Freeze header row
-        ws.freeze_panes = 'A2'
+        logger.info(f"Import job {job.pk} queued for {request.user.username} ({job.source}, {mode})")
+        return Response(self.get_serializer(job).data, status=status.HTTP_202_ACCEPTED)
     
-    def _create_summary_sheet(self, ws, queryset, user):
-        """Create summary statistics sheet"""
-        ws.append(["CCI Litigation System - Summary Statistics"])
-        ws.append([])
-        ws.append(["Department", "Total Cases", "Pending Cases", "Disposed Cases", "Overdue Cases"])
-        
-        # Department-wise summary
-        for dept_choice in User.DEPARTMENT_CHOICES:
-            dept_name = dept_choice[0]
-            dept_cases = queryset.filter(internal_department=dept_name)
-            pending = dept_cases.filter(present_status__in=['pending', 'under_hearing']).count()
-            disposed = dept_cases.filter(present_status__in=['disposed', 'closed']).count()
-
-            overdue = dept_cases.filter(
-                next_hearing_date__lt=timezone.now().date(),
-                present_status__in=['pending', 'under_hearing']
-            ).count()
-            
-            ws.append([dept_name, dept_cases.count(), pending, disposed, overdue])
-        
-        # Style summary headers
-        header_font = Font(bold=True, color="FFFFFF")
-        header_fill = PatternFill(start_color="366092", end_color="366092", fill_type="solid")
-        
-        for cell in ws[3]:
-            cell.font = header_font
-            cell.fill = header_fill
-            cell.alignment = Alignment(horizontal='center', vertical='center')
-    
-    def _create_metadata_sheet(self, ws, user, record_count):
-        """Create export metadata sheet"""
-        current_time = timezone.now()
-        
-        ws.append(["CCI Litigation System - Export Information"])
-        ws.append([])
-        ws.append(["Export Details", ""])
-        ws.append(["Exported By", user.get_full_name()])
-        ws.append(["Username", user.username])
-        ws.append(["Department", user.department_name])
-        ws.append(["User Role", "Administrator" if user.is_admin else "Regular User"])
-        ws.append(["Export Date", current_time.strftime('%d-%m-%Y')])
-        ws.append(["Export Time", current_time.strftime('%H:%M:%S')])
-        ws.append(["Total Records", record_count])
-        ws.append(["File Format", "Excel (.xlsx)"])
-        ws.append(["System Version", "CCI Litigation v2.0"])
-        
-        # Style metadata
-        for i, row in enumerate(ws.iter_rows(min_row=3, max_row=12), 3):
-            row[0].font = Font(bold=True)
+    @action(detail=True, methods=['get'])
+    def errors(self, request, pk=None):
+        """Rejected rows in row order"""
+        job = self.get_object()
+        paginator = StagedRowPagination()
+        page = paginator.paginate_queryset(job.row_errors.order_by('row_number'), request, view=self)
+        return paginator.get_paginated_response(ImportJobRowErrorSerializer(page, many=True).data)
+    
+    @action(detail=True, methods=['post'])
+    def cancel(self, request, pk=None):
+        job = self.get_object()
+        if not cancel_import_job(job):
+            return Response({'error': f'This import is {job.status} and cannot be cancelled'}, status=status.HTTP_409_CONFLICT)
+        job.refresh_from_db()
+        return Response(self.get_serializer(job).data)
+    
+    @action(detail=True, methods=['post'])
+    def resume(self, request, pk=None):
+        """Retry a failed job from its last committed batch"""
+        job = self.get_object()
+        if not resume_import_job(job):
+            return Response({'error': f'This import is {job.status} and cannot be resumed'}, status=status.HTTP_409_CONFLICT)
+        job.refresh_from_db()
+        return Response(self.get_serializer(job).data, status=status.HTTP_202_ACCEPTED)
 
 
 # Additional utility views for Excel format compatibility
@@ -92,6 +92,7 @@ function NotificationComponent({
         auto_reminders: true,
         reminder_days_before: 1,
         notification_time: '09:00',
+        digest_mode: false,
         include_departments: user?.is_admin ? [] : [user?.department_name],
         sms_template: 'Dear {advocate_name}, Your case {case_id} has a hearing scheduled on {hearing_date} at {court_name}. Please be prepared. - CCI Legal Team',
         email_template: `Dear {advocate_name},
@@ -214,6 +215,7 @@ Internal Department: {internal_department}`
                 departments: settings.include_departments,
                 sms_enabled: settings.sms_enabled,
                 email_enabled: settings.email_enabled,
+                digest: settings.digest_mode,
                 custom_templates: {
                     sms: settings.sms_template,
                     email: settings.email_template
@@ -222,17 +224,20 @@ Internal Department: {internal_department}`
 
             const response = await api.post('/notifications/send-hearing-reminders/', payload);
 
-            const { notifications_sent, errors } = response.data;
+            // Reminders are queued and sent in the background; history shows their status
+            const { notifications_queued, notifications_skipped, errors } = response.data;
 
-            if (notifications_sent > 0) {
-                showSnackbar(`${notifications_sent} hearing reminders sent successfully!`, 'success');
-                onNotificationSent({ count: notifications_sent, type: 'hearing_reminder' });
+            if (notifications_queued > 0) {
+                showSnackbar(`${notifications_queued} hearing reminders queued for sending`, 'success');
+                onNotificationSent({ count: notifications_queued, type: 'hearing_reminder' });
                 loadNotificationData(); // Refresh data
+            } else if (notifications_skipped > 0) {
+                showSnackbar(`All ${notifications_skipped} reminders were already sent or queued`, 'info');
             }
 
             if (errors && errors.length > 0) {
                 console.warn('Notification errors:', errors);
-                showSnackbar(`Sent ${notifications_sent} reminders, ${errors.length} failed`, 'warning');
+                showSnackbar(`Queued ${notifications_queued} reminders, ${errors.length} failed`, 'warning');
             }
 
         } catch (error) {
@@ -580,7 +585,7 @@ Internal Department: {internal_department}`
                                     {getNotificationIcon(notification.notification_type, notification.status)}
                                 </ListItemIcon>
                                 <ListItemText
-                                    primary={`${notification.case?.case_id || 'Unknown Case'} - ${notification.notification_type.toUpperCase()}`}
+                                    primary={`${notification.digest_cases?.length ? `Digest (${notification.digest_cases.length} cases)` : (notification.case?.case_id || 'Unknown Case')} - ${notification.notification_type.toUpperCase()}`}
                                     secondary={`To: ${notification.recipient} | ${formatIndianDate(notification.created_at)}`}
                                 />
                                 <ListItemSecondaryAction>
@@ -640,6 +645,17 @@ Internal Department: {internal_department}`
                                             label="Auto Hearing Reminders"
                                         />
                                     </Grid>
+                                    <Grid item xs={12} md={6}>
+                                        <FormControlLabel
+                                            control={
+                                                <Switch
+                                                    checked={settings.digest_mode}
+                                                    onChange={(e) => setSettings(prev => ({ ...prev, digest_mode: e.target.checked }))}
+                                                />
+                                            }
+                                            label="One Digest per Advocate"
+                                        />
+                                    </Grid>
                                     <Grid item xs={12} md={6}>
                                         <TextField
                                             label="Reminder Days Before"
@@ -795,7 +811,7 @@ Internal Department: {internal_department}`
                                     {getNotificationIcon(notification.notification_type, notification.status)}
                                 </ListItemIcon>
                                 <ListItemText
-                                    primary={`${notification.case?.case_id || 'Unknown Case'} - ${notification.notification_type.toUpperCase()}`}
+                                    primary={`${notification.digest_cases?.length ? `Digest (${notification.digest_cases.length} cases)` : (notification.case?.case_id || 'Unknown Case')} - ${notification.notification_type.toUpperCase()}`}
                                     secondary={
                                         <>
                                             <Typography variant="body2" component="span">
@@ -24,7 +24,9 @@ import {
     TableCell,
     TableContainer,
     TableHead,
-    TableRow
+    TableRow,
+    FormControlLabel,
+    Checkbox
 } from '@mui/material';
 
 // API imports - make sure these functions exist in your api.js
@@ -34,7 +36,7 @@ import {
     downloadExcelReport,
     advancedCaseSearch,
     sendHearingReminders,
-    bulkPasteCases,
+    commitImportSession,
     previewBulkPaste
 } from '../utils/api';
 
@@ -79,6 +81,7 @@ function CaseListPage() {
     const [bulkPasteDialog, setBulkPasteDialog] = useState(false);
     const [pasteData, setPasteData] = useState('');
     const [pastePreview, setPastePreview] = useState(null);
+    const [updateExisting, setUpdateExisting] = useState(false);
     const [bulkOperationLoading, setBulkOperationLoading] = useState(false);
     const [notificationPanelOpen, setNotificationPanelOpen] = useState(false);
 
@@ -344,12 +347,12 @@ function CaseListPage() {
             }
 
             console.log('Sending parsed data to preview:', parsedData);
-            const response = await previewBulkPaste(parsedData);
+            const response = await previewBulkPaste(parsedData, { mode: updateExisting ? 'upsert' : 'insert' });
             console.log('Preview response:', response.data);
             setPastePreview(response.data);
 
-            if (response.data.errors && response.data.errors.length > 0) {
-                showSnackbar(`Preview complete: ${response.data.valid_rows} valid rows, ${response.data.errors.length} errors`, 'warning');
+            if (response.data.error_count > 0) {
+                showSnackbar(`Preview complete: ${response.data.valid_rows} valid rows, ${response.data.error_count} errors`, 'warning');
             } else if (response.data.valid_rows > 0) {
                 showSnackbar(`Preview successful: ${response.data.valid_rows} valid rows ready for import`, 'success');
             }
@@ -363,20 +366,19 @@ function CaseListPage() {
     };
 
     const handleBulkPasteSubmit = async () => {
-        if (!pastePreview || pastePreview.valid_rows === 0) {
+        if (!pastePreview || pastePreview.valid_rows + (pastePreview.update_rows || 0) === 0) {
             showSnackbar('No valid data to import. Please preview first.', 'warning');
             return;
         }
 
         setBulkOperationLoading(true);
         try {
-            const parsedData = parseExcelData(pasteData);
-            const response = await bulkPasteCases(parsedData, {
-                skip_duplicates: true,
-                validate_only: false
-            });
+            // Insert the rows the preview already validated and staged
+            const response = await commitImportSession(pastePreview.token);
 
-            const { created, errors, skipped } = response.data;
+            const {
+                created_count: created, updated_count: updated, skipped_count: skipped, error_rows: errorRows
+            } = response.data;
             setBulkPasteDialog(false);
             setPasteData('');
             setPastePreview(null);
@@ -384,13 +386,15 @@ function CaseListPage() {
             let message = '';
             let severity = 'success';
 
-            if (created > 0) {
-                message = `Successfully created ${created} cases!`;
+            if (created > 0 || updated > 0) {
+                message = updated > 0
+                    ? `Successfully created ${created} and updated ${updated} cases!`
+                    : `Successfully created ${created} cases!`;
                 if (skipped > 0) {
                     message += ` (${skipped} duplicates skipped)`;
                 }
-                if (errors && errors.length > 0) {
-                    message += ` (${errors.length} errors)`;
+                if (errorRows > 0) {
+                    message += ` (${errorRows} errors)`;
                     severity = 'warning';
                 }
                 
@@ -400,8 +404,8 @@ function CaseListPage() {
                 showSnackbar('No cases were created. Check for errors.', 'warning');
             }
 
-            if (errors && errors.length > 0) {
-                console.warn('Bulk paste errors:', errors);
+            if (errorRows > 0) {
+                console.warn(`Bulk paste: ${errorRows} rows had errors`);
             }
         } catch (err) {
             console.error("Error bulk pasting:", err.response?.data || err.message);
@@ -711,7 +715,7 @@ function CaseListPage() {
                                 <strong>Instructions:</strong><br />
                                 1. Copy data from Excel (select cells and Ctrl+C)<br />
                                 2. Paste here (Ctrl+V) - each row should contain:<br />
-                                   • Case Type | Case Number | Case Year | Department | Court | Petitioner | Respondent | Amount | Status<br />
+                                   • the 19 register columns in Excel order: Type | Number | Year | Date of Filing (DD-MM-YYYY) | Court | Petitioner | Respondent | Nature of Claim | Advocate Name | Email | Mobile | Amount | Department | Last Hearing | Next Hearing | Description | Relief Claimed | Present Status | Remarks<br />
                                 3. Click "Preview" to validate the data<br />
                                 4. Click "Import Cases" to create the cases
                             </Typography>
@@ -721,13 +725,26 @@ function CaseListPage() {
                             multiline
                             rows={12}
                             fullWidth
-                            placeholder="Paste your Excel data here... (Tab-separated format)&#10;&#10;Example:&#10;CS	123	2024	Corporate Office	Delhi High Court	ABC Corp	XYZ Ltd	100000	pending&#10;WP	456	2024	Tandur	Supreme Court	PQR Inc	DEF Co	500000	under_hearing"
+                            placeholder="Paste your Excel data here... (Tab-separated format)&#10;&#10;Example:&#10;WP	123	2024	05-03-2024	Delhi High Court	ABC Corp	CCI Ltd	Service	R Sharma	rs@example.com	9876543210	100000	Tandur			Land acquisition dispute	Compensation	Pending	"
                             value={pasteData}
                             onChange={(e) => setPasteData(e.target.value)}
                             sx={{ mt: 2, fontFamily: 'monospace', fontSize: '0.875rem' }}
                             helperText="Each row represents one case. Columns should be tab-separated (Tab key or copied from Excel)."
                         />
 
+                        <FormControlLabel
+                            control={
+                                <Checkbox
+                                    checked={updateExisting}
+                                    onChange={(e) => {
+                                        setUpdateExisting(e.target.checked);
+                                        setPastePreview(null);
+                                    }}
+                                />
+                            }
+                            label="Update existing cases (matched on Type / Number / Year) instead of skipping them"
+                        />
+
                         {pastePreview && (
                             <Box sx={{ mt: 3 }}>
                                 <Typography variant="subtitle2" gutterBottom>
@@ -735,10 +752,12 @@ function CaseListPage() {
                                 </Typography>
                                 
                                 <Alert 
-                                    severity={pastePreview.errors && pastePreview.errors.length > 0 ? "warning" : "success"}
+                                    severity={pastePreview.error_count > 0 ? "warning" : "success"}
                                     sx={{ mb: 2 }}
                                 >
-                                    <strong>Summary:</strong> {pastePreview.total_rows} total rows | {pastePreview.valid_rows} valid | {pastePreview.errors ? pastePreview.errors.length : 0} errors
+                                    <strong>Summary:</strong> {pastePreview.total_rows} total rows | {pastePreview.valid_rows} valid
+                                    {pastePreview.mode === 'upsert' && ` | ${pastePreview.update_rows} updates | ${pastePreview.unchanged_rows} unchanged`}
+                                    {' '}| {pastePreview.error_count || 0} errors
                                 </Alert>
 
                                 {/* Show sample data preview */}
@@ -758,11 +777,11 @@ function CaseListPage() {
                                             <TableBody>
                                                 {pastePreview.sample_data.map((row, index) => (
                                                     <TableRow key={index} sx={{ backgroundColor: row.valid ? 'inherit' : 'error.light' }}>
-                                                        <TableCell>{index + 1}</TableCell>
+                                                        <TableCell>{row.row || index + 1}</TableCell>
                                                         <TableCell>{row.case_id || 'N/A'}</TableCell>
                                                         <TableCell>{row.case_type || 'N/A'}</TableCell>
-                                                        <TableCell>{row.department_name || 'N/A'}</TableCell>
-                                                        <TableCell>{row.bench || 'N/A'}</TableCell>
+                                                        <TableCell>{row.internal_department || 'N/A'}</TableCell>
+                                                        <TableCell>{row.pending_before_court || 'N/A'}</TableCell>
                                                         <TableCell>
                                                             <Chip
                                                                 label={row.valid ? 'Valid' : 'Error'}
@@ -812,10 +831,10 @@ function CaseListPage() {
                     <Button
                         onClick={handleBulkPasteSubmit}
                         variant="contained"
-                        disabled={bulkOperationLoading || !pastePreview || (pastePreview.valid_rows === 0)}
+                        disabled={bulkOperationLoading || !pastePreview || (pastePreview.valid_rows + (pastePreview.update_rows || 0) === 0)}
                         startIcon={bulkOperationLoading ? <CircularProgress size={20} /> : null}
                     >
-                        Import Cases ({pastePreview?.valid_rows || 0})
+                        Import Cases ({(pastePreview?.valid_rows || 0) + (pastePreview?.update_rows || 0)})
                     </Button>
                 </DialogActions>
             </Dialog>
@@ -463,12 +463,14 @@ export const bulkPasteCases = async (pasteData, options = {}) => {
 /**
  * Preview bulk paste operation (NEW FEATURE)
  * @param {Array|string} data - Data to preview
+ * @param {Object} options - mode: 'insert' (default) or 'upsert' to update existing cases
  * @returns {Promise} API response
  */
-export const previewBulkPaste = async (pasteData) => {
+export const previewBulkPaste = async (pasteData, options = {}) => {
     try {
         const response = await api.post('/cases/preview-bulk-paste/', {
-            paste_data: pasteData
+            paste_data: pasteData,
+            options
         });
         return response;
     } catch (error) {
@@ -478,6 +480,93 @@ export const previewBulkPaste = async (pasteData) => {
 };
 
 
+/**
+ * Commit an import staged by previewBulkPaste, without sending the rows again
+ * @param {string} token - Token returned by the preview
+ * @returns {Promise} API response with the committed import session
+ */
+export const commitImportSession = async (token) => {
+    const response = await api.post(`import-sessions/${token}/commit/`);
+    return response;
+};
+
+/**
+ * Upload a case register (.xlsx or .csv in the 19-column export format) for staging
+ * @param {File} file - Register file
+ * @param {string} mode - 'insert' (default) or 'upsert' to update existing cases
+ * @returns {Promise} API response with the same preview as previewBulkPaste
+ */
+export const uploadCaseRegister = async (file, mode = 'insert') => {
+    const formData = new FormData();
+    formData.append('file', file);
+    formData.append('mode', mode);
+    const response = await api.post('/cases/import-file/', formData, {
+        headers: { 'Content-Type': 'multipart/form-data' },
+    });
+    return response;
+};
+
+/**
+ * Page through the validated rows of a staged import
+ * @param {string} token - Token returned by the preview
+ * @param {Object} params - status (e.g. 'error,duplicate'), page, page_size
+ * @returns {Promise} Paginated staged rows
+ */
+export const getImportSessionRows = async (token, params = {}) => {
+    const response = await api.get(`import-sessions/${token}/rows/`, { params });
+    return response.data;
+};
+
+/**
+ * Queue a background import of pasted rows or a register file (.xlsx / .csv)
+ * @param {Object} input - { pasteData } or { file }
+ * @param {Object} options - mode ('insert' | 'upsert'), skip_duplicates
+ * @returns {Promise} API response with the queued import job
+ */
+export const createImportJob = async ({ pasteData, file }, options = {}) => {
+    if (file) {
+        const formData = new FormData();
+        formData.append('file', file);
+        Object.entries(options).forEach(([key, value]) => formData.append(key, value));
+        return api.post('/import-jobs/', formData, {
+            headers: { 'Content-Type': 'multipart/form-data' },
+        });
+    }
+    return api.post('/import-jobs/', { paste_data: pasteData, options });
+};
+
+/**
+ * Poll an import job for progress
+ * @param {string} jobId - Import job id
+ * @returns {Promise} Import job with status, progress_percent and outcome counts
+ */
+export const getImportJob = async (jobId) => {
+    const response = await api.get(`import-jobs/${jobId}/`);
+    return response.data;
+};
+
+/**
+ * Page through the rows an import job rejected
+ * @param {string} jobId - Import job id
+ * @param {Object} params - page, page_size
+ * @returns {Promise} Paginated row errors
+ */
+export const getImportJobErrors = async (jobId, params = {}) => {
+    const response = await api.get(`import-jobs/${jobId}/errors/`, { params });
+    return response.data;
+};
+
+/**
+ * Cancel an import job; batches already committed are kept
+ * @param {string} jobId - Import job id
+ * @returns {Promise} API response with the import job
+ */
+export const cancelImportJob = async (jobId) => {
+    const response = await api.post(`import-jobs/${jobId}/cancel/`);
+    return response.data;
+};
+
+
 // ============================================================================
 // NEW FEATURES - NOTIFICATIONS & ALERTS
 // ============================================================================
@@ -548,14 +637,69 @@ export const exportCasesToExcel = async (exportOptions = {}) => {
     }
 };
 
+/**
+ * Queue a background export job (returns immediately with the job)
+ * @param {Object} exportOptions - Export parameters (same filters as the case list)
+ * @returns {Promise} Export job with status and progress
+ */
+export const startExportJob = async (exportOptions = {}) => {
+    try {
+        const response = await api.post('export-jobs/', exportOptions);
+        return response.data;
+    } catch (error) {
+        console.error('Export job error:', error.response?.data || error.message);
+        throw error;
+    }
+};
+
+/**
+ * Poll an export job for progress
+ * @param {string} jobId - Export job id
+ * @returns {Promise} Export job with status and progress
+ */
+export const getExportJob = async (jobId) => {
+    const response = await api.get(`export-jobs/${jobId}/`);
+    return response.data;
+};
+
+/**
+ * Queue an export and wait for it, polling progress, then fetch the file
+ * @param {Object} exportOptions - Export parameters
+ * @param {Function} onProgress - Called with each polled job
+ * @param {number} pollInterval - Milliseconds between polls
+ * @returns {Promise} Blob of the finished export
+ */
+export const exportCasesInBackground = async (exportOptions = {}, onProgress = null, pollInterval = 1000) => {
+    let job = await startExportJob(exportOptions);
+    
+    while (job.status === 'pending' || job.status === 'running') {
+        if (onProgress) onProgress(job);
+        await new Promise(resolve => setTimeout(resolve, pollInterval));
+        job = await getExportJob(job.id);
+    }
+    if (onProgress) onProgress(job);
+    
+    if (job.status !== 'completed') {
+        throw new Error(job.error_message || `Export ${job.status}`);
+    }
+    
+    const response = await api.get(`export-jobs/${job.id}/download/`, {
+        responseType: 'blob',
+        timeout: 0
+    });
+    return response.data;
+};
+
 /**
  * Download Excel file with proper filename (NEW FEATURE)
+ * Generated by a background export job so large exports do not time out.
  * @param {Object} exportOptions - Export parameters
+ * @param {Function} onProgress - Optional progress callback (receives the export job)
  * @returns {Promise} File download
  */
-export const downloadExcelReport = async (exportOptions = {}) => {
+export const downloadExcelReport = async (exportOptions = {}, onProgress = null) => {
     try {
-        const blob = await exportCasesToExcel(exportOptions);
+        const blob = await exportCasesInBackground(exportOptions, onProgress);
         
         // Create download link
         const url = window.URL.createObjectURL(blob);